@@ -0,0 +1,305 @@
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .data_analysis import analyze_data
+from .data_import import load_file, read_column_names, COLUMNAR_EXTENSIONS
+from .monte_carlo import SimulationSummary
+
+# Extensões aceitas pelo load_file
+SUPPORTED_EXTENSIONS = ('.csv', '.xlsx', '.json', '.xml') + COLUMNAR_EXTENSIONS
+
+# Número desejado de tarefas por processo do pool: as colunas dos arquivos largos são divididas
+# em grupos para que o trabalho se distribua entre os processos mesmo com poucos arquivos
+TASKS_PER_WORKER = 4
+
+
+def collect_files(paths):
+    """
+    Expande a lista de caminhos informada em uma lista ordenada de arquivos suportados.
+    Diretórios são percorridos recursivamente.
+
+    Parâmetros:
+    - paths: Lista de arquivos e/ou diretórios.
+
+    Retorno:
+    - Lista de caminhos de arquivos.
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for current_dir, _, file_names in os.walk(path):
+                for file_name in file_names:
+                    if file_name.endswith(SUPPORTED_EXTENSIONS):
+                        files.append(os.path.join(current_dir, file_name))
+        elif path.endswith(SUPPORTED_EXTENSIONS):
+            files.append(path)
+        else:
+            logging.warning(f"Ignorando caminho não suportado: {path}")
+    return sorted(set(files))
+
+
+def _resolve_columns(df, columns):
+    # Sem especificação, analisamos todas as colunas numéricas (como o gui.py oferece ao usuário)
+    if not columns:
+        return df.select_dtypes(include='number').columns.tolist()
+    missing = [column for column in columns if column not in df.columns]
+    if missing:
+        logging.warning(f"Colunas ausentes no arquivo: {', '.join(missing)}")
+    return [column for column in columns if column in df.columns]
+
+
+def _to_serializable(value):
+    # Converte os valores do dicionário de resultados em tipos aceitos pelo JSON
+    if isinstance(value, SimulationSummary):
+        return value.to_dict()
+    if isinstance(value, np.ndarray):
+        # As projeções completas não são exportadas, apenas um resumo
+        if value.size == 0:
+            return None
+        return {
+            "Média": float(np.mean(value)),
+            "Desvio Padrão": float(np.std(value)),
+            "Percentil 5": float(np.percentile(value, 5)),
+            "Percentil 50": float(np.percentile(value, 50)),
+            "Percentil 95": float(np.percentile(value, 95)),
+        }
+    if isinstance(value, (np.integer,)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        return None if np.isnan(value) else float(value)
+    if isinstance(value, dict):
+        return {k: _to_serializable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_serializable(v) for v in value]
+    return value
+
+
+def _plan_tasks(files, columns, max_workers):
+    """
+    Divide o trabalho em tarefas (arquivo, grupo de colunas). Em CSV e formatos colunares, as
+    colunas são lidas do cabeçalho/esquema e repartidas em grupos, de modo que haja cerca de
+    TASKS_PER_WORKER tarefas por processo; cada tarefa lê do arquivo apenas as colunas do seu grupo.
+    Nos demais formatos (que precisam ser lidos por inteiro), o arquivo é uma única tarefa.
+
+    Retorno:
+    - Lista de (arquivo, colunas do grupo ou None para todas), na ordem dos arquivos e das colunas.
+    """
+    file_columns = []
+    for file_path in files:
+        try:
+            names = read_column_names(file_path)
+        except Exception as e:
+            logging.warning(f"Não foi possível ler as colunas de {file_path}: {e}")
+            names = None
+        if names is not None and columns:
+            # Mesma ordem (e mesmas colunas) que _resolve_columns usaria com o arquivo carregado
+            present = set(names)
+            names = [column for column in columns if column in present]
+        file_columns.append(names)
+
+    n_workers = max_workers or os.cpu_count() or 1
+    total_columns = sum(len(names) for names in file_columns if names)
+    group_size = max(1, -(-total_columns // (TASKS_PER_WORKER * n_workers)))
+
+    tasks = []
+    for file_path, names in zip(files, file_columns):
+        if not names:
+            # Formato sem cabeçalho barato (ou sem colunas pedidas): a tarefa resolve as colunas
+            tasks.append((file_path, None))
+            continue
+        for start in range(0, len(names), group_size):
+            tasks.append((file_path, names[start:start + group_size]))
+    return tasks
+
+
+def _analyze_file(file_path, columns, keep_results=False, group=None):
+    """
+    Tarefa executada em um processo do pool: importa um arquivo e analisa as colunas pedidas.
+    Com group, apenas esse grupo de colunas do arquivo é lido e analisado (ver _plan_tasks).
+    Com keep_results, retorna também os resultados completos de cada série, como pares
+    ("arquivo:coluna", resultados), para os relatórios PDF.
+    """
+    records = []
+    report_results = []
+    timings = {"importação": 0.0, "análise": 0.0}
+
+    start = time.perf_counter()
+    try:
+        # Com colunas definidas, apenas elas são lidas (projeção de colunas no CSV, Excel e formatos colunares)
+        # e, em CSV, já convertidas para float64 durante a leitura. Sem colunas definidas, o grupo limita a
+        # leitura, mas a seleção das colunas numéricas continua sendo feita pelo tipo
+        df = load_file(file_path, columns=group if group is not None else columns, numeric=columns is not None)
+    except Exception as e:
+        logging.error(f"Erro ao importar {file_path}: {e}")
+        df = None
+    timings["importação"] = time.perf_counter() - start
+
+    if df is None:
+        records.append({"Arquivo": file_path, "Erro": "Falha na importação do arquivo."})
+        return records, timings, report_results
+
+    for column in _resolve_columns(df, group if group is not None and columns else columns):
+        start = time.perf_counter()
+        results = analyze_data(df, column)
+        timings["análise"] += time.perf_counter() - start
+
+        if results is None:
+            records.append({"Arquivo": file_path, "Coluna Analisada": column, "Erro": "Falha na análise da coluna."})
+        else:
+            record = {"Arquivo": file_path}
+            record.update(_to_serializable(results))
+            records.append(record)
+            if keep_results:
+                report_results.append((f"{os.path.basename(file_path)}:{column}", results))
+
+    return records, timings, report_results
+
+
+def run_batch(paths, columns=None, output_path="resultados_lote.json", max_workers=None, reports_dir=None,
+              consolidated_report=False):
+    """
+    Executa analyze_data (incluindo a simulação de Monte Carlo) sobre vários arquivos
+    e colunas em um pool de processos, sem interface gráfica. As tarefas são distribuídas por
+    arquivo e por grupo de colunas (ver _plan_tasks), então um único arquivo largo também ocupa
+    todos os processos. Opcionalmente gera os relatórios PDF das séries analisadas (ver render_reports).
+
+    Parâmetros:
+    - paths: Lista de arquivos e/ou diretórios a analisar.
+    - columns: Lista de colunas a analisar em cada arquivo. Se None, todas as colunas numéricas.
+    - output_path: Arquivo JSON onde os resultados serão gravados.
+    - max_workers: Número de processos do pool (padrão: número de CPUs).
+    - reports_dir: Diretório onde gravar os relatórios PDF. Se None, nenhum relatório é gerado.
+    - consolidated_report: Se True, gera um único PDF com todas as séries em vez de um por série.
+
+    Retorno:
+    - Dicionário com os resultados por série e as métricas de desempenho da execução.
+    """
+    wall_start = time.perf_counter()
+    stage_times = {"descoberta": 0.0, "importação": 0.0, "análise": 0.0, "escrita": 0.0}
+    if reports_dir:
+        stage_times["relatórios"] = 0.0
+
+    start = time.perf_counter()
+    files = collect_files(paths)
+    logging.info(f"Execução em lote: {len(files)} arquivo(s) encontrado(s)")
+
+    tasks = _plan_tasks(files, columns, max_workers)
+    stage_times["descoberta"] = time.perf_counter() - start
+    logging.info(f"Execução em lote: {len(tasks)} tarefa(s)")
+
+    records = []
+    report_results = []
+    failed_files = set()
+    pool_start = time.perf_counter()
+    if tasks:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            task_results = executor.map(_analyze_file, [file_path for file_path, _ in tasks], [columns] * len(tasks),
+                                        [bool(reports_dir)] * len(tasks), [group for _, group in tasks])
+            for (file_path, _), (task_records, timings, task_reports) in zip(tasks, task_results):
+                # Uma falha de importação é registrada uma só vez por arquivo, mesmo dividido em grupos
+                if file_path in failed_files:
+                    continue
+                if task_records and "Coluna Analisada" not in task_records[0] and "Erro" in task_records[0]:
+                    failed_files.add(file_path)
+                records.extend(task_records)
+                report_results.extend(task_reports)
+                stage_times["importação"] += timings["importação"]
+                stage_times["análise"] += timings["análise"]
+    pool_wall = time.perf_counter() - pool_start
+
+    series_ok = sum(1 for record in records if "Erro" not in record)
+    throughput = {
+        "Arquivos": len(files),
+        "Séries Analisadas": series_ok,
+        "Séries com Erro": len(records) - series_ok,
+        # Tempo somado em todos os processos para cada estágio
+        "Tempo por Estágio (s)": stage_times,
+        "Tempo de Parede do Pool (s)": pool_wall,
+        "Séries por Segundo": series_ok / pool_wall if pool_wall > 0 else None,
+    }
+
+    if reports_dir:
+        from visualization.reports import render_reports  # Carregado só quando há relatórios
+
+        start = time.perf_counter()
+        throughput["Relatórios"] = []
+        throughput["Páginas"] = 0
+        throughput["Páginas por Segundo"] = None
+        try:
+            report_summary = render_reports([results for _, results in report_results], reports_dir,
+                                            consolidated=consolidated_report,
+                                            labels=[label for label, _ in report_results], n_workers=max_workers)
+        except Exception as e:
+            # Uma falha nos relatórios não impede a gravação dos resultados da análise
+            logging.error(f"Erro ao gerar os relatórios PDF: {e}", exc_info=True)
+            throughput["Erro nos Relatórios"] = str(e)
+        else:
+            throughput["Relatórios"] = report_summary["Arquivos"]
+            throughput["Páginas"] = report_summary["Páginas"]
+            throughput["Páginas por Segundo"] = report_summary["Páginas por Segundo"]
+            throughput["Relatórios Ignorados"] = report_summary["Séries Ignoradas"]
+        stage_times["relatórios"] = time.perf_counter() - start
+
+    output = {"Desempenho": throughput, "Resultados": records}
+
+    # Os resultados são gravados primeiro e o desempenho por último, já com o tempo de escrita e o
+    # tempo total medidos (um objeto JSON não depende da ordem das chaves)
+    start = time.perf_counter()
+    with open(output_path, 'w', encoding='utf-8') as output_file:
+        records_text = json.dumps(records, ensure_ascii=False, indent=2).replace('\n', '\n  ')
+        output_file.write('{\n  "Resultados": ')
+        output_file.write(records_text)
+        output_file.flush()
+        stage_times["escrita"] = time.perf_counter() - start
+        throughput["Tempo Total (s)"] = time.perf_counter() - wall_start
+
+        performance_text = json.dumps(throughput, ensure_ascii=False, indent=2).replace('\n', '\n  ')
+        output_file.write(f',\n  "Desempenho": {performance_text}\n}}\n')
+    logging.info(f"Execução em lote concluída: {series_ok} série(s) em {throughput['Tempo Total (s)']:.2f}s "
+                 f"({throughput['Séries por Segundo'] or 0:.2f} séries/s)")
+    return output
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Análise em lote do DecisionMaker (sem interface gráfica).")
+    parser.add_argument("paths", nargs="+", help="Arquivos ou diretórios a analisar.")
+    parser.add_argument("--colunas", default=None,
+                        help="Lista de colunas separadas por vírgula. Padrão: todas as colunas numéricas.")
+    parser.add_argument("--saida", default="resultados_lote.json", help="Arquivo JSON de saída.")
+    parser.add_argument("--workers", type=int, default=None, help="Número de processos do pool.")
+    parser.add_argument("--relatorios", default=None,
+                        help="Diretório onde gravar os relatórios PDF das séries analisadas.")
+    parser.add_argument("--relatorio-unico", action="store_true",
+                        help="Gera um único PDF consolidado em vez de um PDF por série.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    columns = [column.strip() for column in args.colunas.split(',')] if args.colunas else None
+    output = run_batch(args.paths, columns=columns, output_path=args.saida, max_workers=args.workers,
+                       reports_dir=args.relatorios, consolidated_report=args.relatorio_unico)
+
+    throughput = output["Desempenho"]
+    print(f"Séries analisadas: {throughput['Séries Analisadas']} (erros: {throughput['Séries com Erro']})")
+    for stage, seconds in throughput["Tempo por Estágio (s)"].items():
+        print(f"  {stage}: {seconds:.3f}s")
+    print(f"Séries por segundo: {throughput['Séries por Segundo'] or 0:.2f}")
+    if args.relatorios:
+        print(f"Relatórios: {len(throughput['Relatórios'])} arquivo(s), {throughput['Páginas']} página(s), "
+              f"{throughput['Páginas por Segundo'] or 0:.2f} páginas por segundo, em {args.relatorios}")
+        for skipped in throughput.get("Relatórios Ignorados", []):
+            print(f"  Relatório ignorado: {skipped['Série']} ({skipped['Erro']})")
+        if "Erro nos Relatórios" in throughput:
+            print(f"  Erro nos relatórios: {throughput['Erro nos Relatórios']}")
+    print(f"Tempo total: {throughput['Tempo Total (s)']:.2f}s")
+    print(f"Resultados gravados em: {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
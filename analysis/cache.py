@@ -0,0 +1,197 @@
+import hashlib
+import logging
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from .data_analysis import analyze_data
+
+# Parâmetros de analyze_data que não alteram o resultado e, portanto, não entram na chave
+IGNORED_PARAMETERS = ("plot_histogram_flag",)
+
+# Versão do formato dos resultados, incluída na chave: deve ser incrementada sempre que o dicionário
+# retornado por analyze_data mudar (novas chaves, outro formato da simulação), para que resultados
+# gravados em disco por versões anteriores não sejam reaproveitados
+CACHE_VERSION = 4
+
+
+class AnalysisCache:
+    """
+    Cache dos resultados de analyze_data, endereçado pelo conteúdo: a chave é um hash dos valores
+    da coluna já limpos (numéricos, sem NaN), do nome da coluna e dos parâmetros da análise.
+    Tem uma camada em memória com descarte LRU e, opcionalmente, uma camada em disco que
+    sobrevive ao reinício da aplicação. Quando o tamanho da camada em disco passa de max_disk_bytes,
+    os arquivos usados há mais tempo são removidos.
+
+    Parâmetros:
+    - max_entries: Número máximo de resultados mantidos em memória.
+    - cache_dir: Diretório da camada em disco (None desativa o disco).
+    - max_disk_bytes: Tamanho máximo ocupado pela camada em disco.
+    """
+
+    def __init__(self, max_entries=32, cache_dir=None, max_disk_bytes=512 * 1024 ** 2):
+        if max_entries <= 0 or not isinstance(max_entries, int):
+            raise ValueError("O número máximo de entradas do cache deve ser um inteiro positivo.")
+        if max_disk_bytes <= 0:
+            raise ValueError("O tamanho máximo do cache em disco deve ser positivo.")
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        # A análise roda em threads separadas da interface
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(values, data_column_name, parameters=None):
+        """
+        Calcula a chave do cache (inclui CACHE_VERSION).
+
+        Parâmetros:
+        - values: Valores numéricos da coluna, já sem NaN (Series ou array).
+        - data_column_name: Nome da coluna analisada.
+        - parameters: Dicionário com os demais parâmetros da análise.
+        """
+        digest = hashlib.sha256()
+        digest.update(f"v{CACHE_VERSION}:".encode('utf-8'))
+        digest.update(repr(data_column_name).encode('utf-8'))
+        relevant = {k: v for k, v in (parameters or {}).items() if k not in IGNORED_PARAMETERS}
+        digest.update(repr(sorted(relevant.items())).encode('utf-8'))
+        digest.update(pd.Series(values).to_numpy(dtype='float64').tobytes())
+        return digest.hexdigest()
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def get(self, key):
+        """Retorna os resultados guardados para a chave, ou None se não estiverem no cache."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return dict(self._entries[key])
+
+        if self.cache_dir and os.path.exists(self._disk_path(key)):
+            try:
+                with open(self._disk_path(key), 'rb') as cache_file:
+                    results = pickle.load(cache_file)
+                # O mtime do arquivo marca o último uso (política LRU)
+                os.utime(self._disk_path(key))
+            except Exception as e:
+                logging.warning(f"Entrada do cache em disco ilegível, ignorando: {e}")
+            else:
+                with self._lock:
+                    self.hits += 1
+                    self.disk_hits += 1
+                    self._store_in_memory(key, results)
+                return dict(results)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, results):
+        """Guarda os resultados na memória e, se configurado, no disco."""
+        with self._lock:
+            self._store_in_memory(key, results)
+
+        if self.cache_dir:
+            path = self._disk_path(key)
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(temp_path, 'wb') as cache_file:
+                    pickle.dump(results, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+                # Substituição atômica para não deixar arquivos pela metade
+                os.replace(temp_path, path)
+                with self._lock:
+                    self._evict_disk(keep=key)
+            except Exception as e:
+                logging.warning(f"Não foi possível gravar o cache em disco: {e}")
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+
+    def _evict_disk(self, keep=None):
+        # Remove os arquivos usados há mais tempo até o total caber em max_disk_bytes
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.pkl') and entry.is_file():
+                entry_stat = entry.stat()
+                entries.append((entry_stat.st_mtime, entry_stat.st_size, entry.name[:-len('.pkl')]))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in entries:
+            if total <= self.max_disk_bytes:
+                break
+            if key == keep:
+                continue
+            try:
+                os.remove(self._disk_path(key))
+            except OSError:
+                continue
+            total -= size
+            logging.info(f"Entrada {key[:12]} removida do cache de análises em disco")
+
+    def _store_in_memory(self, key, results):
+        self._entries[key] = results
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self, disk=False):
+        """Esvazia a camada em memória e, com disk=True, também a camada em disco."""
+        with self._lock:
+            self._entries.clear()
+        if disk and self.cache_dir:
+            for file_name in os.listdir(self.cache_dir):
+                if file_name.endswith('.pkl'):
+                    os.remove(os.path.join(self.cache_dir, file_name))
+
+    def stats(self):
+        """Contadores de acertos e falhas do cache."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "Acertos": self.hits,
+                "Acertos em Disco": self.disk_hits,
+                "Falhas": self.misses,
+                "Taxa de Acerto": self.hits / total if total else None,
+                "Entradas em Memória": len(self._entries),
+                "Bytes em Disco": sum(entry.stat().st_size for entry in os.scandir(self.cache_dir)
+                                      if entry.name.endswith('.pkl')) if self.cache_dir else 0,
+            }
+
+
+def cached_analyze_data(df, data_column_name=None, cache=None, **kwargs):
+    """
+    Executa analyze_data passando antes pelo cache. Dados e parâmetros idênticos retornam
+    o resultado guardado, sem refazer a análise nem a simulação de Monte Carlo.
+
+    Parâmetros:
+    - df, data_column_name, **kwargs: Como em analyze_data.
+    - cache: AnalysisCache a ser usado. Se None, chama analyze_data diretamente.
+
+    Retorno:
+    - O dicionário de resultados de analyze_data, ou None em caso de erro.
+    """
+    if cache is None or data_column_name not in df.columns:
+        return analyze_data(df, data_column_name, **kwargs)
+
+    values = pd.to_numeric(df[data_column_name], errors='coerce').dropna()
+    key = cache.make_key(values, data_column_name, kwargs)
+
+    results = cache.get(key)
+    if results is not None:
+        logging.info(f"Resultados da coluna {data_column_name} obtidos do cache")
+        return results
+
+    results = analyze_data(df, data_column_name, **kwargs)
+    if results is not None:
+        cache.put(key, results)
+    return results
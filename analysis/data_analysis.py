@@ -1,13 +1,55 @@
+import numpy as np
 import pandas as pd
-from scipy.stats import linregress
-from scipy.stats import skew
-from .monte_carlo import monte_carlo_simulation
+from .monte_carlo import monte_carlo_simulation, SimulationSummary
 from .recommendations import generate_recommendations
+from .online_stats import RunningStats
+from .bootstrap import bootstrap_confidence_intervals
 # Removida a importação de plot_histogram, pois agora usamos plot_boxplot em plots.py
 # from visualization.plots import plot_histogram  # Não é mais necessário
 import logging
+from contextlib import nullcontext
+from utils.jobs import report_progress
+from utils.tracing import Tracer, current_tracer, span
+
+def analyze_data(df, data_column_name=None, plot_histogram_flag=False, monte_carlo_storage=None,
+                 bootstrap_resamples=None, monte_carlo_mode='parametric', trace=False):
+    """
+    Analisa uma coluna numérica do DataFrame e retorna o dicionário de resultados.
+
+    O resultado da simulação de Monte Carlo é guardado como um SimulationSummary (quantis, momentos
+    e uma amostra para os gráficos). Use monte_carlo_storage='float32' ou 'memmap' para manter também
+    todas as projeções sorteadas.
+
+    Com bootstrap_resamples, o dicionário inclui em "Intervalos de Confiança" os intervalos de 95%
+    das métricas, obtidos com esse número de reamostragens.
+
+    monte_carlo_mode define o ruído da simulação: 'parametric' (normal com o desvio padrão da série),
+    'residual' (reamostra os resíduos da regressão) ou 'block' (reamostra blocos de resíduos
+    consecutivos, para séries autocorrelacionadas).
+
+    Com trace=True, a duração e o número de linhas de cada etapa são medidos e incluídos em
+    "Rastreamento" (se já houver um rastreador ativo, as etapas entram nele).
+    """
+    tracer = current_tracer()
+    activation = nullcontext()
+    if trace and tracer is None:
+        tracer = Tracer(f"analyze_data:{data_column_name}")
+        activation = tracer.activate()
+
+    with activation, span("analyze_data", Coluna=str(data_column_name)):
+        results = _analyze_data(df, data_column_name, plot_histogram_flag, monte_carlo_storage,
+                                bootstrap_resamples, monte_carlo_mode)
+
+    if trace and results is not None:
+        results["Rastreamento"] = tracer.to_dict()
+    return results
+
+
+def _analyze_data(df, data_column_name, plot_histogram_flag, monte_carlo_storage, bootstrap_resamples,
+                  monte_carlo_mode):
+    # O scipy.stats leva cerca de um segundo para importar: só é carregado na primeira análise
+    from scipy.stats import linregress, skew
 
-def analyze_data(df, data_column_name=None, plot_histogram_flag=False):
     try:
         logging.info("Iniciando a função analyze_data")
 
@@ -26,14 +68,16 @@ def analyze_data(df, data_column_name=None, plot_histogram_flag=False):
         # Obter os dados da coluna selecionada
         data_column = df[data_column_name]
 
-        # Converter para numérico, transformando erros em NaN
-        data_column = pd.to_numeric(data_column, errors='coerce')
+        with span("conversão numérica", Linhas=len(data_column)) as stage:
+            # Converter para numérico, transformando erros em NaN
+            data_column = pd.to_numeric(data_column, errors='coerce')
 
-        # Remover valores nulos resultantes da conversão
-        initial_count = len(data_column)
-        data_column = data_column.dropna()
-        final_count = len(data_column)
-        logging.info(f"Valores iniciais na coluna: {initial_count}, após remoção de NaN: {final_count}")
+            # Remover valores nulos resultantes da conversão
+            initial_count = len(data_column)
+            data_column = data_column.dropna()
+            final_count = len(data_column)
+            stage.set(**{"Linhas Válidas": final_count})
+            logging.info(f"Valores iniciais na coluna: {initial_count}, após remoção de NaN: {final_count}")
 
         # Verificar se há dados suficientes para análise
         if data_column.shape[0] < 2:
@@ -44,60 +88,24 @@ def analyze_data(df, data_column_name=None, plot_histogram_flag=False):
         dates = data_column.index
 
         # Cálculos de análise
-        mean_value = data_column.mean()
-        median_value = data_column.median()
-        max_value = data_column.max()
-        min_value = data_column.min()
-        ideal_value = mean_value * 1.618  # Proporção Áurea (Fibonacci)
-        tension_value = mean_value * 0.618  # Proporção de Tensão (Fibonacci)
-        pareto_80_20 = data_column.quantile(0.8)
-        std_dev = data_column.std()
-        coef_var = (std_dev / mean_value) * 100  # Cálculo do coeficiente de variação
-
-        logging.info(f"Média: {mean_value}, Mediana: {median_value}, Máximo: {max_value}, Mínimo: {min_value}")
-        logging.info(f"Valor Ideal Fibonacci: {ideal_value}, Valor de Tensão: {tension_value}")
-        logging.info(f"Pareto 80/20: {pareto_80_20}, Desvio Padrão: {std_dev}, Coeficiente de Variação: {coef_var}%")
+        report_progress(None, "estatísticas descritivas")
+        with span("estatísticas descritivas", Linhas=len(data_column)):
+            mean_value = data_column.mean()
+            median_value = data_column.median()
+            max_value = data_column.max()
+            min_value = data_column.min()
+            pareto_80_20 = data_column.quantile(0.8)
+            std_dev = data_column.std()
 
         # Análise de distribuição dos dados
-        skewness = skew(data_column)
-        logging.info(f"Assimetria dos dados (skewness): {skewness}")
-        if abs(skewness) > 1:
-            logging.warning("Os dados são altamente assimétricos, considere uma transformação antes de prosseguir com a análise.")
+        with span("assimetria", Linhas=len(data_column)):
+            skewness = skew(data_column)
 
         # Regressão linear para progressão simples
-        x_values = range(len(data_column))
-        slope, intercept, r_value, p_value, std_err = linregress(x_values, data_column)
-        future_projection = slope * (len(data_column) + 1) + intercept
-
-        logging.info(f"Slope: {slope}, Intercept: {intercept}, R-squared: {r_value ** 2}, P-value: {p_value}, Std Err: {std_err}")
-
-        # Validar o coeficiente de determinação (R-squared)
-        if r_value ** 2 < 0.5:
-            logging.warning("O ajuste linear tem um r-squared baixo, a projeção futura pode não ser precisa.")
-
-        logging.info(f"Projeção Futura: {future_projection}")
-
-        # Cálculo da Taxa de Crescimento Composta (CAGR) - Série Temporal (Dados Diários)
-        if len(data_column) > 1 and min_value > 0:
-            initial_value = data_column.iloc[0]
-            final_value = data_column.iloc[-1]
-            number_of_days = len(data_column)  # Número total de dias na série temporal
-            years = number_of_days / 365  # Convertendo dias para anos
-    
-            if years > 0:
-                cagr = ((final_value / initial_value) ** (1 / years) - 1) * 100
-            else:
-                cagr = None
-                logging.warning("Número de anos é zero após conversão. CAGR não pode ser calculado.")
-        else:
-            cagr = None
-            logging.warning("CAGR não pode ser calculado devido à falta de dados suficientes ou valores negativos/zero.")
-
-        logging.info(f"CAGR: {cagr}%")
-
-        # Simulação de Monte Carlo
-        simulated_projections = monte_carlo_simulation(slope, intercept, std_dev, len(data_column))
-        logging.info("Simulação de Monte Carlo concluída")
+        report_progress(None, "regressão")
+        with span("regressão", Linhas=len(data_column)):
+            x_values = range(len(data_column))
+            regression = linregress(x_values, data_column)
 
         # Geração de Box Plot se o plot_histogram_flag for True
         if plot_histogram_flag:
@@ -108,31 +116,176 @@ def analyze_data(df, data_column_name=None, plot_histogram_flag=False):
             # plot_boxplot(data_column, dates, column_name=data_column_name)
             pass  # Placeholder para evitar execução
 
-        # Recomendações baseadas nos resultados
-        recommendations = generate_recommendations(mean_value, ideal_value, tension_value, pareto_80_20, std_dev, future_projection)
-        logging.info("Geração de recomendações concluída")
+        residuals, block_size = _monte_carlo_noise(data_column, regression, monte_carlo_mode)
+
+        confidence_intervals = None
+        if bootstrap_resamples:
+            with span("bootstrap", Linhas=len(data_column), Reamostragens=bootstrap_resamples):
+                confidence_intervals = bootstrap_confidence_intervals(data_column.to_numpy(dtype='float64'),
+                                                                      n_resamples=bootstrap_resamples)
 
-        # Resultados
-        results = {
-            "Coluna Analisada": data_column_name,
-            "Média": mean_value,
-            "Mediana": median_value,
-            "Maior Valor": max_value,
-            "Menor Valor": min_value,
-            "Valor Ideal Fibonacci": ideal_value,
-            "Valor de Tensão": tension_value,
-            "Pareto 80/20": pareto_80_20,
-            "Desvio Padrão": std_dev,
-            "Coeficiente de Variação": coef_var,
-            "Projeção Futura": future_projection,
-            "CAGR": cagr,  # Incluímos a CAGR como métrica para séries temporais
-            "Simulação de Monte Carlo": simulated_projections,
-            "Recomendações": recommendations
-        }
-        logging.info("Análise de dados concluída com sucesso")
-        return results
+        return _compose_results(data_column_name, len(data_column), mean_value, median_value, max_value, min_value,
+                                pareto_80_20, std_dev, skewness, regression,
+                                data_column.iloc[0], data_column.iloc[-1],
+                                monte_carlo_storage=monte_carlo_storage,
+                                confidence_intervals=confidence_intervals,
+                                residuals=residuals, block_size=block_size)
 
     except Exception as e:
         logging.error(f"Erro ao analisar dados: {e}", exc_info=True)
         print(f"Erro ao analisar dados: {e}")
         return None
+
+
+def _monte_carlo_noise(data_column, regression, monte_carlo_mode):
+    """
+    Resíduos da regressão e tamanho do bloco usados pela simulação de Monte Carlo no modo escolhido.
+    """
+    if monte_carlo_mode == 'parametric':
+        return None, None
+    if monte_carlo_mode not in ('residual', 'block'):
+        raise ValueError(f"Modo de simulação de Monte Carlo desconhecido: {monte_carlo_mode}")
+
+    values = data_column.to_numpy(dtype='float64')
+    residuals = values - (regression.slope * np.arange(values.size) + regression.intercept)
+    if monte_carlo_mode == 'residual':
+        return residuals, None
+    # Regra usual para o bootstrap de blocos: tamanho proporcional a n^(1/3)
+    return residuals, max(2, int(round(values.size ** (1 / 3))))
+
+
+def analyze_stream(chunks, data_column_name, sketch_size=100_000):
+    """
+    Analisa uma série que chega em blocos (por exemplo, um CSV lido em partes), em uma única passada.
+    A memória fica limitada ao tamanho de um bloco mais o sketch de quantis; mediana e Pareto 80/20
+    são exatos enquanto a série couber no sketch e aproximados a partir daí.
+
+    Parâmetros:
+    - chunks: Iterável de blocos de valores (Series ou arrays), na ordem da série.
+    - data_column_name: Nome da coluna analisada (usado no dicionário de resultados).
+    - sketch_size: Capacidade do sketch de quantis.
+
+    Retorno:
+    - O mesmo dicionário de resultados de analyze_data, ou None em caso de erro.
+    """
+    try:
+        logging.info(f"Iniciando a análise em streaming da coluna {data_column_name}")
+
+        stats = RunningStats(sketch_size=sketch_size)
+        initial_count = 0
+        for chunk in chunks:
+            chunk = pd.to_numeric(pd.Series(chunk), errors='coerce')
+            initial_count += len(chunk)
+            stats.update(chunk.dropna().to_numpy(dtype='float64'))
+
+        logging.info(f"Valores iniciais na coluna: {initial_count}, após remoção de NaN: {stats.count}")
+        return analyze_running_stats(stats, data_column_name)
+
+    except Exception as e:
+        logging.error(f"Erro ao analisar dados em streaming: {e}", exc_info=True)
+        print(f"Erro ao analisar dados em streaming: {e}")
+        return None
+
+
+def analyze_running_stats(stats, data_column_name, quantiles=None):
+    """
+    Gera o dicionário de resultados de analyze_data a partir de um RunningStats já preenchido.
+    quantiles permite informar (mediana, Pareto 80/20) calculados por fora; caso contrário,
+    vêm do sketch de quantis.
+    """
+    if stats.count < 2:
+        logging.error("Dados insuficientes após remoção de valores não numéricos.")
+        raise ValueError("A coluna selecionada não contém dados numéricos suficientes para análise.")
+
+    if quantiles is None:
+        quantiles = stats.sketch.quantile([0.5, 0.8])
+    median_value, pareto_80_20 = quantiles
+    return _compose_results(data_column_name, stats.count, stats.mean, median_value, stats.max, stats.min,
+                            pareto_80_20, stats.std, stats.skewness, stats.linregress(),
+                            stats.first, stats.last)
+
+
+def _compose_results(data_column_name, data_length, mean_value, median_value, max_value, min_value,
+                     pareto_80_20, std_dev, skewness, regression, initial_value, final_value,
+                     monte_carlo_storage=None, confidence_intervals=None, residuals=None, block_size=None):
+    """
+    Etapas comuns a todos os modos de análise: métricas derivadas, CAGR, Monte Carlo,
+    recomendações e montagem do dicionário de resultados.
+    """
+    ideal_value = mean_value * 1.618  # Proporção Áurea (Fibonacci)
+    tension_value = mean_value * 0.618  # Proporção de Tensão (Fibonacci)
+    coef_var = (std_dev / mean_value) * 100  # Cálculo do coeficiente de variação
+
+    logging.info(f"Média: {mean_value}, Mediana: {median_value}, Máximo: {max_value}, Mínimo: {min_value}")
+    logging.info(f"Valor Ideal Fibonacci: {ideal_value}, Valor de Tensão: {tension_value}")
+    logging.info(f"Pareto 80/20: {pareto_80_20}, Desvio Padrão: {std_dev}, Coeficiente de Variação: {coef_var}%")
+
+    logging.info(f"Assimetria dos dados (skewness): {skewness}")
+    if abs(skewness) > 1:
+        logging.warning("Os dados são altamente assimétricos, considere uma transformação antes de prosseguir com a análise.")
+
+    slope, intercept, r_value, p_value, std_err = regression
+    future_projection = slope * (data_length + 1) + intercept
+
+    logging.info(f"Slope: {slope}, Intercept: {intercept}, R-squared: {r_value ** 2}, P-value: {p_value}, Std Err: {std_err}")
+
+    # Validar o coeficiente de determinação (R-squared)
+    if r_value ** 2 < 0.5:
+        logging.warning("O ajuste linear tem um r-squared baixo, a projeção futura pode não ser precisa.")
+
+    logging.info(f"Projeção Futura: {future_projection}")
+
+    # Cálculo da Taxa de Crescimento Composta (CAGR) - Série Temporal (Dados Diários)
+    if data_length > 1 and min_value > 0:
+        number_of_days = data_length  # Número total de dias na série temporal
+        years = number_of_days / 365  # Convertendo dias para anos
+
+        if years > 0:
+            cagr = ((final_value / initial_value) ** (1 / years) - 1) * 100
+        else:
+            cagr = None
+            logging.warning("Número de anos é zero após conversão. CAGR não pode ser calculado.")
+    else:
+        cagr = None
+        logging.warning("CAGR não pode ser calculado devido à falta de dados suficientes ou valores negativos/zero.")
+
+    logging.info(f"CAGR: {cagr}%")
+
+    # Simulação de Monte Carlo
+    with span("monte carlo"):
+        # No modo paramétrico, a assimetria escolhe o ruído (log-normal se |skewness| > 1); nos modos
+        # com resíduos ela é ignorada
+        simulated_projections = monte_carlo_simulation(slope, intercept, std_dev, int(data_length), skewness=skewness,
+                                                       residuals=residuals, block_size=block_size)
+        if simulated_projections is not None:
+            # Guardar apenas o resumo compacto em vez da matriz de projeções
+            simulated_projections = SimulationSummary.from_projections(simulated_projections, storage=monte_carlo_storage)
+        logging.info("Simulação de Monte Carlo concluída")
+
+    # Recomendações baseadas nos resultados
+    report_progress(None, "recomendações")
+    with span("recomendações"):
+        recommendations = generate_recommendations(mean_value, ideal_value, tension_value, pareto_80_20, std_dev, future_projection)
+        logging.info("Geração de recomendações concluída")
+
+    # Resultados
+    results = {
+        "Coluna Analisada": data_column_name,
+        "Média": mean_value,
+        "Mediana": median_value,
+        "Maior Valor": max_value,
+        "Menor Valor": min_value,
+        "Valor Ideal Fibonacci": ideal_value,
+        "Valor de Tensão": tension_value,
+        "Pareto 80/20": pareto_80_20,
+        "Desvio Padrão": std_dev,
+        "Coeficiente de Variação": coef_var,
+        "Projeção Futura": future_projection,
+        "CAGR": cagr,  # Incluímos a CAGR como métrica para séries temporais
+        "Simulação de Monte Carlo": simulated_projections,
+        "Recomendações": recommendations
+    }
+    if confidence_intervals is not None:
+        results["Intervalos de Confiança"] = confidence_intervals
+    logging.info("Análise de dados concluída com sucesso")
+    return results
@@ -4,70 +4,548 @@ import tkinter as tk
 from tkinter import filedialog
 import pandas as pd
 import json
+import csv
+import re
 import xml.etree.ElementTree as ET
 import logging
-import sqlite3  # Exemplo para conexo com SQLite
-# Importar outros conectores de banco de dados conforme necessrio
+import os
+import sqlite3  # Exemplo para conexão com SQLite
+import threading
+import time
+# Importar outros conectores de banco de dados conforme necessário
+from utils.jobs import report_progress
+from utils.tracing import span
 
-def import_file():
-    try:
-        root = tk.Tk()
-        root.withdraw()
-        file_path = filedialog.askopenfilename()
+def import_file(columns=None, numeric=False, cache=None):
+    """
+    Abre a janela de seleção de arquivo e importa o arquivo escolhido.
 
+    Parâmetros:
+    - columns, numeric: Como em load_file.
+    - cache: ImportCache opcional; arquivos já importados são reabertos do cache em disco.
+    """
+    try:
+        file_path = ask_file_path()
         if not file_path:
-            print("Nenhum arquivo selecionado.")
             return None
 
+        if cache is not None:
+            # Importação adiada: import_cache depende deste módulo
+            from .import_cache import cached_load_file
+            return cached_load_file(file_path, cache=cache, columns=columns, numeric=numeric)
+        return load_file(file_path, columns=columns, numeric=numeric)
+    except Exception as e:
+        logging.error(f"Erro ao importar arquivo: {e}")
+        print(f"Erro ao importar arquivo: {e}")
+        return None
+
+def ask_file_path():
+    """
+    Abre a janela de seleção de arquivo (deve ser chamada na thread principal).
+
+    Retorno:
+    - Caminho do arquivo escolhido, ou None se nenhum arquivo foi selecionado.
+    """
+    root = tk.Tk()
+    root.withdraw()
+    file_path = filedialog.askopenfilename()
+    root.destroy()
+
+    if not file_path:
+        print("Nenhum arquivo selecionado.")
+        return None
+    return file_path
+
+# Formatos colunares, lidos com pyarrow (dependência opcional)
+COLUMNAR_EXTENSIONS = ('.parquet', '.feather', '.arrow', '.ipc')
+
+def load_file(file_path, columns=None, row_groups=None, numeric=False):
+    """
+    Carrega um arquivo de dados em um DataFrame sem abrir nenhuma janela.
+    Usado pelo import_file e pelas execuções em lote (headless).
+
+    Parâmetros:
+    - file_path: Caminho do arquivo (.csv, .xlsx, .json, .xml, .parquet, .feather, .arrow ou .ipc).
+    - columns: Lista opcional de colunas a carregar; colunas ausentes no arquivo são ignoradas.
+      Em CSV, Excel e nos formatos colunares, as demais colunas nem chegam a ser lidas.
+    - row_groups: Lista opcional de row groups a ler (apenas Parquet).
+    - numeric: Se True, as colunas lidas de um CSV são convertidas para float64 durante a leitura
+      (valores não numéricos viram NaN, como em pd.to_numeric com errors='coerce').
+
+    Retorno:
+    - DataFrame com o conteúdo do arquivo.
+    """
+    wanted = set(columns) if columns is not None else None
+    usecols = (lambda column: column in wanted) if wanted is not None else None
+
+    report_progress(None, "importação")
+    with span("importação", Formato=os.path.splitext(file_path)[1]) as stage:
         if file_path.endswith('.csv'):
-            df = pd.read_csv(file_path, encoding='utf-8')
+            df = read_csv_fast(file_path, columns=columns, numeric=numeric)
         elif file_path.endswith('.xlsx'):
-            df = pd.read_excel(file_path)
+            df = pd.read_excel(file_path, usecols=usecols)
         elif file_path.endswith('.json'):
             df = pd.read_json(file_path, encoding='utf-8')
         elif file_path.endswith('.xml'):
-            df = parse_xml(file_path)
+            df = parse_xml(file_path, tags=columns)
+        elif file_path.endswith(COLUMNAR_EXTENSIONS):
+            df = read_columnar(file_path, columns=columns, row_groups=row_groups)
         else:
-            raise ValueError("Formato de arquivo nao suportado. Suporta .csv, .xlsx, .json, .xml.")
+            raise ValueError("Formato de arquivo nao suportado. Suporta .csv, .xlsx, .json, .xml, .parquet, .feather, .arrow.")
 
-        return df
-    except Exception as e:
-        logging.error(f"Erro ao importar arquivo: {e}")
-        print(f"Erro ao importar arquivo: {e}")
-        return None
+        if wanted is not None and df is not None:
+            df = df[[column for column in df.columns if column in wanted]]
+        if df is not None:
+            stage.set(Linhas=len(df), Colunas=len(df.columns))
+    return df
+
+# Tamanho dos blocos lidos por cada thread do leitor de CSV do pyarrow
+CSV_BLOCK_SIZE = 1 << 24
+
+def _deduplicate_names(names):
+    # Renomeia colunas repetidas como o pd.read_csv: a, a.1, a.2, pulando nomes que já existem no cabeçalho
+    taken = set(names)
+    seen = set()
+    counts = {}
+    result = []
+    for name in names:
+        if name in seen:
+            count = counts.get(name, 1)
+            while f"{name}.{count}" in taken:
+                count += 1
+            counts[name] = count + 1
+            name = f"{name}.{count}"
+            taken.add(name)
+        seen.add(name)
+        result.append(name)
+    return result
 
-def parse_xml(file_path):
+def read_csv_fast(file_path, columns=None, numeric=False):
+    """
+    Lê um CSV com o leitor multi-thread do pyarrow, lendo apenas as colunas pedidas e, com
+    numeric=True, já convertendo-as para float64 durante o parsing (sem inferência de tipos nem
+    nova conversão no analyze_data). Sem o pyarrow, usa o motor C do pandas com as mesmas
+    opções. Registra no log a taxa de leitura em linhas por segundo.
+
+    Parâmetros:
+    - file_path: Caminho do arquivo.
+    - columns: Lista opcional de colunas; colunas ausentes no arquivo são ignoradas.
+    - numeric: Se True, converte as colunas lidas para float64 (valores inválidos viram NaN).
+
+    Retorno:
+    - DataFrame com as colunas selecionadas.
+    """
+    start = time.perf_counter()
     try:
-        tree = ET.parse(file_path)
-        root = tree.getroot()
-        all_records = []
-
-        # Supondo que cada filho de root seja um registro
-        for elem in root:
-            record = {}
-            for subelem in elem:
-                record[subelem.tag] = subelem.text
-            all_records.append(record)
-
-        df = pd.DataFrame(all_records)
-        return df
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+    except ImportError:
+        pa = None
+
+    if pa is not None:
+        # Apenas o cabeçalho é lido aqui, para resolver as colunas pedidas. 'utf-8-sig' descarta o BOM
+        # dos CSVs exportados pelo Excel, e nomes repetidos são renomeados como no pandas (a, a.1)
+        with open(file_path, encoding='utf-8-sig', newline='') as csv_file:
+            names = _deduplicate_names(next(csv.reader(csv_file), []))
+        # Os nomes são passados ao pyarrow no lugar do cabeçalho do arquivo
+        read_options = pacsv.ReadOptions(use_threads=True, block_size=CSV_BLOCK_SIZE, encoding='utf-8',
+                                         column_names=names, skip_rows=1)
+        if columns is not None:
+            wanted = set(columns)
+            names = [column for column in names if column in wanted]
+
+        def read(column_type):
+            column_types = {column: column_type for column in names} if column_type is not None else None
+            convert_options = pacsv.ConvertOptions(include_columns=names, column_types=column_types)
+            return pacsv.read_csv(file_path, read_options=read_options,
+                                  convert_options=convert_options).to_pandas(split_blocks=True, self_destruct=True)
+
+        if not numeric:
+            df = read(None)
+        else:
+            try:
+                df = read(pa.float64())
+            except pa.ArrowInvalid:
+                # Há valores não numéricos: lemos como texto e convertemos uma única vez
+                logging.info("CSV com valores não numéricos; convertendo com pd.to_numeric")
+                df = read(pa.string()).apply(pd.to_numeric, errors='coerce')
+    else:
+        wanted = set(columns) if columns is not None else None
+        usecols = (lambda column: column in wanted) if wanted is not None else None
+        if not numeric:
+            df = pd.read_csv(file_path, encoding='utf-8', usecols=usecols, engine='c')
+        else:
+            try:
+                df = pd.read_csv(file_path, encoding='utf-8', usecols=usecols, engine='c', dtype='float64')
+            except ValueError:
+                logging.info("CSV com valores não numéricos; convertendo com pd.to_numeric")
+                df = pd.read_csv(file_path, encoding='utf-8', usecols=usecols, engine='c',
+                                 dtype=str).apply(pd.to_numeric, errors='coerce')
+
+    elapsed = time.perf_counter() - start
+    rows_per_second = len(df) / elapsed if elapsed > 0 else float('inf')
+    logging.info(f"CSV lido em {elapsed:.2f} s: {len(df)} linhas ({rows_per_second:,.0f} linhas/s), "
+                 f"{len(df.columns)} coluna(s)")
+    return df
+
+def read_columnar(file_path, columns=None, row_groups=None):
+    """
+    Lê arquivos Parquet, Feather ou Arrow IPC lendo apenas as colunas (e row groups) pedidos.
+    Os arquivos são mapeados em memória e a conversão para pandas evita cópias sempre que
+    possível: colunas numéricas sem nulos em um único bloco chegam ao analyze_data apontando
+    para os buffers do Arrow.
+
+    Parâmetros:
+    - file_path: Caminho do arquivo.
+    - columns: Lista opcional de colunas; colunas ausentes no arquivo são ignoradas.
+    - row_groups: Lista opcional de índices de row groups (apenas Parquet).
+
+    Retorno:
+    - DataFrame com as colunas selecionadas.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        import pyarrow.feather as feather
+    except ImportError:
+        raise ValueError("A leitura de arquivos Parquet/Feather/Arrow requer o pacote pyarrow.")
+
+    if file_path.endswith('.parquet'):
+        parquet_file = pq.ParquetFile(file_path, memory_map=True)
+        if columns is not None:
+            columns = [column for column in columns if column in parquet_file.schema_arrow.names]
+        if row_groups is not None:
+            table = parquet_file.read_row_groups(row_groups, columns=columns)
+        else:
+            table = parquet_file.read(columns=columns)
+    else:
+        if row_groups is not None:
+            raise ValueError("A seleção de row groups só é suportada em arquivos Parquet.")
+        if columns is not None:
+            names = _ipc_column_names(file_path)
+            columns = [column for column in columns if column in names]
+        # O read_table do pyarrow.feather lê tanto o Feather v2 (Arrow IPC) quanto o antigo Feather v1
+        table = feather.read_table(file_path, columns=columns, memory_map=True)
+
+    logging.info(f"Arquivo colunar lido: {table.num_rows} linhas, {table.num_columns} coluna(s)")
+    # split_blocks evita consolidar as colunas em um único bloco (o que exigiria cópia)
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+def read_column_names(file_path):
+    """
+    Lê apenas os nomes das colunas de um arquivo CSV (cabeçalho) ou colunar (esquema), sem
+    carregar os dados. Os nomes são os mesmos que load_file daria às colunas.
+
+    Parâmetros:
+    - file_path: Caminho do arquivo.
+
+    Retorno:
+    - Lista de nomes, ou None para formatos em que isso exigiria ler o arquivo inteiro (Excel, JSON, XML).
+    """
+    if file_path.endswith('.csv'):
+        with open(file_path, encoding='utf-8-sig', newline='') as csv_file:
+            return _deduplicate_names(next(csv.reader(csv_file), []))
+    if file_path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        return list(pq.read_schema(file_path).names)
+    if file_path.endswith(COLUMNAR_EXTENSIONS):
+        return _ipc_column_names(file_path)
+    return None
+
+def _ipc_column_names(file_path):
+    # Nomes das colunas de um arquivo Feather/Arrow IPC, lidos do esquema
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    try:
+        with pa.memory_map(file_path) as source:
+            return list(pa.ipc.open_file(source).schema.names)
+    except pa.ArrowInvalid:
+        # Feather v1 não é um arquivo Arrow IPC: os nomes vêm da leitura (mapeada em memória) do arquivo
+        return list(feather.read_table(file_path, memory_map=True).column_names)
+
+def iter_csv_chunks(file_path, column_name, chunksize=1_000_000):
+    """
+    Lê uma coluna de um arquivo CSV em blocos de tamanho limitado, para arquivos maiores que a memória.
+    Cada bloco já vem convertido para numérico, sem os valores inválidos.
+
+    Parâmetros:
+    - file_path: Caminho do arquivo .csv.
+    - column_name: Coluna a ser lida; as demais colunas não são carregadas.
+    - chunksize: Número máximo de linhas por bloco.
+
+    Retorno:
+    - Gerador de Series numéricas, na ordem do arquivo.
+    """
+    reader = pd.read_csv(file_path, encoding='utf-8', usecols=[column_name], chunksize=chunksize)
+    with reader:
+        for chunk in reader:
+            report_progress(None, "importação")
+            yield pd.to_numeric(chunk[column_name], errors='coerce').dropna()
+
+# Tamanho dos blocos lidos do arquivo XML
+XML_READ_SIZE = 1 << 20
+
+def parse_xml(file_path, tags=None, batch_size=50_000):
+    """
+    Lê um arquivo XML de forma incremental, em que cada filho da raiz é um registro e cada
+    subelemento é um campo. O parser é alimentado em blocos e entrega os campos diretamente
+    (sem montar a árvore XML), e os registros são convertidos em colunas tipadas a cada lote,
+    então a memória usada fica próxima à do DataFrame final. O tipo de cada coluna é o mesmo em
+    todos os lotes: uma coluna é numérica só se todos os seus valores forem números sem zeros à
+    esquerda (códigos como "00123" continuam texto).
+
+    Parâmetros:
+    - file_path: Caminho do arquivo .xml.
+    - tags: Lista opcional de campos a extrair; os demais são ignorados.
+    - batch_size: Número de registros convertidos por lote.
+
+    Retorno:
+    - DataFrame com uma coluna por campo (numérica quando todos os valores são números), ou None em caso de erro.
+    """
+    try:
+        target = _XMLRecordTarget(tags, batch_size)
+        parser = ET.XMLParser(target=target)
+        with open(file_path, 'rb') as xml_file:
+            for block in iter(lambda: xml_file.read(XML_READ_SIZE), b''):
+                parser.feed(block)
+        parser.close()
+
+        frames = target.frames
+        if target.batch or not frames:
+            target.flush()
+        return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
     except Exception as e:
         logging.error(f"Erro ao analisar arquivo XML: {e}")
         print(f"Erro ao analisar arquivo XML: {e}")
         return None
 
-def import_from_database(db_type, connection_params, query):
+class _XMLRecordTarget:
+    """
+    Alvo do XMLParser que monta os registros campo a campo: profundidade 1 é a raiz,
+    2 é o registro e 3 é o campo (o texto de um campo é o texto antes do seu primeiro filho,
+    como o atributo text do ElementTree).
+    """
+
+    def __init__(self, tags, batch_size):
+        self.wanted = set(tags) if tags is not None else None
+        self.batch_size = batch_size
+        self.frames = []
+        # Tipo decidido para cada coluna ('numeric' ou 'text'), mantido entre os lotes
+        self.kinds = {}
+        self.batch = []
+        self.record = None
+        self.depth = 0
+        self.text = None
+        self.collect = False
+
+    def start(self, tag, attrib):
+        self.depth += 1
+        if self.depth == 2:
+            self.record = {}
+        elif self.depth == 3:
+            self.collect = self.wanted is None or tag in self.wanted
+            self.text = []
+        elif self.depth > 3:
+            self.collect = False
+
+    def data(self, data):
+        if self.collect:
+            self.text.append(data)
+
+    def end(self, tag):
+        if self.depth == 3:
+            if self.wanted is None or tag in self.wanted:
+                self.record[tag] = ''.join(self.text) if self.text else None
+            self.collect = False
+        elif self.depth == 2:
+            self.batch.append(self.record)
+            if len(self.batch) >= self.batch_size:
+                self.flush()
+        self.depth -= 1
+
+    def close(self):
+        return None
+
+    def flush(self):
+        """
+        Converte o lote atual em um DataFrame. O primeiro lote com valores decide o tipo da coluna;
+        se um lote seguinte tiver texto numa coluna numérica, ela passa a ser texto também nos lotes
+        anteriores (os números voltam a texto na forma do pandas, por exemplo "1.5" para "1.50").
+        """
+        batch_df = pd.DataFrame(self.batch)
+        self.batch = []
+        for column in batch_df.columns:
+            kind = self.kinds.get(column)
+            if kind == 'text':
+                continue
+            values = batch_df[column]
+            if values.isna().all():
+                # Sem valores, o lote não decide o tipo
+                if kind == 'numeric':
+                    batch_df[column] = pd.to_numeric(values)
+                continue
+            numeric = _to_numeric_or_none(values)
+            if numeric is not None:
+                batch_df[column] = numeric
+                self.kinds[column] = 'numeric'
+                continue
+            self.kinds[column] = 'text'
+            for frame in self.frames:
+                if column in frame.columns:
+                    frame[column] = frame[column].astype('str')
+        self.frames.append(batch_df)
+
+def _to_numeric_or_none(values):
+    # Valores numéricos da coluna, ou None se algum valor for texto ou tiver zeros à esquerda
+    text = values.dropna().astype('str')
+    if text.str.match(r'\s*[+-]?0\d').any():
+        return None
     try:
-        if db_type == 'sqlite':
-            conn = sqlite3.connect(connection_params['database'])
-        # Adicionar suporte para outros bancos de dados, como PostgreSQL ou MySQL
-        else:
-            raise ValueError("Tipo de banco de dados nao suportado.")
+        return pd.to_numeric(values)
+    except (ValueError, TypeError):
+        return None
+
+# Conexões reaproveitadas entre chamadas, uma por banco e por thread (conexões sqlite3 não
+# devem ser compartilhadas entre threads)
+_connections = {}
+_connections_lock = threading.Lock()
 
+def get_connection(db_type, connection_params):
+    """
+    Retorna uma conexão aberta para o banco, reaproveitando a conexão já aberta pela thread atual.
+
+    Parâmetros:
+    - db_type: Tipo do banco (atualmente 'sqlite').
+    - connection_params: Dicionário com os parâmetros de conexão (para sqlite, 'database').
+    """
+    if db_type == 'sqlite':
+        key = (db_type, connection_params['database'], threading.get_ident())
+        with _connections_lock:
+            conn = _connections.get(key)
+            if conn is None:
+                conn = sqlite3.connect(connection_params['database'])
+                _connections[key] = conn
+        return conn
+    # Adicionar suporte para outros bancos de dados, como PostgreSQL ou MySQL
+    raise ValueError("Tipo de banco de dados nao suportado.")
+
+def close_connections():
+    """Fecha todas as conexões reaproveitadas."""
+    with _connections_lock:
+        for conn in _connections.values():
+            try:
+                conn.close()
+            except Exception as e:
+                logging.warning(f"Erro ao fechar conexão com o banco de dados: {e}")
+        _connections.clear()
+
+def import_from_database(db_type, connection_params, query):
+    try:
+        conn = get_connection(db_type, connection_params)
         df = pd.read_sql_query(query, conn)
-        conn.close()
         return df
     except Exception as e:
         logging.error(f"Erro ao conectar ao banco de dados: {e}")
         print(f"Erro ao conectar ao banco de dados: {e}")
         return None
+
+def iter_query_chunks(db_type, connection_params, query, chunksize=100_000):
+    """
+    Executa a consulta e entrega o resultado em DataFrames de no máximo chunksize linhas,
+    para alimentar a análise em streaming sem carregar o resultado inteiro.
+    """
+    conn = get_connection(db_type, connection_params)
+    for chunk in pd.read_sql_query(query, conn, chunksize=chunksize):
+        report_progress(None, "consulta")
+        yield chunk
+
+def _quote_identifier(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+# Tabela temporária com os valores do resultado da consulta, na ordem da consulta
+PUSHDOWN_TABLE = "temp._pushdown_vals"
+
+def pushdown_statistics(db_type, connection_params, query, column_name):
+    """
+    Calcula dentro do banco as estatísticas suficientes de uma coluna do resultado da consulta,
+    para que apenas alguns números atravessem a conexão: contagem, média, mínimo, máximo,
+    somas dos quadrados e dos cubos dos desvios, co-momento com o índice da linha (regressão),
+    primeiro/último valor, mediana e percentil 80 (interpolação linear, como o pandas).
+
+    A consulta é executada uma única vez: os valores numéricos são gravados numa tabela temporária
+    com um ordinal (INTEGER PRIMARY KEY) atribuído na ordem em que a consulta os entrega, e as
+    passagens seguintes leem só essa tabela. Os desvios são calculados em relação à média obtida
+    na primeira passagem, o que evita a perda de precisão das somas de potências brutas, e os dois
+    quantis saem de uma única ordenação. Apenas valores armazenados como números (inteiros ou
+    reais) entram na análise.
+
+    A regressão e o primeiro/último valor dependem da ordem das linhas, então a consulta deve ter
+    ORDER BY (por exemplo, pela data); sem ele, o SQLite não garante ordem nenhuma e um aviso é registrado.
+
+    A conexão é a reaproveitada da thread (get_connection), que pode ter uma transação do chamador
+    em aberto: o trabalho temporário fica num SAVEPOINT, desfeito ao final, e nada é confirmado
+    (commit) em nome do chamador.
+
+    Retorno:
+    - Dicionário com as estatísticas, ou None se não houver valores numéricos.
+    """
+    if db_type != 'sqlite':
+        raise ValueError("O modo push-down só é suportado para sqlite.")
+    # A consulta vira uma subconsulta: o ';' final (e espaços) a tornaria inválida
+    query = re.sub(r'[\s;]+$', '', query)
+    if not re.search(r'\border\s+by\b', query, re.IGNORECASE):
+        logging.warning("A consulta não tem ORDER BY: a ordem das linhas (regressão, primeiro e último valor) "
+                        "não é garantida pelo banco.")
+
+    conn = get_connection(db_type, connection_params)
+    # Dentro de uma transação do chamador, o SAVEPOINT é aninhado nela; fora, ele abre a própria
+    # transação, que o RELEASE encerra (liberando o banco principal)
+    conn.execute("SAVEPOINT pushdown")
+    try:
+        conn.execute(f"DROP TABLE IF EXISTS {PUSHDOWN_TABLE}")
+        conn.execute(f"CREATE TABLE {PUSHDOWN_TABLE} (x INTEGER PRIMARY KEY, y REAL NOT NULL)")
+        conn.execute(
+            f"INSERT INTO {PUSHDOWN_TABLE} (y)"
+            f" SELECT CAST(v AS REAL) FROM (SELECT {_quote_identifier(column_name)} AS v FROM ({query}))"
+            " WHERE typeof(v) IN ('integer', 'real')")
+
+        count, mean, minimum, maximum, first_x, last_x = conn.execute(
+            f"SELECT COUNT(*), AVG(y), MIN(y), MAX(y), MIN(x), MAX(x) FROM {PUSHDOWN_TABLE}").fetchone()
+        if not count:
+            return None
+        first = conn.execute(f"SELECT y FROM {PUSHDOWN_TABLE} WHERE x = ?", (first_x,)).fetchone()[0]
+        last = conn.execute(f"SELECT y FROM {PUSHDOWN_TABLE} WHERE x = ?", (last_x,)).fetchone()[0]
+
+        # O ordinal é sequencial a partir de first_x; o índice da regressão é x - first_x
+        mean_x = (count - 1) / 2.0
+        m2, m3, sxy = conn.execute(
+            f"SELECT SUM((y - :mean) * (y - :mean)), SUM((y - :mean) * (y - :mean) * (y - :mean)),"
+            f" SUM((x - :first_x - :mean_x) * (y - :mean)) FROM {PUSHDOWN_TABLE}",
+            {"mean": mean, "mean_x": mean_x, "first_x": first_x}).fetchone()
+
+        # Mediana e percentil 80: as posições vizinhas de cada quantil, numa única ordenação
+        positions = {q: (count - 1) * q for q in (0.5, 0.8)}
+        ranks = sorted({rank for position in positions.values()
+                        for rank in (int(position), min(int(position) + 1, count - 1))})
+        placeholders = ", ".join("?" * len(ranks))
+        ordered = dict(conn.execute(
+            f"SELECT r, y FROM (SELECT y, ROW_NUMBER() OVER (ORDER BY y) - 1 AS r FROM {PUSHDOWN_TABLE})"
+            f" WHERE r IN ({placeholders})", ranks).fetchall())
+    finally:
+        # Desfaz a tabela temporária sem tocar no que o chamador fez antes do SAVEPOINT
+        conn.execute("ROLLBACK TO pushdown")
+        conn.execute("RELEASE pushdown")
+
+    def quantile(q):
+        position = positions[q]
+        lower = int(position)
+        if position == lower or lower + 1 >= count:
+            return ordered[lower]
+        return ordered[lower] + (ordered[lower + 1] - ordered[lower]) * (position - lower)
+
+    return {
+        "count": count, "mean": mean, "min": minimum, "max": maximum,
+        "m2": m2, "m3": m3, "sxy": sxy, "first": first, "last": last,
+        "median": quantile(0.5), "pareto_80_20": quantile(0.8),
+    }
@@ -0,0 +1,54 @@
+import logging
+
+from .data_analysis import analyze_stream, analyze_running_stats
+from .data_import import iter_query_chunks, pushdown_statistics
+from .online_stats import RunningStats
+
+
+def analyze_database_column(db_type, connection_params, query, data_column_name, mode='pushdown',
+                            chunksize=100_000, sketch_size=100_000):
+    """
+    Analisa uma coluna do resultado de uma consulta sem carregar a tabela inteira em memória.
+
+    No modo 'pushdown', contagem, média, mínimo/máximo, somas dos desvios e as somas da regressão
+    (e também a mediana e o Pareto 80/20) são calculados dentro do banco, e apenas alguns números
+    atravessam a conexão. No modo 'chunked', o resultado é lido em blocos de chunksize linhas e
+    alimenta a análise em streaming (mediana e Pareto vêm do sketch de quantis).
+
+    Parâmetros:
+    - db_type: Tipo do banco (atualmente 'sqlite').
+    - connection_params: Dicionário com os parâmetros de conexão (para sqlite, 'database').
+    - query: Consulta SQL cujo resultado contém a coluna.
+    - data_column_name: Coluna a ser analisada.
+    - mode: 'pushdown' ou 'chunked'.
+    - chunksize: Linhas por bloco no modo 'chunked'.
+    - sketch_size: Capacidade do sketch de quantis no modo 'chunked'.
+
+    Retorno:
+    - O mesmo dicionário de resultados de analyze_data, ou None em caso de erro.
+    """
+    try:
+        logging.info(f"Iniciando a análise da coluna {data_column_name} no banco ({mode})")
+
+        if mode == 'chunked':
+            chunks = (chunk[data_column_name]
+                      for chunk in iter_query_chunks(db_type, connection_params, query, chunksize))
+            return analyze_stream(chunks, data_column_name, sketch_size=sketch_size)
+
+        if mode != 'pushdown':
+            raise ValueError(f"Modo de análise do banco desconhecido: {mode}")
+
+        sums = pushdown_statistics(db_type, connection_params, query, data_column_name)
+        if sums is None:
+            raise ValueError("A coluna selecionada não contém dados numéricos suficientes para análise.")
+
+        stats = RunningStats.from_moments(sums["count"], sums["mean"], sums["m2"], sums["m3"],
+                                          sums["min"], sums["max"], sums["first"], sums["last"], sums["sxy"])
+        logging.info(f"Estatísticas calculadas no banco para {stats.count} valor(es)")
+        return analyze_running_stats(stats, data_column_name,
+                                     quantiles=(sums["median"], sums["pareto_80_20"]))
+
+    except Exception as e:
+        logging.error(f"Erro ao analisar dados do banco: {e}", exc_info=True)
+        print(f"Erro ao analisar dados do banco: {e}")
+        return None
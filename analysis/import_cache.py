@@ -0,0 +1,201 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import shutil
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from .data_import import load_file
+
+MANIFEST_NAME = "manifest.json"
+OTHER_COLUMNS_NAME = "outras_colunas.pkl"
+
+
+class ImportCache:
+    """
+    Cache em disco dos arquivos já importados. As colunas numéricas (e de datas) são gravadas
+    em formato binário (.npy, uma por coluna) e abertas com memory-map na leitura, de modo que
+    reabrir um CSV ou Excel grande não exige novo parsing; as demais colunas e o índice vão
+    para um pickle ao lado. A chave combina caminho, tamanho, data de modificação (mtime_ns)
+    e as opções de leitura, então qualquer alteração no arquivo invalida a entrada.
+    Quando o tamanho total passa de max_bytes, as entradas usadas há mais tempo são removidas.
+
+    Parâmetros:
+    - cache_dir: Diretório do cache.
+    - max_bytes: Tamanho máximo ocupado pelo cache em disco.
+    """
+
+    def __init__(self, cache_dir, max_bytes=2 * 1024 ** 3):
+        if max_bytes <= 0:
+            raise ValueError("O tamanho máximo do cache de importação deve ser positivo.")
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(file_path, options=None):
+        """
+        Calcula a chave do arquivo: caminho absoluto, tamanho, mtime_ns e opções de leitura.
+        """
+        file_stat = os.stat(file_path)
+        digest = hashlib.sha256()
+        digest.update(os.path.abspath(file_path).encode('utf-8'))
+        digest.update(f"{file_stat.st_size}:{file_stat.st_mtime_ns}".encode('utf-8'))
+        digest.update(repr(sorted((options or {}).items())).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def get(self, file_path, options=None):
+        """Retorna o DataFrame guardado para o arquivo, ou None se não estiver no cache."""
+        entry_dir = self._entry_dir(self.make_key(file_path, options))
+        manifest_path = os.path.join(entry_dir, MANIFEST_NAME)
+        if not os.path.exists(manifest_path):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        try:
+            with open(manifest_path, encoding='utf-8') as manifest_file:
+                manifest = json.load(manifest_file)
+            with open(os.path.join(entry_dir, OTHER_COLUMNS_NAME), 'rb') as other_file:
+                other = pickle.load(other_file)
+            numeric = {
+                column["nome"]: np.load(os.path.join(entry_dir, column["arquivo"]), mmap_mode='r')
+                for column in manifest["colunas_numericas"]
+            }
+        except Exception as e:
+            logging.warning(f"Entrada do cache de importação ilegível, ignorando: {e}")
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # copy=False mantém as colunas apontando para os arquivos mapeados em memória
+        df = pd.DataFrame(numeric, index=other.index, copy=False)
+        for column in other.columns:
+            df[column] = other[column]
+        df = df[manifest["ordem"]]
+
+        # O mtime do manifesto marca o último uso (política LRU)
+        os.utime(manifest_path)
+        with self._lock:
+            self.hits += 1
+        return df
+
+    def put(self, file_path, df, options=None):
+        """Grava o DataFrame importado do arquivo no cache e aplica o limite de tamanho."""
+        key = self.make_key(file_path, options)
+        entry_dir = self._entry_dir(key)
+        temp_dir = f"{entry_dir}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(temp_dir, exist_ok=True)
+            numeric_columns = []
+            other_columns = []
+            for position, column in enumerate(df.columns):
+                dtype = df[column].dtype
+                if isinstance(dtype, np.dtype) and dtype.kind in 'iufbmM':
+                    file_name = f"coluna_{position}.npy"
+                    np.save(os.path.join(temp_dir, file_name), df[column].to_numpy())
+                    numeric_columns.append({"nome": column, "arquivo": file_name})
+                else:
+                    other_columns.append(column)
+
+            with open(os.path.join(temp_dir, OTHER_COLUMNS_NAME), 'wb') as other_file:
+                pickle.dump(df[other_columns], other_file, protocol=pickle.HIGHEST_PROTOCOL)
+            manifest = {
+                "arquivo": os.path.abspath(file_path),
+                "linhas": len(df),
+                "ordem": list(df.columns),
+                "colunas_numericas": numeric_columns,
+                "opcoes": repr(sorted((options or {}).items())),
+            }
+            # O manifesto é gravado por último: entradas sem ele estão incompletas
+            with open(os.path.join(temp_dir, MANIFEST_NAME), 'w', encoding='utf-8') as manifest_file:
+                json.dump(manifest, manifest_file, ensure_ascii=False)
+
+            with self._lock:
+                if os.path.exists(entry_dir):
+                    shutil.rmtree(entry_dir, ignore_errors=True)
+                os.replace(temp_dir, entry_dir)
+                self._evict(keep=key)
+        except Exception as e:
+            logging.warning(f"Não foi possível gravar o cache de importação: {e}")
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def _entries(self):
+        # (último uso, tamanho em bytes, chave) de cada entrada completa
+        entries = []
+        for key in os.listdir(self.cache_dir):
+            entry_dir = self._entry_dir(key)
+            manifest_path = os.path.join(entry_dir, MANIFEST_NAME)
+            if key.endswith('.tmp') or not os.path.exists(manifest_path):
+                continue
+            size = sum(entry.stat().st_size for entry in os.scandir(entry_dir) if entry.is_file())
+            entries.append((os.stat(manifest_path).st_mtime, size, key))
+        return entries
+
+    def _evict(self, keep=None):
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in entries:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            # No Windows, arquivos ainda mapeados não podem ser removidos; ficam para a próxima vez
+            shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+            total -= size
+            logging.info(f"Entrada {key[:12]} removida do cache de importação")
+
+    def clear(self):
+        """Remove todas as entradas do cache."""
+        with self._lock:
+            for key in os.listdir(self.cache_dir):
+                shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+
+    def stats(self):
+        """Contadores de acertos e falhas e o tamanho ocupado em disco."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "Acertos": self.hits,
+                "Falhas": self.misses,
+                "Taxa de Acerto": self.hits / total if total else None,
+                "Bytes em Disco": sum(size for _, size, _ in self._entries()),
+            }
+
+
+def cached_load_file(file_path, cache=None, **options):
+    """
+    Executa load_file passando antes pelo cache de importação.
+
+    Parâmetros:
+    - file_path, **options: Como em load_file.
+    - cache: ImportCache a ser usado. Se None, chama load_file diretamente.
+
+    Retorno:
+    - DataFrame com o conteúdo do arquivo.
+    """
+    if cache is None:
+        return load_file(file_path, **options)
+
+    start = time.perf_counter()
+    df = cache.get(file_path, options)
+    if df is not None:
+        logging.info(f"Arquivo {file_path} obtido do cache de importação em "
+                     f"{time.perf_counter() - start:.3f} s")
+        return df
+
+    df = load_file(file_path, **options)
+    if df is not None:
+        cache.put(file_path, df, options)
+    return df
@@ -0,0 +1,83 @@
+import logging
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from .data_analysis import analyze_running_stats
+from .online_stats import RunningStats
+
+
+class IncrementalAnalysis:
+    """
+    Estado persistente da análise de uma série que cresce com o tempo. Guarda apenas estatísticas
+    suficientes (contagem, momentos, co-momentos da regressão, mínimo/máximo, primeiro/último
+    valor e um sketch de quantis), de modo que cada append atualiza os resultados em tempo
+    proporcional às novas linhas, sem reprocessar o histórico.
+
+    Parâmetros:
+    - data_column_name: Nome da coluna analisada (usado no dicionário de resultados).
+    - sketch_size: Capacidade do sketch de quantis (mediana e Pareto 80/20 são exatos até esse tamanho).
+    """
+
+    def __init__(self, data_column_name, sketch_size=100_000):
+        self.data_column_name = data_column_name
+        self.stats = RunningStats(sketch_size=sketch_size)
+        self.results = None
+
+    @classmethod
+    def from_dataframe(cls, df, data_column_name, sketch_size=100_000):
+        """Cria o estado a partir do histórico completo de uma coluna do DataFrame."""
+        if data_column_name not in df.columns:
+            raise ValueError(f"A coluna '{data_column_name}' não existe no DataFrame.")
+        state = cls(data_column_name, sketch_size=sketch_size)
+        state.append(df[data_column_name])
+        return state
+
+    def append(self, new_values):
+        """
+        Incorpora novos valores ao final da série e atualiza os resultados.
+
+        Parâmetros:
+        - new_values: Novos valores (lista, array ou Series), na ordem da série. Valores não numéricos são ignorados.
+
+        Retorno:
+        - O dicionário de resultados atualizado (como em analyze_data), ou None se ainda não
+          houver dados suficientes ou em caso de erro.
+        """
+        try:
+            values = np.asarray(new_values) if not isinstance(new_values, pd.Series) else new_values.to_numpy()
+            if values.dtype.kind not in 'iuf':
+                # Só passamos pelo pandas quando é preciso converter valores não numéricos
+                values = pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype='float64')
+            values = values.astype('float64', copy=False).ravel()
+            values = values[~np.isnan(values)]
+            self.stats.update(values)
+            logging.info(f"{len(values)} valor(es) incorporado(s) à coluna {self.data_column_name}; "
+                         f"total: {self.stats.count}")
+
+            if self.stats.count < 2:
+                logging.warning("Dados insuficientes para atualizar a análise.")
+                return None
+
+            self.results = analyze_running_stats(self.stats, self.data_column_name)
+            return self.results
+
+        except Exception as e:
+            logging.error(f"Erro ao atualizar a análise incremental: {e}", exc_info=True)
+            print(f"Erro ao atualizar a análise incremental: {e}")
+            return None
+
+    def save(self, path):
+        """Grava o estado em disco para continuar a série em outra execução."""
+        with open(path, 'wb') as state_file:
+            pickle.dump(self, state_file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(path):
+        """Carrega um estado gravado com save."""
+        with open(path, 'rb') as state_file:
+            state = pickle.load(state_file)
+        if not isinstance(state, IncrementalAnalysis):
+            raise ValueError(f"O arquivo {path} não contém um estado de análise incremental.")
+        return state
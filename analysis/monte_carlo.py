@@ -1,11 +1,72 @@
 import numpy as np
 import logging
+import os
+import tempfile
+import weakref
+from .online_stats import ReservoirSample
+from utils.jobs import report_progress
 
-def monte_carlo_simulation(slope, intercept, std_dev, data_length, skewness=0, n_simulations=1000, projection_steps=1):
+# Número máximo de valores simulados mantidos em memória por bloco no modo de resumo por quantis
+SUMMARY_BLOCK_VALUES = 2 ** 24
+
+# Número de valores simulados por bloco na simulação paralela. O tamanho do bloco não depende do
+# número de processos, o que garante o mesmo resultado para a mesma semente com qualquer paralelismo
+PARALLEL_BLOCK_VALUES = 2 ** 22
+
+# Número de faixas do histograma usado para os quantis na simulação paralela
+HISTOGRAM_BINS = 1024
+
+# Níveis dos quantis exatos e tamanho da amostra guardados no resumo da simulação
+SUMMARY_QUANTILES = (0.01, 0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99)
+SUMMARY_SAMPLE_SIZE = 10_000
+
+
+def _resample_positions(rng, count, size):
+    # Posições uniformes em 0..count-1 a partir de rng.random: cada valor consome exatamente um
+    # sorteio, então sortear em blocos de períodos reproduz o sorteio da matriz inteira
+    positions = rng.random(size)
+    positions *= count
+    return positions.astype(np.intp)
+
+
+def _draw_noise(rng, std_dev, skewness, size, residuals=None, block_size=None):
+    """
+    Sorteia a matriz de ruídos (períodos x simulações).
+
+    Sem residuals, o ruído é paramétrico (normal, ou log-normal para dados muito assimétricos).
+    Com residuals, o ruído é reamostrado dos resíduos empíricos da regressão: cada valor é um
+    resíduo sorteado com reposição ou, com block_size, cada simulação percorre blocos de
+    block_size resíduos consecutivos com inícios sorteados (bootstrap de blocos móveis, que
+    preserva a autocorrelação de curto prazo). Em ambos os casos é uma única indexação
+    vetorizada, sem laço por período.
+    """
+    if residuals is not None:
+        steps, n_simulations = size
+        if not block_size or block_size <= 1:
+            return residuals[_resample_positions(rng, residuals.size, size)]
+        # Blocos móveis: inícios sorteados por (bloco, simulação), expandidos em block_size períodos consecutivos
+        n_blocks = -(-steps // block_size)
+        starts = _resample_positions(rng, residuals.size - block_size + 1, (n_blocks, 1, n_simulations))
+        positions = starts + np.arange(block_size)[np.newaxis, :, np.newaxis]
+        return residuals[positions.reshape(n_blocks * block_size, n_simulations)[:steps]]
+
+    # Se os dados forem assimétricos, usamos uma distribuição log-normal ajustada
+    if abs(skewness) > 1:
+        # Ajustamos a simulação para valores não negativos com desvio padrão adequado
+        return rng.lognormal(mean=0, sigma=np.log(1 + std_dev), size=size)
+    # Se não houver assimetria significativa, usamos a distribuição normal
+    return rng.normal(loc=0, scale=std_dev, size=size)
+
+
+def monte_carlo_simulation(slope, intercept, std_dev, data_length, skewness=0, n_simulations=1000, projection_steps=1,
+                           seed=None, summary_quantiles=None, residuals=None, block_size=None):
     """
     Realiza uma simulação de Monte Carlo para projetar valores futuros com base em
     uma regressão linear e um desvio padrão para aleatoriedade.
 
+    Cada simulação é uma trajetória: os ruídos de todos os períodos são sorteados de uma vez
+    e acumulados ao longo dos períodos, somados à tendência da regressão.
+
     Parâmetros:
     - slope: Inclinação da linha de regressão.
     - intercept: Intercepto da linha de regressão.
@@ -14,15 +75,25 @@ def monte_carlo_simulation(slope, intercept, std_dev, data_length, skewness=0, n
     - skewness: Assimetria (skewness) dos dados. Utilizado para ajustar a distribuição normal se for assimétrica.
     - n_simulations: Número de simulações de Monte Carlo.
     - projection_steps: Número de períodos no futuro que se deseja projetar.
+    - seed: Semente do gerador aleatório (int, SeedSequence ou Generator). A mesma semente reproduz o resultado.
+    - summary_quantiles: Lista opcional de quantis (entre 0 e 1). Se informada, retorna apenas esses
+      quantis por período, processando as trajetórias em blocos para limitar a memória.
+    - residuals: Resíduos da regressão (opcional). Se informados, o ruído é reamostrado deles em vez
+      de sorteado de uma distribuição normal (std_dev e skewness são ignorados).
+    - block_size: Tamanho dos blocos de resíduos consecutivos (bootstrap de blocos, para séries
+      autocorrelacionadas). Sem ele, cada resíduo é sorteado de forma independente.
 
     Retorno:
-    - Uma lista com as projeções simuladas.
+    - Um array 2D (períodos x simulações) com as trajetórias simuladas, ou, com summary_quantiles,
+      um array 2D (quantis x períodos).
     """
     try:
-        # Verificar se std_dev é positivo
-        if std_dev <= 0:
+        # Verificar se std_dev é positivo (no modo paramétrico)
+        if residuals is None and std_dev <= 0:
             raise ValueError("O desvio padrão deve ser positivo para a simulação de Monte Carlo.")
 
+        residuals = _validate_residuals(residuals, block_size)
+
         # Verificar se data_length é um inteiro positivo
         if data_length <= 0 or not isinstance(data_length, int):
             raise ValueError("O comprimento dos dados deve ser um inteiro positivo.")
@@ -37,28 +108,403 @@ def monte_carlo_simulation(slope, intercept, std_dev, data_length, skewness=0, n
 
         logging.info(f"Executando simulação de Monte Carlo com {n_simulations} simulações e {projection_steps} períodos projetados")
 
-        # Inicializar a matriz de projeções
-        projections = []
+        rng = np.random.default_rng(seed)
 
-        for step in range(1, projection_steps + 1):
-            # Se os dados forem assimétricos, usamos uma distribuição log-normal ajustada
-            if abs(skewness) > 1:
-                logging.warning(f"Assimetria alta detectada (skewness = {skewness}). Usando distribuição log-normal para simulações no período {step}.")
-                # Ajustamos a simulação para valores não negativos com desvio padrão adequado
-                simulated_step = slope * (data_length + step) + intercept + np.random.lognormal(mean=0, sigma=np.log(1 + std_dev), size=n_simulations)
-            else:
-                # Se não houver assimetria significativa, usamos a distribuição normal
-                simulated_step = slope * (data_length + step) + intercept + np.random.normal(loc=0, scale=std_dev, size=n_simulations)
-            
-            projections.append(simulated_step)
+        # Tendência da regressão para cada período futuro
+        trend = slope * (data_length + np.arange(1, projection_steps + 1)) + intercept
+
+        if residuals is not None:
+            logging.info(f"Ruído reamostrado de {residuals.size} resíduos da regressão"
+                         + (f" em blocos de {block_size}" if block_size and block_size > 1 else ""))
+        # Se os dados forem assimétricos, usamos uma distribuição log-normal ajustada
+        elif abs(skewness) > 1:
+            logging.warning(f"Assimetria alta detectada (skewness = {skewness}). Usando distribuição log-normal para as simulações.")
+
+        def draw_noise(steps):
+            # Os sorteios são feitos em ordem (período a período), então sortear em blocos
+            # produz exatamente os mesmos valores que um único sorteio da matriz inteira
+            return _draw_noise(rng, std_dev, skewness, (steps, n_simulations), residuals, block_size)
 
-        # Convertendo a lista de projeções para um array 2D (projeções x simulações)
-        projections_array = np.array(projections)
+        report_progress(0.0, "Monte Carlo")
+        if summary_quantiles is None:
+            # Matriz completa (períodos x simulações), acumulada ao longo dos períodos
+            projections_array = draw_noise(projection_steps)
+            np.cumsum(projections_array, axis=0, out=projections_array)
+            projections_array += trend[:, np.newaxis]
 
-        logging.info("Simulação de Monte Carlo concluída com sucesso")
-        return projections_array
+            logging.info("Simulação de Monte Carlo concluída com sucesso")
+            return projections_array
+
+        # Modo de resumo: percorrer os períodos em blocos, mantendo apenas o acumulado do último período
+        quantiles = np.asarray(summary_quantiles, dtype=np.float64)
+        summary = np.empty((quantiles.size, projection_steps))
+        cumulative = np.zeros(n_simulations)
+        block_steps = max(1, SUMMARY_BLOCK_VALUES // n_simulations)
+        if block_size and block_size > 1:
+            # Blocos de períodos múltiplos do bloco de resíduos, para não cortar os blocos ao meio
+            block_steps = max(block_size, block_steps - block_steps % block_size)
+        for start in range(0, projection_steps, block_steps):
+            stop = min(start + block_steps, projection_steps)
+            block = draw_noise(stop - start)
+            block[0] += cumulative
+            np.cumsum(block, axis=0, out=block)
+            cumulative = block[-1].copy()
+            block += trend[start:stop, np.newaxis]
+            summary[:, start:stop] = np.quantile(block, quantiles, axis=1)
+            report_progress(stop / projection_steps, "Monte Carlo")
+
+        logging.info("Simulação de Monte Carlo (resumo por quantis) concluída com sucesso")
+        return summary
 
     except Exception as e:
         logging.error(f"Erro na simulação de Monte Carlo: {e}", exc_info=True)
         print(f"Erro na simulação de Monte Carlo: {e}")
         return None
+
+
+def _validate_residuals(residuals, block_size):
+    if residuals is None:
+        if block_size and block_size > 1:
+            raise ValueError("O bootstrap de blocos requer os resíduos da regressão.")
+        return None
+    residuals = np.asarray(residuals, dtype=np.float64).ravel()
+    residuals = residuals[~np.isnan(residuals)]
+    if residuals.size == 0:
+        raise ValueError("Não há resíduos para reamostrar na simulação de Monte Carlo.")
+    if block_size is not None and (not isinstance(block_size, int) or block_size <= 0):
+        raise ValueError("O tamanho do bloco deve ser um inteiro positivo.")
+    if block_size and block_size > residuals.size:
+        raise ValueError("O tamanho do bloco não pode ser maior que o número de resíduos.")
+    return residuals
+
+
+def _remove_file(path):
+    # No Windows, um arquivo ainda mapeado não pode ser removido; nesse caso, fica no diretório temporário
+    try:
+        os.remove(path)
+        logging.info(f"Arquivo temporário de projeções removido: {path}")
+    except OSError as e:
+        logging.warning(f"Não foi possível remover o arquivo temporário {path}: {e}")
+
+
+class SimulationSummary:
+    """
+    Resumo compacto e combinável (merge) de uma simulação de Monte Carlo, usado no lugar da matriz
+    de projeções. Guarda, por período projetado, contagem, média, soma dos quadrados dos desvios,
+    mínimo e máximo; os quantis (exatos em níveis fixos, ou aproximados por um histograma de faixas
+    fixas na simulação paralela); e uma amostra de tamanho fixo das projeções para os gráficos.
+
+    Opcionalmente mantém todas as projeções em float32 ou em um arquivo .npy mapeado em memória,
+    para quem realmente precisa de todos os valores sorteados. O arquivo temporário criado pelo
+    próprio resumo é removido em close() ou quando o resumo é descartado; ao serializar (pickle,
+    cache em disco), apenas o caminho do arquivo é guardado, não as projeções.
+    """
+
+    def __init__(self, n_simulations, mean, m2, minimum, maximum, sample,
+                 quantile_levels=None, quantile_values=None, bin_edges=None, histogram=None, projections=None):
+        self.n_simulations = n_simulations
+        self.mean = mean
+        self.m2 = m2
+        self.min = minimum
+        self.max = maximum
+        self.sample = sample                    # ReservoirSample das projeções (todos os períodos)
+        self.quantile_levels = quantile_levels  # Níveis dos quantis exatos
+        self.quantile_values = quantile_values  # (níveis x períodos)
+        self.bin_edges = bin_edges              # (períodos x faixas + 1)
+        self.histogram = histogram              # (períodos x faixas + 2): abaixo, faixas..., acima
+        self.projections = projections          # Projeções completas (opcional), em float32 ou memmap
+        self._finalizer = None                  # Remove o arquivo temporário do memmap, se for nosso
+
+    def _own_file(self, path):
+        # O arquivo é removido quando o resumo deixa de ser usado (ou em close)
+        self._finalizer = weakref.finalize(self, _remove_file, path)
+
+    def close(self):
+        """Libera as projeções completas e remove o arquivo temporário do memmap, se houver."""
+        self.projections = None
+        if self._finalizer is not None:
+            self._finalizer()
+            self._finalizer = None
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["_finalizer"] = None
+        if isinstance(self.projections, np.memmap):
+            # Apenas o caminho é serializado; a cópia reabre o arquivo (somente leitura) se ele ainda existir
+            state["projections"] = None
+            state["_memmap_path"] = self.projections.filename
+        return state
+
+    def __setstate__(self, state):
+        memmap_path = state.pop("_memmap_path", None)
+        self.__dict__.update(state)
+        if memmap_path is not None:
+            if os.path.exists(memmap_path):
+                self.projections = np.load(memmap_path, mmap_mode='r')
+            else:
+                logging.warning(f"Arquivo das projeções de Monte Carlo não encontrado: {memmap_path}")
+
+    @staticmethod
+    def _moments(projections):
+        mean = projections.mean(axis=1)
+        deviations = projections - mean[:, np.newaxis]
+        m2 = np.einsum('ij,ij->i', deviations, deviations)
+        return mean, m2, projections.min(axis=1), projections.max(axis=1)
+
+    @classmethod
+    def from_projections(cls, projections, sample_size=SUMMARY_SAMPLE_SIZE, storage=None, memmap_path=None, seed=None):
+        """
+        Resume uma matriz de projeções (períodos x simulações) com quantis exatos.
+
+        Parâmetros:
+        - projections: Array retornado por monte_carlo_simulation.
+        - sample_size: Tamanho da amostra mantida para os gráficos.
+        - storage: None (descarta as projeções), 'float32' (mantém uma cópia em float32)
+          ou 'memmap' (grava as projeções em um arquivo .npy mapeado em memória).
+        - memmap_path: Caminho do arquivo .npy para storage='memmap' (padrão: arquivo temporário, removido junto com o resumo).
+        - seed: Semente usada para sortear a amostra.
+        """
+        projections = np.atleast_2d(projections)
+        mean, m2, minimum, maximum = cls._moments(projections)
+        quantile_values = np.quantile(projections, SUMMARY_QUANTILES, axis=1)
+        sample = ReservoirSample.from_values(projections.ravel(), sample_size, seed)
+
+        if storage is None:
+            backing = None
+        elif storage == 'float32':
+            backing = projections.astype(np.float32)
+        elif storage == 'memmap':
+            owned_path = None
+            if memmap_path is None:
+                file_descriptor, memmap_path = tempfile.mkstemp(prefix='monte_carlo_', suffix='.npy')
+                os.close(file_descriptor)
+                owned_path = memmap_path
+            backing = np.lib.format.open_memmap(memmap_path, mode='w+', dtype=projections.dtype,
+                                                shape=projections.shape)
+            backing[:] = projections
+            backing.flush()
+            logging.info(f"Projeções de Monte Carlo gravadas em {memmap_path}")
+        else:
+            raise ValueError("Armazenamento inválido. Use None, 'float32' ou 'memmap'.")
+
+        summary = cls(projections.shape[1], mean, m2, minimum, maximum, sample,
+                      quantile_levels=np.asarray(SUMMARY_QUANTILES), quantile_values=quantile_values,
+                      projections=backing)
+        if storage == 'memmap' and owned_path is not None:
+            summary._own_file(owned_path)
+        return summary
+
+    @classmethod
+    def from_block(cls, projections, bin_edges, sample_size=SUMMARY_SAMPLE_SIZE, seed=None):
+        """Resume um bloco de trajetórias (períodos x simulações) em um histograma com as faixas informadas."""
+        steps = projections.shape[0]
+        mean, m2, minimum, maximum = cls._moments(projections)
+
+        bins = bin_edges.shape[1] - 1
+        low = bin_edges[:, :1]
+        width = (bin_edges[:, -1:] - low) / bins
+        # Índice da faixa de cada valor: -1 para abaixo do limite e bins para acima, deslocados em +1
+        positions = np.floor((projections - low) / width)
+        np.clip(positions, -1, bins, out=positions)
+        positions += 1 + (bins + 2) * np.arange(steps)[:, np.newaxis]
+        histogram = np.bincount(positions.astype(np.int64).ravel(), minlength=steps * (bins + 2))
+
+        sample = ReservoirSample.from_values(projections.ravel(), sample_size, seed)
+        return cls(projections.shape[1], mean, m2, minimum, maximum, sample,
+                   bin_edges=bin_edges, histogram=histogram.reshape(steps, bins + 2))
+
+    @property
+    def std(self):
+        # Desvio padrão populacional por período, como np.std sobre as projeções
+        return np.sqrt(self.m2 / self.n_simulations)
+
+    @property
+    def overall_mean(self):
+        # Média de todas as projeções (todos os períodos têm o mesmo número de simulações)
+        return float(np.mean(self.mean))
+
+    @property
+    def overall_std(self):
+        # Desvio padrão populacional de todas as projeções, combinando os períodos
+        steps = self.mean.size
+        total_m2 = np.sum(self.m2) + self.n_simulations * np.sum((self.mean - self.overall_mean) ** 2)
+        return float(np.sqrt(total_m2 / (self.n_simulations * steps)))
+
+    def merge(self, other):
+        """Combina o resumo de outro bloco (com as mesmas faixas do histograma)."""
+        if self.histogram is None or other.histogram is None:
+            raise ValueError("Apenas resumos baseados em histograma podem ser combinados.")
+        na, nb = self.n_simulations, other.n_simulations
+        n = na + nb
+        delta = other.mean - self.mean
+        self.m2 = self.m2 + other.m2 + delta ** 2 * na * nb / n
+        self.mean = self.mean + delta * nb / n
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+        self.histogram = self.histogram + other.histogram
+        self.sample.merge(other.sample)
+        self.n_simulations = n
+
+    def quantile(self, quantiles):
+        """
+        Quantis por período. Com as projeções completas, são exatos; com quantis pré-calculados,
+        exatos nos níveis guardados e interpolados entre eles; com histograma, interpolados
+        dentro das faixas.
+
+        Retorno:
+        - Array 2D (quantis x períodos).
+        """
+        quantiles = np.atleast_1d(np.asarray(quantiles, dtype=np.float64))
+        if self.projections is not None:
+            return np.quantile(self.projections, quantiles, axis=1)
+
+        steps = self.mean.size
+        result = np.empty((quantiles.size, steps))
+        for step in range(steps):
+            if self.histogram is not None:
+                edges = np.concatenate([
+                    [min(self.min[step], self.bin_edges[step, 0])],
+                    self.bin_edges[step],
+                    [max(self.max[step], self.bin_edges[step, -1])],
+                ])
+                cdf = np.concatenate([[0.0], np.cumsum(self.histogram[step]) / self.n_simulations])
+            else:
+                edges = np.concatenate([[self.min[step]], self.quantile_values[:, step], [self.max[step]]])
+                cdf = np.concatenate([[0.0], self.quantile_levels, [1.0]])
+            result[:, step] = np.interp(quantiles, cdf, edges)
+        return result
+
+    def overall_quantile(self, quantiles):
+        """
+        Quantis de todas as projeções juntas (como np.percentile sobre a matriz achatada).
+        Exatos com um único período ou com as projeções completas; caso contrário, estimados pela amostra.
+        """
+        if self.projections is not None:
+            return np.quantile(self.projections, quantiles)
+        if self.mean.size == 1:
+            return self.quantile(quantiles)[:, 0]
+        return self.sample.quantile(quantiles)
+
+    def to_dict(self):
+        """Representação compacta, serializável em JSON."""
+        summary = {
+            "Simulações": int(self.n_simulations),
+            "Períodos": int(self.mean.size),
+            "Média": float(self.overall_mean),
+            "Desvio Padrão": float(self.overall_std),
+            "Mínimo": float(np.min(self.min)),
+            "Máximo": float(np.max(self.max)),
+        }
+        for level, value in zip((5, 25, 50, 75, 95), self.overall_quantile([0.05, 0.25, 0.5, 0.75, 0.95])):
+            summary[f"Percentil {level}"] = float(value)
+        return summary
+
+
+def _simulate_block(task):
+    """
+    Tarefa executada em um processo do pool: simula um bloco de trajetórias e devolve apenas o resumo.
+    """
+    (seed, n_simulations, slope, intercept, std_dev, data_length, skewness, projection_steps, bin_edges,
+     residuals, block_size) = task
+    rng = np.random.default_rng(seed)
+    trend = slope * (data_length + np.arange(1, projection_steps + 1)) + intercept
+    block = _draw_noise(rng, std_dev, skewness, (projection_steps, n_simulations), residuals, block_size)
+    np.cumsum(block, axis=0, out=block)
+    block += trend[:, np.newaxis]
+    if bin_edges is None:
+        # Bloco piloto: define as faixas do histograma a partir da sua própria amplitude, com folga
+        spread = block.max(axis=1) - block.min(axis=1)
+        spread = np.where(spread > 0, spread, std_dev if std_dev > 0 else 1.0)
+        bin_edges = np.linspace(block.min(axis=1) - spread / 2, block.max(axis=1) + spread / 2,
+                                HISTOGRAM_BINS + 1, axis=1)
+    # A amostra do bloco continua o mesmo fluxo aleatório, mantendo o resultado determinístico
+    return SimulationSummary.from_block(block, bin_edges, seed=rng)
+
+
+def parallel_monte_carlo(slope, intercept, std_dev, data_length, skewness=0, n_simulations=1_000_000,
+                         projection_steps=1, seed=None, n_workers=None, residuals=None, block_size=None):
+    """
+    Simulação de Monte Carlo dividida em blocos processados em paralelo, com fluxos aleatórios
+    independentes gerados a partir de uma única SeedSequence. Cada processo devolve apenas o resumo
+    do seu bloco (momentos e histograma), nunca a matriz de projeções, então a memória não cresce
+    com o número de simulações. Para uma mesma semente, o resultado é idêntico com qualquer número
+    de processos.
+
+    Parâmetros:
+    - slope, intercept, std_dev, data_length, skewness, projection_steps, residuals, block_size:
+      Como em monte_carlo_simulation.
+    - n_simulations: Número total de simulações.
+    - seed: Semente (int ou SeedSequence) da qual derivam os fluxos de cada bloco.
+    - n_workers: Número de processos (padrão: número de CPUs). Com 1, executa no processo atual.
+
+    Retorno:
+    - Um SimulationSummary com o resumo de todas as simulações, ou None em caso de erro.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    try:
+        if residuals is None and std_dev <= 0:
+            raise ValueError("O desvio padrão deve ser positivo para a simulação de Monte Carlo.")
+        residuals = _validate_residuals(residuals, block_size)
+        if data_length <= 0 or not isinstance(data_length, int):
+            raise ValueError("O comprimento dos dados deve ser um inteiro positivo.")
+        if n_simulations <= 0 or not isinstance(n_simulations, int):
+            raise ValueError("O número de simulações deve ser um inteiro positivo.")
+        if projection_steps <= 0 or not isinstance(projection_steps, int):
+            raise ValueError("O número de períodos de projeção deve ser um inteiro positivo.")
+
+        simulations_per_block = max(1, PARALLEL_BLOCK_VALUES // projection_steps)
+        block_sizes = [simulations_per_block] * (n_simulations // simulations_per_block)
+        if n_simulations % simulations_per_block:
+            block_sizes.append(n_simulations % simulations_per_block)
+
+        seeds = np.random.SeedSequence(seed).spawn(len(block_sizes))
+        logging.info(f"Executando simulação de Monte Carlo paralela com {n_simulations} simulações "
+                     f"em {len(block_sizes)} bloco(s)")
+
+        def task(index, bin_edges):
+            return (seeds[index], block_sizes[index], slope, intercept, std_dev, data_length,
+                    skewness, projection_steps, bin_edges, residuals, block_size)
+
+        # O primeiro bloco define as faixas do histograma compartilhadas por todos os blocos
+        report_progress(0.0, "Monte Carlo")
+        summary = _simulate_block(task(0, None))
+        bin_edges = summary.bin_edges
+        remaining = [task(index, bin_edges) for index in range(1, len(block_sizes))]
+        report_progress(1 / len(block_sizes), "Monte Carlo")
+
+        if remaining:
+            if n_workers == 1:
+                for done, block_summary in enumerate(map(_simulate_block, remaining), start=2):
+                    summary.merge(block_summary)
+                    report_progress(done / len(block_sizes), "Monte Carlo")
+            else:
+                executor = ProcessPoolExecutor(max_workers=n_workers)
+                try:
+                    # A combinação segue sempre a ordem dos blocos, independentemente de quem termina primeiro
+                    for done, block_summary in enumerate(executor.map(_simulate_block, remaining), start=2):
+                        summary.merge(block_summary)
+                        report_progress(done / len(block_sizes), "Monte Carlo")
+                finally:
+                    # Em um cancelamento, os blocos que ainda não começaram são descartados
+                    executor.shutdown(wait=True, cancel_futures=True)
+
+        logging.info("Simulação de Monte Carlo paralela concluída com sucesso")
+        return summary
+
+    except Exception as e:
+        logging.error(f"Erro na simulação de Monte Carlo paralela: {e}", exc_info=True)
+        print(f"Erro na simulação de Monte Carlo paralela: {e}")
+        return None
+
+
+def as_simulation_summary(value):
+    """
+    Normaliza o valor guardado em "Simulação de Monte Carlo": aceita um SimulationSummary ou uma
+    matriz de projeções (resultados antigos) e retorna um SimulationSummary, ou None se não houver simulação.
+    """
+    if isinstance(value, SimulationSummary):
+        return value
+    if isinstance(value, np.ndarray) and value.size > 0:
+        return SimulationSummary.from_projections(value)
+    return None
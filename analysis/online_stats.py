@@ -0,0 +1,259 @@
+import math
+import logging
+import numpy as np
+
+
+class ReservoirSample:
+    """
+    Amostra de tamanho fixo (reservoir sampling, algoritmo R) de uma sequência de valores.
+    Usada como sketch de quantis: enquanto o número de valores vistos não passa da capacidade,
+    a amostra contém todos os valores e os quantis são exatos.
+
+    Parâmetros:
+    - capacity: Tamanho máximo da amostra.
+    - seed: Semente do gerador aleatório (int, SeedSequence ou Generator).
+    """
+
+    def __init__(self, capacity=100_000, seed=None):
+        if capacity <= 0 or not isinstance(capacity, int):
+            raise ValueError("A capacidade da amostra deve ser um inteiro positivo.")
+        self.capacity = capacity
+        self.seen = 0
+        self._values = np.empty(capacity, dtype=np.float64)
+        self._rng = np.random.default_rng(seed)
+
+    @classmethod
+    def from_values(cls, values, capacity=100_000, seed=None):
+        """
+        Cria a amostra de um array já disponível por inteiro, sorteando as posições de uma vez
+        (equivalente, em distribuição, a passar os valores um a um pelo algoritmo R).
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        sample = cls(capacity, seed)
+        if values.size <= capacity:
+            sample._values[:values.size] = values
+        else:
+            sample._values[:] = values[sample._rng.choice(values.size, capacity, replace=False)]
+        sample.seen = values.size
+        return sample
+
+    @property
+    def values(self):
+        return self._values[:min(self.seen, self.capacity)]
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        n = values.size
+        if n == 0:
+            return
+
+        # Preencher a amostra enquanto houver espaço
+        free = max(self.capacity - self.seen, 0)
+        fill = min(free, n)
+        if fill:
+            self._values[self.seen:self.seen + fill] = values[:fill]
+
+        # Para os demais, o i-ésimo valor substitui uma posição aleatória com probabilidade capacity / (i + 1)
+        rest = values[fill:]
+        if rest.size:
+            positions = np.arange(self.seen + fill, self.seen + n, dtype=np.int64)
+            slots = self._rng.integers(0, positions + 1)
+            keep = slots < self.capacity
+            # Em atribuições com índices repetidos, prevalece a última (mesma ordem do algoritmo sequencial)
+            self._values[slots[keep]] = rest[keep]
+
+        self.seen += n
+
+    def merge(self, other):
+        """Combina outra amostra nesta, preservando a uniformidade sobre a união das sequências."""
+        if other.seen == 0:
+            return
+        if self.seen + other.seen <= self.capacity:
+            self._values[self.seen:self.seen + other.seen] = other.values
+            self.seen += other.seen
+            return
+
+        size = min(self.capacity, self.seen + other.seen)
+        # Número de elementos vindos desta amostra segue uma hipergeométrica sobre as sequências originais
+        from_self = self._rng.hypergeometric(self.seen, other.seen, size) if self.seen else 0
+        from_self = min(from_self, self.values.size)
+        from_other = min(size - from_self, other.values.size)
+        merged = np.concatenate([
+            self._rng.permutation(self.values)[:from_self],
+            self._rng.permutation(other.values)[:from_other],
+        ])
+        self._values[:merged.size] = merged
+        self.seen += other.seen
+
+    def quantile(self, q):
+        if self.seen == 0:
+            return float('nan')
+        return np.quantile(self.values, q)
+
+
+class RunningStats:
+    """
+    Estatísticas de uma série numérica mantidas em uma única passada e combináveis (merge).
+    Guarda contagem, média/variância (Welford), terceiro momento para a assimetria,
+    mínimo/máximo, primeiro/último valor, as somas da regressão linear contra o índice
+    da série e um sketch de quantis.
+
+    Parâmetros:
+    - sketch_size: Capacidade da amostra usada para mediana e Pareto 80/20.
+    - seed: Semente do sketch de quantis.
+    """
+
+    def __init__(self, sketch_size=100_000, seed=None):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.first = None
+        self.last = None
+        # Momentos do índice (x) e co-momento x/y para a regressão linear
+        self.mean_x = 0.0
+        self.sxx = 0.0
+        self.sxy = 0.0
+        self.sketch = ReservoirSample(sketch_size, seed)
+
+    @classmethod
+    def from_moments(cls, count, mean, m2, m3, minimum, maximum, first, last, sxy):
+        """
+        Cria o estado a partir de estatísticas já calculadas fora (por exemplo, dentro de um banco
+        de dados), com a regressão contra o índice 0..count-1. O sketch de quantis fica vazio.
+        """
+        stats = cls(sketch_size=1)
+        stats.count = count
+        stats.mean = mean
+        stats.m2 = m2
+        stats.m3 = m3
+        stats.min = minimum
+        stats.max = maximum
+        stats.first = first
+        stats.last = last
+        stats.mean_x = (count - 1) / 2.0
+        stats.sxx = count * (count * count - 1) / 12.0
+        stats.sxy = sxy
+        return stats
+
+    def update(self, values):
+        """
+        Incorpora um bloco de valores, na ordem da série. Valores NaN devem ter sido removidos.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        n = values.size
+        if n == 0:
+            return
+
+        block = RunningStats.__new__(RunningStats)
+        block.count = n
+        block.mean = float(values.mean())
+        deviations = values - block.mean
+        block.m2 = float(np.dot(deviations, deviations))
+        block.m3 = float(np.dot(deviations * deviations, deviations))
+        block.min = float(values.min())
+        block.max = float(values.max())
+        block.first = float(values[0])
+        block.last = float(values[-1])
+        # Índices locais 0..n-1: média e soma dos quadrados centrados têm forma fechada
+        block.mean_x = (n - 1) / 2.0
+        block.sxx = n * (n * n - 1) / 12.0
+        block.sxy = float(np.dot(np.arange(n, dtype=np.float64) - block.mean_x, deviations))
+        block.sketch = None
+
+        self._merge_moments(block)
+        self.sketch.update(values)
+
+    def merge(self, other):
+        """
+        Combina as estatísticas de outro bloco que vem logo depois deste na série.
+        """
+        self._merge_moments(other)
+        if other.sketch is not None:
+            self.sketch.merge(other.sketch)
+
+    def _merge_moments(self, other):
+        if other.count == 0:
+            return
+        if self.count == 0:
+            offset = 0
+            self.first = other.first
+        else:
+            offset = self.count
+
+        na, nb = self.count, other.count
+        n = na + nb
+        delta = other.mean - self.mean
+        # Os índices do outro bloco começam após os deste
+        delta_x = other.mean_x + offset - self.mean_x
+
+        self.m3 = (self.m3 + other.m3
+                   + delta ** 3 * na * nb * (na - nb) / n ** 2
+                   + 3 * delta * (na * other.m2 - nb * self.m2) / n)
+        self.m2 = self.m2 + other.m2 + delta ** 2 * na * nb / n
+        self.sxy = self.sxy + other.sxy + delta_x * delta * na * nb / n
+        self.sxx = self.sxx + other.sxx + delta_x ** 2 * na * nb / n
+        self.mean = self.mean + delta * nb / n
+        self.mean_x = self.mean_x + delta_x * nb / n
+        self.count = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.last = other.last
+
+    @property
+    def std(self):
+        # Desvio padrão amostral (ddof=1), como pandas.Series.std
+        if self.count < 2:
+            return float('nan')
+        return math.sqrt(self.m2 / (self.count - 1))
+
+    @property
+    def skewness(self):
+        # Assimetria populacional (viesada), como scipy.stats.skew
+        if self.count == 0 or self.m2 == 0:
+            return float('nan')
+        return math.sqrt(self.count) * self.m3 / self.m2 ** 1.5
+
+    def median(self):
+        return float(self.sketch.quantile(0.5))
+
+    def quantile(self, q):
+        return float(self.sketch.quantile(q))
+
+    def linregress(self):
+        """
+        Regressão linear dos valores contra o índice 0..n-1, com as mesmas saídas de scipy.stats.linregress.
+
+        Retorno:
+        - (slope, intercept, r_value, p_value, std_err)
+        """
+        from scipy.special import stdtr
+
+        if self.count < 2 or self.sxx == 0:
+            raise ValueError("São necessários pelo menos dois valores para a regressão linear.")
+
+        slope = self.sxy / self.sxx
+        intercept = self.mean - slope * self.mean_x
+        if self.m2 == 0:
+            r_value = 0.0
+        else:
+            r_value = max(min(self.sxy / math.sqrt(self.sxx * self.m2), 1.0), -1.0)
+
+        df = self.count - 2
+        if df > 0:
+            if abs(r_value) == 1.0:
+                p_value = 0.0
+            else:
+                t_stat = r_value * math.sqrt(df / ((1.0 - r_value) * (1.0 + r_value)))
+                # Bicaudal: 2 * P(T > |t|), usando a CDF da t de Student diretamente (mais leve que scipy.stats.t)
+                p_value = float(2 * stdtr(df, -abs(t_stat)))
+            std_err = math.sqrt((1 - r_value ** 2) * self.m2 / self.sxx / df)
+        else:
+            # Com apenas dois pontos a reta é exata
+            p_value = 1.0 if self.m2 == 0 else 0.0
+            std_err = 0.0
+
+        logging.debug(f"Regressão incremental: n={self.count}, slope={slope}, intercept={intercept}")
+        return slope, intercept, r_value, p_value, std_err
@@ -1,10 +1,56 @@
 import pygame
 import logging
 import os
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
 
 # Caminho para a fonte Open Sans
 FONT_PATH = os.path.join('C:/Users/GabrielRocca/source/repos/games/decision-maker/assets/fonts/Open_Sans/static', 'OpenSans-Regular.ttf')
 
+# Limite de quadros por segundo da tela de explicação
+EXPLANATION_MAX_FPS = 60
+
+# Layouts já calculados da explicação, por (texto, largura, fontes, cores)
+_layouts = OrderedDict()
+_MAX_CACHED_LAYOUTS = 8
+
+# Fontes da explicação (regular e negrito), criadas na primeira exibição
+_explanation_fonts = None
+
+
+# Texto exibido na tela "Como Avaliar os Resultados"
+EXPLANATION_TEXT = (
+    "**Como Avaliar os Resultados:**\n\n"
+    "**Média:**\n"
+    "Pode indicar o número médio de visualizações, taxa média de abertura, etc. Comparar a média entre diferentes períodos pode ajudar a entender a tendência geral de crescimento ou queda no desempenho. Um valor alto indica bom desempenho, enquanto um valor baixo pode sugerir necessidade de melhorias.\n\n"
+    "**Mediana:**\n"
+    "A mediana representa o valor central dos dados ordenados. Ela é útil para evitar distorções causadas por valores extremos. Se a mediana for próxima da média, os dados são relativamente simétricos; se houver grande diferença, pode indicar a presença de outliers.\n\n"
+    "**Maior Valor:**\n"
+    "Indica o pico de visualizações ou a maior taxa de engajamento registrada. Um valor alto é geralmente positivo, mostrando um momento de sucesso. Analise este valor para identificar o que levou a tal desempenho e replicar as boas práticas.\n\n"
+    "**Menor Valor:**\n"
+    "Indica o valor mais baixo observado, como o menor número de visualizações. Um valor baixo pode sinalizar períodos ou campanhas menos eficazes. Identificar os motivos ajuda a evitar repetir esses problemas.\n\n"
+    "**Valor Ideal (Fibonacci):**\n"
+    "Valor teórico obtido multiplicando a média pela Proporção Áurea (1.618). Serve como uma meta ambiciosa, mas realista, a ser alcançada. Se o valor atual estiver próximo do valor ideal, isso sugere bom desempenho em relação ao potencial teórico.\n\n"
+    "**Valor de Tensão:**\n"
+    "Representa um limite inferior crítico, abaixo do qual o desempenho é preocupante. Se a projeção futura estiver abaixo do valor de tensão, isso indica que é necessário agir rapidamente para evitar consequências negativas.\n\n"
+    "**Pareto 80/20:**\n"
+    "Corresponde ao percentil 80 dos dados. Indica que 80% dos resultados estão abaixo deste valor. É útil para entender onde concentrar esforços — os 20% principais tendem a gerar a maior parte dos resultados.\n\n"
+    "**Desvio Padrão:**\n"
+    "Mede a dispersão dos dados em relação à média. Um desvio padrão alto indica grande variabilidade, o que pode ser sinal de inconsistência nos resultados. Um desvio padrão baixo sugere resultados mais previsíveis e consistentes.\n\n"
+    "**Coeficiente de Variação:**\n"
+    "Mede a variabilidade relativa dos dados. Um coeficiente de variação alto indica alta volatilidade, sugerindo incerteza. Valores baixos indicam maior consistência. É útil comparar campanhas para ver qual foi mais estável.\n\n"
+    "**Projeção Futura:**\n"
+    "Estimativa do valor futuro com base nas tendências atuais. Valores altos indicam um crescimento esperado, enquanto valores baixos podem sugerir necessidade de mudanças estratégicas.\n\n"
+    "**CAGR (Taxa de Crescimento Composta):**\n"
+    "Mede o crescimento médio anual composto ao longo do tempo. Um CAGR alto é indicativo de crescimento constante, enquanto um valor baixo pode significar estagnação ou declínio.\n\n"
+    "**Média da Simulação de Monte Carlo:**\n"
+    "A média dos resultados da simulação de Monte Carlo representa uma previsão centralizada do desempenho futuro, levando em consideração a incerteza. Valores próximos à média indicam consistência, enquanto desvios grandes sugerem cenários variados.\n\n"
+    "**Desvio Padrão da Simulação Monte Carlo:**\n"
+    "Indica a variabilidade dos resultados simulados. Um desvio padrão alto sugere um futuro mais incerto, enquanto um valor baixo indica previsões mais consistentes.\n\n"
+    "**Recomendações:**\n"
+    "Baseadas nas métricas analisadas, como investir mais em áreas com projeção alta, ou padronizar processos em caso de alta variabilidade. Boas recomendações ajudam a maximizar resultados e minimizar riscos.\n\n"
+)
+
 
 def generate_recommendations(mean_value, ideal_value, tension_value, pareto_80_20, std_dev, future_projection, cagr=None, skewness=0, coef_var=None):
     """
@@ -76,48 +122,120 @@ def generate_recommendations(mean_value, ideal_value, tension_value, pareto_80_2
         return ["Não foi possível gerar recomendações devido a um erro nos dados fornecidos."]
 
 
-def explain_results(screen):
+class TextLayout:
     """
-    Exibe explicações detalhadas sobre as métricas utilizando pygame.
+    Layout de um texto de explicação (parágrafos separados por linha em branco e títulos entre **)
+    quebrado em linhas para uma largura e um par de fontes. A quebra é feita uma única vez; as
+    superfícies das linhas só são renderizadas quando aparecem na tela e ficam em um cache
+    limitado, de modo que a memória usada acompanha o tamanho da tela, e não o do texto.
 
     Parâmetros:
-    - screen (pygame.Surface): Superfície do pygame onde o texto será exibido.
+    - text: Texto da explicação.
+    - width: Largura disponível para o texto, em pixels.
+    - font_regular, font_bold: Fontes do texto e dos títulos.
+    - text_color, title_color: Cores do texto e dos títulos.
+    - padding: Margem superior e inferior do texto.
+    - line_spacing: Espaço extra entre as linhas.
     """
-    try:
-        # Definir o texto da explicação
-        explanation = ( 
-            "**Como Avaliar os Resultados:**\n\n"
-            "**Média:**\n"
-            "Pode indicar o número médio de visualizações, taxa média de abertura, etc. Comparar a média entre diferentes períodos pode ajudar a entender a tendência geral de crescimento ou queda no desempenho. Um valor alto indica bom desempenho, enquanto um valor baixo pode sugerir necessidade de melhorias.\n\n"
-            "**Mediana:**\n"
-            "A mediana representa o valor central dos dados ordenados. Ela é útil para evitar distorções causadas por valores extremos. Se a mediana for próxima da média, os dados são relativamente simétricos; se houver grande diferença, pode indicar a presença de outliers.\n\n"
-            "**Maior Valor:**\n"
-            "Indica o pico de visualizações ou a maior taxa de engajamento registrada. Um valor alto é geralmente positivo, mostrando um momento de sucesso. Analise este valor para identificar o que levou a tal desempenho e replicar as boas práticas.\n\n"
-            "**Menor Valor:**\n"
-            "Indica o valor mais baixo observado, como o menor número de visualizações. Um valor baixo pode sinalizar períodos ou campanhas menos eficazes. Identificar os motivos ajuda a evitar repetir esses problemas.\n\n"
-            "**Valor Ideal (Fibonacci):**\n"
-            "Valor teórico obtido multiplicando a média pela Proporção Áurea (1.618). Serve como uma meta ambiciosa, mas realista, a ser alcançada. Se o valor atual estiver próximo do valor ideal, isso sugere bom desempenho em relação ao potencial teórico.\n\n"
-            "**Valor de Tensão:**\n"
-            "Representa um limite inferior crítico, abaixo do qual o desempenho é preocupante. Se a projeção futura estiver abaixo do valor de tensão, isso indica que é necessário agir rapidamente para evitar consequências negativas.\n\n"
-            "**Pareto 80/20:**\n"
-            "Corresponde ao percentil 80 dos dados. Indica que 80% dos resultados estão abaixo deste valor. É útil para entender onde concentrar esforços — os 20% principais tendem a gerar a maior parte dos resultados.\n\n"
-            "**Desvio Padrão:**\n"
-            "Mede a dispersão dos dados em relação à média. Um desvio padrão alto indica grande variabilidade, o que pode ser sinal de inconsistência nos resultados. Um desvio padrão baixo sugere resultados mais previsíveis e consistentes.\n\n"
-            "**Coeficiente de Variação:**\n"
-            "Mede a variabilidade relativa dos dados. Um coeficiente de variação alto indica alta volatilidade, sugerindo incerteza. Valores baixos indicam maior consistência. É útil comparar campanhas para ver qual foi mais estável.\n\n"
-            "**Projeção Futura:**\n"
-            "Estimativa do valor futuro com base nas tendências atuais. Valores altos indicam um crescimento esperado, enquanto valores baixos podem sugerir necessidade de mudanças estratégicas.\n\n"
-            "**CAGR (Taxa de Crescimento Composta):**\n"
-            "Mede o crescimento médio anual composto ao longo do tempo. Um CAGR alto é indicativo de crescimento constante, enquanto um valor baixo pode significar estagnação ou declínio.\n\n"
-            "**Média da Simulação de Monte Carlo:**\n"
-            "A média dos resultados da simulação de Monte Carlo representa uma previsão centralizada do desempenho futuro, levando em consideração a incerteza. Valores próximos à média indicam consistência, enquanto desvios grandes sugerem cenários variados.\n\n"
-            "**Desvio Padrão da Simulação Monte Carlo:**\n"
-            "Indica a variabilidade dos resultados simulados. Um desvio padrão alto sugere um futuro mais incerto, enquanto um valor baixo indica previsões mais consistentes.\n\n"
-            "**Recomendações:**\n"
-            "Baseadas nas métricas analisadas, como investir mais em áreas com projeção alta, ou padronizar processos em caso de alta variabilidade. Boas recomendações ajudam a maximizar resultados e minimizar riscos.\n\n"
-        )
 
-        # Definir fonte e cores
+    def __init__(self, text, width, font_regular, font_bold, text_color, title_color, padding=18, line_spacing=5):
+        self.font_regular = font_regular
+        self.font_bold = font_bold
+        self.text_color = text_color
+        self.title_color = title_color
+        self.lines = []  # (texto, é título)
+        self.tops = []  # Posição vertical de cada linha, em ordem crescente
+        self.bottoms = []
+        self.max_cached_lines = 0
+        self._surfaces = OrderedDict()
+
+        y_offset = padding
+        for paragraph in text.split('\n\n'):
+            for line in paragraph.split('\n'):
+                is_title = line.startswith("**") and line.endswith("**")  # Detectar títulos
+                font = font_bold if is_title else font_regular
+                content = line[2:-2] if is_title else line
+                line_height = font.get_height() + line_spacing  # Espaçamento entre linhas
+                for wrapped_line in self._wrap(content, font, width):
+                    self.lines.append((wrapped_line, is_title))
+                    self.tops.append(y_offset)
+                    self.bottoms.append(y_offset + font.get_height())
+                    y_offset += line_height
+        self.height = y_offset + padding
+
+    @staticmethod
+    def _wrap(text, font, max_width):
+        # A largura de cada palavra é medida uma única vez, em vez de medir a linha inteira a cada palavra
+        space_width = font.size(' ')[0]
+        word_widths = {}
+        lines = []
+        current_words = []
+        current_width = 0
+
+        for word in text.split(' '):
+            word_width = word_widths.get(word)
+            if word_width is None:
+                word_width = word_widths[word] = font.size(word)[0]
+            if current_words and current_width + word_width > max_width:
+                lines.append(' '.join(current_words))
+                current_words = []
+                current_width = 0
+            current_words.append(word)
+            current_width += word_width + space_width
+
+        lines.append(' '.join(current_words))  # Adicionar a última linha
+        return lines
+
+    def visible_range(self, top, bottom):
+        """Índices (início, fim) das linhas que aparecem entre as posições top e bottom do texto."""
+        return bisect_right(self.bottoms, top), bisect_left(self.tops, bottom)
+
+    def line_surface(self, index):
+        """Superfície da linha index, renderizada no primeiro uso e mantida no cache."""
+        surface = self._surfaces.get(index)
+        if surface is not None:
+            self._surfaces.move_to_end(index)
+            return surface
+
+        text, is_title = self.lines[index]
+        if is_title:
+            surface = self.font_bold.render(text, True, self.title_color)
+        else:
+            surface = self.font_regular.render(text, True, self.text_color)
+        self._surfaces[index] = surface
+        while len(self._surfaces) > self.max_cached_lines:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def draw(self, screen, x, y, clip_top, clip_bottom):
+        """
+        Desenha as linhas visíveis com o texto posicionado em (x, y) na tela, considerando apenas a
+        faixa vertical da tela entre clip_top e clip_bottom.
+        """
+        start, end = self.visible_range(clip_top - y, clip_bottom - y)
+        # Guarda as linhas de cerca de três telas: a visível e uma de cada lado, para a rolagem
+        self.max_cached_lines = max(self.max_cached_lines, 3 * (end - start))
+        for index in range(start, end):
+            screen.blit(self.line_surface(index), (x, y + self.tops[index]))
+
+
+def get_text_layout(text, width, font_regular, font_bold, text_color, title_color, padding=18):
+    """Retorna o layout do texto para a largura e as fontes, reaproveitando os já calculados."""
+    key = (text, width, font_regular, font_bold, text_color, title_color, padding)
+    layout = _layouts.get(key)
+    if layout is None:
+        layout = TextLayout(text, width, font_regular, font_bold, text_color, title_color, padding=padding)
+        _layouts[key] = layout
+        while len(_layouts) > _MAX_CACHED_LAYOUTS:
+            _layouts.popitem(last=False)
+    else:
+        _layouts.move_to_end(key)
+    return layout
+
+
+def _get_explanation_fonts():
+    global _explanation_fonts
+    if _explanation_fonts is None:
         try:
             font_regular = pygame.font.Font(FONT_PATH, 24)  # Fonte regular Open Sans
             font_bold = pygame.font.Font(FONT_PATH, 24)  # Fonte para negrito Open Sans (simulando negrito)
@@ -127,66 +245,71 @@ def explain_results(screen):
             font_bold = pygame.font.Font(None, 24)
 
         font_bold.set_bold(True)  # Aplicando o negrito
+        _explanation_fonts = (font_regular, font_bold)
+    return _explanation_fonts
+
+
+def explain_results(screen, explanation=None):
+    """
+    Exibe explicações detalhadas sobre as métricas utilizando pygame.
+
+    Parâmetros:
+    - screen (pygame.Surface): Superfície do pygame onde o texto será exibido.
+    - explanation (str, opcional): Texto a ser exibido, no mesmo formato de EXPLANATION_TEXT
+      (títulos entre ** e parágrafos separados por linha em branco). Padrão: EXPLANATION_TEXT.
+    """
+    try:
+        # Definir fonte e cores
+        font_regular, font_bold = _get_explanation_fonts()
         background_color = (0, 0, 0)  # Preto
         text_color = (248, 248, 242)  # Cor do texto regular
         title_color = (0, 200, 0)  # Verde para os títulos
         border_color = (248, 248, 242)  # Cor da borda
         border_radius = 15  # Raio dos cantos arredondados
 
-        # Criar uma superfície para exibir o texto com margem
+        # Área da explicação com margem; o texto é quebrado uma única vez para esta largura
         screen_width, screen_height = screen.get_size()
         padding = 18  # Espaçamento interno
         explanation_width = screen_width - 2 * padding
-        explanation_surface = pygame.Surface((explanation_width, 10000))  # Definindo uma altura alta para permitir a rolagem
-        explanation_surface.fill(background_color)
-
-        # Função para quebrar linhas automaticamente com base na largura da tela
-        def wrap_text(text, font, max_width):
-            words = text.split(' ')
-            lines = []
-            current_line = ""
-
-            for word in words:
-                test_line = current_line + word + " "
-                text_width, _ = font.size(test_line)
+        layout = get_text_layout(explanation or EXPLANATION_TEXT, explanation_width - 2 * padding,
+                                 font_regular, font_bold, text_color, title_color, padding=padding)
 
-                if text_width <= max_width:
-                    current_line = test_line
-                else:
-                    lines.append(current_line)
-                    current_line = word + " "
-
-            lines.append(current_line)  # Adicionar a última linha
-            return lines
-
-        # Dividir o texto em linhas e renderizar
-        y_offset = padding
-        for paragraph in explanation.split('\n\n'):
-            for line in paragraph.split('\n'):
-                if line.startswith("**") and line.endswith("**"):  # Detectar títulos
-                    wrapped_lines = wrap_text(line[2:-2], font_bold, explanation_width - 2 * padding)
-                    for wrapped_line in wrapped_lines:
-                        text_surface = font_bold.render(wrapped_line, True, title_color)
-                        explanation_surface.blit(text_surface, (padding, y_offset))
-                        y_offset += font_bold.get_height() + 5  # Espaçamento entre linhas
-                else:
-                    wrapped_lines = wrap_text(line, font_regular, explanation_width - 2 * padding)
-                    for wrapped_line in wrapped_lines:
-                        text_surface = font_regular.render(wrapped_line, True, text_color)
-                        explanation_surface.blit(text_surface, (padding, y_offset))
-                        y_offset += font_regular.get_height() + 5  # Espaçamento entre linhas
-
-        # Desenhar uma borda ao redor da superfície de explicação
-        pygame.draw.rect(explanation_surface, border_color, explanation_surface.get_rect(), width=2, border_radius=border_radius)
+        # Fundo escurecido, montado uma única vez a partir da tela atual
+        dimmed_background = screen.copy()
+        dim_overlay = pygame.Surface((screen_width, screen_height))
+        dim_overlay.set_alpha(150)  # Transparência
+        dim_overlay.fill((0, 0, 0))
+        dimmed_background.blit(dim_overlay, (0, 0))
+        del dim_overlay
 
         # Configuração de rolagem
         scroll_y = 0
         scroll_speed = 20  # Velocidade de rolagem
+        max_scroll = max(layout.height - screen_height, 0)
+
+        clock = pygame.time.Clock()
+        redraw = True
 
         # Loop para exibir a explicação e permitir rolagem
         running = True
         while running:
-            for event in pygame.event.get():
+            if redraw:
+                screen.blit(dimmed_background, (0, 0))
+
+                # Painel da explicação: só a parte visível é preenchida e só as linhas visíveis são desenhadas
+                panel_rect = pygame.Rect(padding, -scroll_y, explanation_width, layout.height)
+                screen.fill(background_color, panel_rect.clip(screen.get_rect()))
+                layout.draw(screen, 2 * padding, -scroll_y, 0, screen_height)
+
+                # Desenhar uma borda ao redor da explicação
+                pygame.draw.rect(screen, border_color, panel_rect, width=2, border_radius=border_radius)
+                pygame.display.flip()
+                redraw = False
+                clock.tick(EXPLANATION_MAX_FPS)
+
+            # Espera pelo próximo evento: sem rolagem, a tela não é redesenhada
+            for event in [pygame.event.wait()] + pygame.event.get():
+                previous_scroll = scroll_y
                 if event.type == pygame.QUIT:
                     pygame.quit()
                     exit()
@@ -194,22 +317,19 @@ def explain_results(screen):
                     if event.key == pygame.K_ESCAPE:
                         running = False
                     elif event.key == pygame.K_DOWN:
-                        scroll_y = min(scroll_y + scroll_speed, explanation_surface.get_height() - screen_height)
+                        scroll_y = min(scroll_y + scroll_speed, max_scroll)
                     elif event.key == pygame.K_UP:
                         scroll_y = max(scroll_y - scroll_speed, 0)
-                elif event.type == pygame.MOUSEBUTTONDOWN:
+                elif event.type == pygame.MOUSEWHEEL:
+                    scroll_y = min(max(scroll_y - event.y * scroll_speed, 0), max_scroll)
+                elif event.type == pygame.MOUSEBUTTONDOWN and event.button in (1, 2, 3):
+                    # A roda do mouse também gera MOUSEBUTTONDOWN (botões 4 e 5): ela rola o texto
                     running = False
-
-            # Desenhar o fundo escurecido
-            dim_overlay = pygame.Surface((screen_width, screen_height))
-            dim_overlay.set_alpha(150)  # Transparência
-            dim_overlay.fill((0, 0, 0))
-            screen.blit(dim_overlay, (0, 0))
-
-            # Desenhar a superfície da explicação sobre a tela principal
-            screen.blit(explanation_surface, (padding, -scroll_y))
-            pygame.display.flip()
+                elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                    redraw = True
+                if scroll_y != previous_scroll:
+                    redraw = True
 
     except Exception as e:
         logging.error(f"Erro ao exibir resultados: {e}", exc_info=True)
-        print(f"Erro ao exibir resultados: {e}")
\ No newline at end of file
+        print(f"Erro ao exibir resultados: {e}")
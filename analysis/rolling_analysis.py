@@ -0,0 +1,127 @@
+import logging
+import numpy as np
+import pandas as pd
+
+
+def _anchored_window_sums(values, window):
+    """
+    Somas de cada janela móvel (y, y² e x·y, com x = 0..janela-1 a partir do início da janela),
+    com y relativo a uma referência local.
+
+    Somas acumuladas sobre a série inteira perdem precisão em séries longas: a diferença entre duas
+    somas grandes cancela os algarismos significativos (com nível 1e6 e ruído unitário, o desvio
+    padrão sai quase três vezes maior). Por isso a série é dividida em blocos de 'window' inícios de
+    janela; cada bloco cobre os 2·janela-1 valores das suas janelas, é centralizado na própria média
+    e tem suas somas acumuladas. Assim as somas nunca acumulam mais que duas janelas, e os valores
+    somados são da ordem da variação local. Tudo é vetorizado (uma linha da matriz por bloco), com
+    custo O(n) e cerca de 2n valores em memória por soma.
+
+    Retorno:
+    - Tupla (soma de y, soma de y², soma de x·y, referência de cada janela), uma posição por janela;
+      a média da janela é soma de y / janela + referência.
+    """
+    n_windows = len(values) - window + 1
+    n_blocks = -(-n_windows // window)
+    block_length = 2 * window - 1
+
+    # Completa o fim da série com o último valor, para que todos os blocos tenham o mesmo tamanho
+    padded_length = n_blocks * window + window - 1
+    padded = np.concatenate([values, np.full(padded_length - len(values), values[-1])])
+    blocks = np.lib.stride_tricks.sliding_window_view(padded, block_length)[::window]
+
+    anchors = blocks.mean(axis=1, keepdims=True)
+    local = blocks - anchors
+    offsets = np.arange(block_length, dtype=np.float64)
+
+    def window_sums(series):
+        cumulative = np.zeros((n_blocks, block_length + 1))
+        np.cumsum(series, axis=1, out=cumulative[:, 1:])
+        return cumulative[:, window:] - cumulative[:, :-window]
+
+    sum_y = window_sums(local)
+    sum_yy = window_sums(local * local)
+    # x local = posição no bloco - início da janela no bloco
+    starts = np.arange(window, dtype=np.float64)
+    sum_xy = window_sums(offsets * local) - starts * sum_y
+
+    def flatten(matrix):
+        return matrix.reshape(-1)[:n_windows]
+
+    return (flatten(sum_y), flatten(sum_yy), flatten(sum_xy),
+            flatten(np.broadcast_to(anchors, (n_blocks, window))))
+
+
+def rolling_analysis(df, data_column_name, window):
+    """
+    Calcula as métricas de analyze_data em janelas móveis sobre a série: média, mediana, desvio
+    padrão, coeficiente de variação, Pareto 80/20, inclinação e projeção da regressão e as faixas
+    de Fibonacci (valor ideal e de tensão).
+
+    Média, desvio padrão e regressão vêm de somas acumuladas (custo O(n), independente da janela),
+    calculadas por blocos e centralizadas em cada bloco para não perder precisão em séries longas,
+    com tendência ou com nível alto (ver _anchored_window_sums); mediana e Pareto usam os quantis móveis do pandas (O(n log janela)). Em cada janela, a regressão
+    usa o índice local 0..janela-1 e a projeção segue a convenção de analyze_data (janela + 1).
+
+    Parâmetros:
+    - df: DataFrame com os dados.
+    - data_column_name: Coluna a ser analisada.
+    - window: Tamanho da janela (número de valores válidos).
+
+    Retorno:
+    - DataFrame indexado pelo índice da última linha de cada janela, com uma coluna por métrica,
+      ou None em caso de erro.
+    """
+    try:
+        logging.info(f"Iniciando a análise móvel da coluna {data_column_name} com janela {window}")
+
+        if data_column_name not in df.columns:
+            raise ValueError(f"A coluna '{data_column_name}' não existe no DataFrame.")
+
+        data_column = pd.to_numeric(df[data_column_name], errors='coerce').dropna()
+        n = len(data_column)
+
+        if not isinstance(window, int) or window < 2:
+            raise ValueError("A janela deve ser um inteiro maior ou igual a 2.")
+        if window > n:
+            raise ValueError(f"A janela ({window}) é maior que o número de valores válidos ({n}).")
+
+        values = data_column.to_numpy(dtype=np.float64)
+        sum_y, sum_yy, sum_xy, anchors = _anchored_window_sums(values, window)
+
+        mean_value = sum_y / window + anchors
+        variance = np.maximum((sum_yy - sum_y * sum_y / window) / (window - 1), 0.0)
+        std_dev = np.sqrt(variance)
+
+        # Regressão com índice local: x = 0..janela-1 a partir do início da janela
+        mean_x = (window - 1) / 2.0
+        sxx = window * (window * window - 1) / 12.0
+        slope = (sum_xy - mean_x * sum_y) / sxx
+        intercept = mean_value - slope * mean_x
+        future_projection = slope * (window + 1) + intercept
+
+        rolling = data_column.rolling(window)
+        median_value = rolling.median().to_numpy()[window - 1:]
+        pareto_80_20 = rolling.quantile(0.8).to_numpy()[window - 1:]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            coef_var = std_dev / mean_value * 100
+
+        result = pd.DataFrame({
+            "Média": mean_value,
+            "Mediana": median_value,
+            "Desvio Padrão": std_dev,
+            "Coeficiente de Variação": coef_var,
+            "Pareto 80/20": pareto_80_20,
+            "Valor Ideal Fibonacci": mean_value * 1.618,
+            "Valor de Tensão": mean_value * 0.618,
+            "Inclinação": slope,
+            "Projeção Futura": future_projection,
+        }, index=data_column.index[window - 1:])
+
+        logging.info(f"Análise móvel concluída: {len(result)} janela(s)")
+        return result
+
+    except Exception as e:
+        logging.error(f"Erro na análise móvel: {e}", exc_info=True)
+        print(f"Erro na análise móvel: {e}")
+        return None
@@ -0,0 +1,224 @@
+import logging
+import numpy as np
+import pandas as pd
+from .recommendations import generate_recommendations
+
+
+def analyze_columns(df, columns=None):
+    """
+    Analisa várias colunas numéricas de uma só vez, com operações vetorizadas sobre o bloco 2-D,
+    sem chamar analyze_data coluna a coluna. Cada coluna é tratada como em analyze_data: valores
+    não numéricos são descartados e a regressão usa o índice 0..n-1 dos valores válidos.
+
+    Parâmetros:
+    - df: DataFrame com os dados.
+    - columns: Lista de colunas a analisar. Se None, todas as colunas numéricas.
+
+    Retorno:
+    - DataFrame com uma linha por coluna analisada e uma coluna por métrica, ou None em caso de erro.
+    """
+    try:
+        logging.info("Iniciando a função analyze_columns")
+
+        if columns is None:
+            numeric = df.select_dtypes(include='number')
+        else:
+            missing = [column for column in columns if column not in df.columns]
+            if missing:
+                raise ValueError(f"As colunas {', '.join(map(str, missing))} não existem no DataFrame.")
+            numeric = df[list(columns)]
+            # Converter apenas as colunas que ainda não são numéricas
+            to_convert = numeric.select_dtypes(exclude='number').columns
+            if len(to_convert) > 0:
+                numeric = numeric.copy()
+                numeric[to_convert] = numeric[to_convert].apply(pd.to_numeric, errors='coerce')
+
+        if numeric.shape[1] == 0:
+            raise ValueError("O DataFrame não contém colunas numéricas para análise.")
+
+        logging.info(f"Analisando {numeric.shape[1]} coluna(s) e {numeric.shape[0]} linha(s)")
+        metrics = _column_metrics(numeric.to_numpy(dtype=np.float64, na_value=np.nan))
+        table = pd.DataFrame(metrics, index=pd.Index(numeric.columns, name="Coluna Analisada"))
+
+        insufficient = table.index[table["Contagem"] < 2]
+        if len(insufficient) > 0:
+            logging.warning(f"Colunas sem dados numéricos suficientes: {', '.join(map(str, insufficient))}")
+            table.loc[insufficient, table.columns != "Contagem"] = np.nan
+
+        logging.info("Análise vetorizada concluída com sucesso")
+        return table
+
+    except Exception as e:
+        logging.error(f"Erro ao analisar colunas: {e}", exc_info=True)
+        print(f"Erro ao analisar colunas: {e}")
+        return None
+
+
+def analyze_groups(df, data_column_name, group_column):
+    """
+    Análise segmentada: calcula o conjunto de métricas e a projeção da regressão de analyze_data
+    para cada grupo de uma coluna categórica (região, canal, campanha...), com agregações
+    vetorizadas do groupby em vez de uma análise por subconjunto filtrado. Dentro de cada grupo,
+    a regressão usa o índice 0..n-1 dos valores válidos, na ordem do arquivo.
+
+    Parâmetros:
+    - df: DataFrame com os dados.
+    - data_column_name: Coluna numérica a ser analisada.
+    - group_column: Coluna com as categorias.
+
+    Retorno:
+    - DataFrame com uma linha por grupo, uma coluna por métrica e as recomendações de cada grupo,
+      ou None em caso de erro.
+    """
+    try:
+        logging.info(f"Iniciando a análise segmentada de {data_column_name} por {group_column}")
+
+        for column in (data_column_name, group_column):
+            if column not in df.columns:
+                raise ValueError(f"A coluna '{column}' não existe no DataFrame.")
+
+        frame = pd.DataFrame({
+            "y": pd.to_numeric(df[data_column_name], errors='coerce'),
+            "grupo": df[group_column],
+        }).dropna()
+        if frame.empty:
+            raise ValueError("A coluna selecionada não contém dados numéricos suficientes para análise.")
+
+        grouped = frame.groupby("grupo", sort=True)["y"]
+        count = grouped.transform("size")
+        mean = grouped.transform("mean")
+        # Desvios em relação à média do grupo e posição de cada valor dentro do grupo (0..n-1)
+        frame["d"] = frame["y"] - mean
+        frame["d2"] = frame["d"] * frame["d"]
+        frame["d3"] = frame["d2"] * frame["d"]
+        frame["xd"] = (grouped.cumcount() - (count - 1) / 2.0) * frame["d"]
+
+        aggregated = frame.groupby("grupo", sort=True).agg(
+            count=("y", "size"), mean=("y", "mean"), median=("y", "median"),
+            max=("y", "max"), min=("y", "min"), first=("y", "first"), last=("y", "last"),
+            m2=("d2", "sum"), m3=("d3", "sum"), sxy=("xd", "sum"),
+        )
+        pareto_80_20 = grouped.quantile(0.8)
+
+        metrics = _derived_metrics(
+            aggregated["count"].to_numpy(), aggregated["mean"].to_numpy(), aggregated["median"].to_numpy(),
+            aggregated["max"].to_numpy(), aggregated["min"].to_numpy(), pareto_80_20.to_numpy(),
+            aggregated["m2"].to_numpy(), aggregated["m3"].to_numpy(), aggregated["sxy"].to_numpy(),
+            aggregated["first"].to_numpy(), aggregated["last"].to_numpy(),
+        )
+        table = pd.DataFrame(metrics, index=aggregated.index.rename(group_column))
+
+        insufficient = table.index[table["Contagem"] < 2]
+        if len(insufficient) > 0:
+            logging.warning(f"Grupos sem dados numéricos suficientes: {', '.join(map(str, insufficient))}")
+            table.loc[insufficient, table.columns != "Contagem"] = np.nan
+
+        # Recomendações por grupo, com as mesmas regras de analyze_data
+        table["Recomendações"] = [
+            generate_recommendations(row["Média"], row["Valor Ideal Fibonacci"], row["Valor de Tensão"],
+                                     row["Pareto 80/20"], row["Desvio Padrão"], row["Projeção Futura"])
+            if row["Contagem"] >= 2 else []
+            for row in table.to_dict('records')
+        ]
+
+        logging.info(f"Análise segmentada concluída: {len(table)} grupo(s)")
+        return table
+
+    except Exception as e:
+        logging.error(f"Erro na análise segmentada: {e}", exc_info=True)
+        print(f"Erro na análise segmentada: {e}")
+        return None
+
+
+def _column_quantiles(values, count, quantiles):
+    # Quantis com interpolação linear (como pandas/numpy), por coluna, sem laço em Python:
+    # a ordenação coloca os NaN no fim de cada coluna e os índices dependem da contagem de cada uma
+    ordered = np.sort(values, axis=0)
+    column_index = np.arange(values.shape[1])
+    last = np.maximum(count - 1, 0)
+    result = []
+    for q in quantiles:
+        position = last * q
+        lower = np.floor(position).astype(np.int64)
+        upper = np.minimum(lower + 1, last)
+        weight = position - lower
+        result.append(ordered[lower, column_index] * (1 - weight) + ordered[upper, column_index] * weight)
+    return result
+
+
+def _column_metrics(values):
+    """
+    Calcula o conjunto de métricas de analyze_data para cada coluna de uma matriz (linhas x colunas) com NaN.
+    """
+    valid = ~np.isnan(values)
+    count = valid.sum(axis=0)
+    n = count.astype(np.float64)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        filled = np.where(valid, values, 0.0)
+        mean = filled.sum(axis=0) / n
+        deviations = np.where(valid, values - mean, 0.0)
+        m2 = np.einsum('ij,ij->j', deviations, deviations)
+        m3 = np.einsum('ij,ij->j', deviations * deviations, deviations)
+
+        median, pareto_80_20 = _column_quantiles(values, count, (0.5, 0.8))
+        max_value = np.where(count > 0, np.where(valid, values, -np.inf).max(axis=0), np.nan)
+        min_value = np.where(count > 0, np.where(valid, values, np.inf).min(axis=0), np.nan)
+
+        # Regressão contra a posição de cada valor válido dentro da sua coluna (0..n-1)
+        positions = np.cumsum(valid, axis=0) - 1
+        sxy = np.einsum('ij,ij->j', np.where(valid, positions - (n - 1) / 2.0, 0.0), deviations)
+
+        # Primeiro e último valor válido de cada coluna, para o CAGR
+        rows, columns = values.shape
+        column_index = np.arange(columns)
+        first_value = values[np.argmax(valid, axis=0), column_index]
+        last_value = values[rows - 1 - np.argmax(valid[::-1], axis=0), column_index]
+
+    return _derived_metrics(count, mean, median, max_value, min_value, pareto_80_20, m2, m3, sxy,
+                            first_value, last_value)
+
+
+def _derived_metrics(count, mean, median, max_value, min_value, pareto_80_20, m2, m3, sxy, first_value, last_value):
+    """
+    Monta a tabela de métricas a partir de estatísticas suficientes (arrays, um valor por série):
+    contagem, média, soma dos quadrados e dos cubos dos desvios e co-momento com o índice 0..n-1.
+    """
+    n = np.asarray(count, dtype=np.float64)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        std_dev = np.sqrt(m2 / (n - 1))
+        skewness = np.sqrt(n) * m3 / m2 ** 1.5
+
+        mean_x = (n - 1) / 2.0
+        sxx = n * (n * n - 1) / 12.0
+        slope = sxy / sxx
+        intercept = mean - slope * mean_x
+        r_squared = sxy ** 2 / (sxx * m2)
+        future_projection = slope * (n + 1) + intercept
+
+        # CAGR a partir do primeiro e do último valor da série (dados diários)
+        cagr = np.where((n > 1) & (min_value > 0),
+                        ((last_value / first_value) ** (365.0 / n) - 1) * 100,
+                        np.nan)
+
+        coef_var = std_dev / mean * 100
+
+    return {
+        "Contagem": count,
+        "Média": mean,
+        "Mediana": median,
+        "Maior Valor": max_value,
+        "Menor Valor": min_value,
+        "Valor Ideal Fibonacci": mean * 1.618,
+        "Valor de Tensão": mean * 0.618,
+        "Pareto 80/20": pareto_80_20,
+        "Desvio Padrão": std_dev,
+        "Coeficiente de Variação": coef_var,
+        "Assimetria": skewness,
+        "Inclinação": slope,
+        "Intercepto": intercept,
+        "R²": r_squared,
+        "Projeção Futura": future_projection,
+        "CAGR": cagr,
+    }
@@ -0,0 +1,72 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# Formatos de arquivo gerados para os benchmarks de importação
+FILE_FORMATS = ('.csv', '.xlsx', '.json', '.xml', '.parquet')
+
+
+def make_series(rows, seed=0):
+    """
+    Série sintética com tendência linear, ruído e valores positivos (para que o CAGR seja calculado),
+    no formato esperado por analyze_data.
+
+    Parâmetros:
+    - rows: Número de linhas.
+    - seed: Semente do gerador aleatório.
+
+    Retorno:
+    - DataFrame com a coluna 'valor'.
+    """
+    rng = np.random.default_rng(seed)
+    trend = 100.0 + 0.05 * np.arange(rows, dtype=np.float64)
+    values = np.abs(trend + rng.normal(0.0, 5.0, rows)) + 1.0
+    return pd.DataFrame({'valor': values})
+
+
+def make_table(rows, columns, seed=0):
+    """
+    Tabela sintética com várias colunas numéricas independentes (coluna_0, coluna_1, ...).
+
+    Parâmetros:
+    - rows: Número de linhas.
+    - columns: Número de colunas numéricas.
+    - seed: Semente do gerador aleatório.
+
+    Retorno:
+    - DataFrame com as colunas geradas.
+    """
+    rng = np.random.default_rng(seed)
+    trend = 0.05 * np.arange(rows, dtype=np.float64)[:, np.newaxis]
+    values = 100.0 + trend + rng.normal(0.0, 5.0, (rows, columns))
+    return pd.DataFrame(values, columns=[f'coluna_{index}' for index in range(columns)])
+
+
+def write_dataset(df, directory, extension):
+    """
+    Grava o DataFrame em um dos formatos aceitos por load_file.
+
+    Parâmetros:
+    - df: DataFrame a ser gravado.
+    - directory: Diretório de destino.
+    - extension: Extensão do arquivo (uma de FILE_FORMATS).
+
+    Retorno:
+    - Caminho do arquivo gravado.
+    """
+    path = os.path.join(directory, f"dados_{len(df)}x{len(df.columns)}{extension}")
+    if extension == '.csv':
+        df.to_csv(path, index=False)
+    elif extension == '.xlsx':
+        df.to_excel(path, index=False)
+    elif extension == '.json':
+        df.to_json(path)
+    elif extension == '.xml':
+        # Um elemento por registro e um filho por coluna, como o parse_xml espera
+        df.to_xml(path, index=False, parser='etree')
+    elif extension == '.parquet':
+        df.to_parquet(path, index=False)
+    else:
+        raise ValueError(f"Formato de arquivo não suportado nos benchmarks: {extension}")
+    return path
@@ -0,0 +1,284 @@
+import os
+
+# Execução sem janelas: os backends precisam ser definidos antes de importar matplotlib e pygame
+os.environ.setdefault("MPLBACKEND", "Agg")
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import json
+import logging
+import platform
+import shutil
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from analysis.data_analysis import analyze_data
+from analysis.data_import import load_file
+from analysis.monte_carlo import monte_carlo_simulation
+from analysis.vectorized_analysis import analyze_columns
+from .datasets import FILE_FORMATS, make_series, make_table, write_dataset
+
+# Tamanhos de cada perfil: linhas da série analisada, número de colunas (com linhas fixas),
+# número de simulações de Monte Carlo e linhas dos arquivos de importação
+PROFILES = {
+    "rapido": {
+        "linhas": [1_000, 100_000],
+        "colunas": [1, 50],
+        "linhas_por_coluna": 10_000,
+        "simulacoes": [1_000, 100_000],
+        "linhas_arquivo": [1_000, 10_000],
+    },
+    "completo": {
+        "linhas": [1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000],
+        "colunas": [1, 10, 100, 500],
+        "linhas_por_coluna": 10_000,
+        "simulacoes": [1_000, 10_000, 100_000, 1_000_000, 10_000_000],
+        "linhas_arquivo": [1_000, 100_000, 1_000_000],
+    },
+}
+
+# Arquivos Excel acima deste tamanho são lentos demais para gerar (e o formato é limitado a ~1e6 linhas)
+EXCEL_MAX_ROWS = 100_000
+
+# Diferenças abaixo destes limites não são consideradas regressão (ruído de medição)
+MIN_TIME_DIFFERENCE = 0.001
+MIN_MEMORY_DIFFERENCE_MB = 1.0
+
+
+def measure(function, items, unit, repeat=3):
+    """
+    Mede um caminho do código: tempo de parede (melhor e mediana de repeat execuções), vazão e pico
+    de memória. Uma primeira execução não cronometrada aquece o caso (imports tardios, como o do
+    SciPy, caches e alocações iniciais), para que esses custos únicos não entrem na medida. O pico é medido com tracemalloc em uma execução separada, para que o rastreamento
+    de alocações não afete o tempo; ele cobre as alocações do Python e do NumPy, mas não as feitas
+    por bibliotecas nativas com alocador próprio (como o pyarrow).
+
+    Parâmetros:
+    - function: Função sem argumentos a ser medida.
+    - items: Quantidade processada por execução (linhas, simulações, ...), para a vazão.
+    - unit: Unidade da vazão.
+    - repeat: Número de execuções cronometradas.
+
+    Retorno:
+    - Dicionário com as medidas.
+    """
+    function()
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    # O melhor tempo é o menos afetado por ruído da máquina
+    best = min(times)
+    return {
+        "Tempo (s)": best,
+        "Tempo Mediano (s)": statistics.median(times),
+        "Vazão": items / best if best > 0 else None,
+        "Unidade": unit,
+        "Pico de Memória (MB)": peak / 2 ** 20,
+    }
+
+
+def build_cases(profile, work_dir, name_filter=None):
+    """
+    Gera os casos do perfil como (nome, função, quantidade, unidade). Os dados de cada caso são
+    criados sob demanda, fora da medição, e liberados quando o próximo caso é gerado; casos fora
+    do filtro nem chegam a gerar dados. As funções recebem os dados do caso como argumentos padrão,
+    para que continuem válidas mesmo se os casos forem consumidos depois do laço.
+    """
+    sizes = PROFILES[profile]
+
+    def selected(name):
+        return not name_filter or name_filter in name
+
+    for rows in sizes["linhas"]:
+        name = f"analyze_data/linhas={rows}"
+        if selected(name):
+            df = make_series(rows)
+            yield name, lambda df=df: analyze_data(df, 'valor'), rows, "linhas/s"
+
+    for n_simulations in sizes["simulacoes"]:
+        name = f"monte_carlo_simulation/simulacoes={n_simulations}"
+        if selected(name):
+            yield (name, lambda count=n_simulations: monte_carlo_simulation(0.05, 100.0, 5.0, 1000,
+                                                                            n_simulations=count, seed=0),
+                   n_simulations, "simulações/s")
+
+    rows = sizes["linhas_por_coluna"]
+    for columns in sizes["colunas"]:
+        analyze_name = f"analyze_columns/colunas={columns}"
+        load_name = f"load_file.csv/colunas={columns}"
+        if not (selected(analyze_name) or selected(load_name)):
+            continue
+        df = make_table(rows, columns)
+        if selected(analyze_name):
+            yield analyze_name, lambda df=df: analyze_columns(df), rows * columns, "valores/s"
+        if selected(load_name):
+            path = write_dataset(df, work_dir, '.csv')
+            yield load_name, lambda path=path: load_file(path), rows * columns, "valores/s"
+
+    for rows in sizes["linhas_arquivo"]:
+        extensions = [extension for extension in FILE_FORMATS
+                      if selected(f"load_file{extension}/linhas={rows}")
+                      and not (extension == '.xlsx' and rows > EXCEL_MAX_ROWS)]
+        if not extensions:
+            continue
+        df = make_series(rows)
+        for extension in extensions:
+            try:
+                path = write_dataset(df, work_dir, extension)
+            except ImportError as e:
+                logging.warning(f"Formato {extension} ignorado (dependência ausente): {e}")
+                continue
+            yield f"load_file{extension}/linhas={rows}", lambda path=path: load_file(path), rows, "linhas/s"
+
+    if not selected("render_report"):
+        return
+    try:
+        from visualization.reports import render_report
+    except ImportError as e:
+        logging.warning(f"Benchmark do relatório ignorado (dependência ausente): {e}")
+        return
+    results = analyze_data(make_series(10_000), 'valor')
+    report_path = os.path.join(work_dir, 'relatorio.pdf')
+    yield "render_report", lambda: render_report(results, report_path), 1, "relatórios/s"
+
+
+def compare_with_baseline(results, baseline, tolerance):
+    """
+    Compara as medidas com uma baseline gravada anteriormente.
+
+    Parâmetros:
+    - results: Medidas atuais (nome do caso -> medidas).
+    - baseline: Conteúdo de um arquivo de resultados anterior.
+    - tolerance: Aumento relativo tolerado (0.2 = 20%).
+
+    Retorno:
+    - Lista de regressões encontradas.
+    """
+    regressions = []
+    reference_results = baseline.get("Resultados", {})
+    for name, current in results.items():
+        reference = reference_results.get(name)
+        if reference is None:
+            continue
+        for metric, minimum_difference in (("Tempo (s)", MIN_TIME_DIFFERENCE),
+                                           ("Pico de Memória (MB)", MIN_MEMORY_DIFFERENCE_MB)):
+            before, after = reference.get(metric), current.get(metric)
+            if before is None or after is None:
+                continue
+            if after > before * (1 + tolerance) and after - before > minimum_difference:
+                regressions.append({
+                    "Caso": name,
+                    "Métrica": metric,
+                    "Baseline": before,
+                    "Atual": after,
+                    "Variação": (after - before) / before if before else None,
+                })
+    return regressions
+
+
+def machine_info():
+    """Identificação da máquina e das versões, gravada junto com as medidas."""
+    import pandas as pd
+    return {
+        "Plataforma": platform.platform(),
+        "Processador": platform.processor() or platform.machine(),
+        "CPUs": os.cpu_count(),
+        "Python": platform.python_version(),
+        "NumPy": np.__version__,
+        "Pandas": pd.__version__,
+    }
+
+
+def run_benchmarks(profile="rapido", name_filter=None, repeat=3, baseline_path=None, tolerance=0.2):
+    """
+    Executa os benchmarks do perfil e, se houver baseline, procura regressões.
+
+    Parâmetros:
+    - profile: Nome do perfil de tamanhos (ver PROFILES).
+    - name_filter: Texto opcional; apenas casos cujo nome o contém são executados.
+    - repeat: Número de execuções cronometradas por caso.
+    - baseline_path: Arquivo de resultados anterior para comparação.
+    - tolerance: Aumento relativo tolerado antes de acusar regressão.
+
+    Retorno:
+    - Dicionário com a máquina, o perfil, as medidas e as regressões.
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Perfil desconhecido: {profile}. Use um de: {', '.join(PROFILES)}")
+
+    results = {}
+    work_dir = tempfile.mkdtemp(prefix='benchmarks_')
+    try:
+        for name, function, items, unit in build_cases(profile, work_dir, name_filter):
+            logging.info(f"Executando {name}")
+            results[name] = measure(function, items, unit, repeat=repeat)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    output = {"Máquina": machine_info(), "Perfil": profile, "Resultados": results, "Regressões": []}
+    if baseline_path and os.path.exists(baseline_path):
+        with open(baseline_path, encoding='utf-8') as baseline_file:
+            output["Regressões"] = compare_with_baseline(results, json.load(baseline_file), tolerance)
+    return output
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks do DecisionMaker (sem interface gráfica).")
+    parser.add_argument("--perfil", default="rapido", choices=sorted(PROFILES), help="Perfil de tamanhos.")
+    parser.add_argument("--filtro", default=None, help="Executa apenas os casos cujo nome contém este texto.")
+    parser.add_argument("--repeticoes", type=int, default=3, help="Execuções cronometradas por caso.")
+    parser.add_argument("--saida", default="benchmarks_resultados.json", help="Arquivo JSON de saída.")
+    parser.add_argument("--baseline", default=None, help="Arquivo JSON de uma execução anterior para comparação.")
+    parser.add_argument("--tolerancia", type=float, default=0.2,
+                        help="Aumento relativo de tempo ou memória tolerado (padrão: 0.2 = 20%%).")
+    parser.add_argument("--atualizar-baseline", action="store_true",
+                        help="Grava as medidas atuais como a nova baseline.")
+    parser.add_argument("--verbose", action="store_true", help="Mostra o log das análises.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.ERROR,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+
+    output = run_benchmarks(args.perfil, name_filter=args.filtro, repeat=args.repeticoes,
+                            baseline_path=args.baseline, tolerance=args.tolerancia)
+
+    with open(args.saida, 'w', encoding='utf-8') as output_file:
+        json.dump(output, output_file, ensure_ascii=False, indent=2)
+    if args.atualizar_baseline and args.baseline:
+        shutil.copyfile(args.saida, args.baseline)
+
+    for name, measures in output["Resultados"].items():
+        throughput = measures["Vazão"]
+        throughput = f"{throughput:,.{0 if throughput >= 100 else 2}f} {measures['Unidade']}" if throughput else "-"
+        print(f"{name:<45} {measures['Tempo (s)']:>10.4f}s  {throughput:>28}  "
+              f"{measures['Pico de Memória (MB)']:>10.1f} MB")
+
+    print(f"\nResultados gravados em: {args.saida}")
+    if output["Regressões"]:
+        print(f"\n{len(output['Regressões'])} regressão(ões) em relação à baseline:")
+        for regression in output["Regressões"]:
+            print(f"  {regression['Caso']} - {regression['Métrica']}: {regression['Baseline']:.4f} -> "
+                  f"{regression['Atual']:.4f} (+{regression['Variação']:.0%})")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
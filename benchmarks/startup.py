@@ -0,0 +1,120 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# Raiz do projeto (onde estão main.py e gui.py)
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Meta de tempo entre o início do processo e o primeiro quadro da janela
+STARTUP_LIMIT = 1.0
+
+# Marca impressa pelo processo filho quando o primeiro quadro é desenhado
+FIRST_FRAME_MARKER = "PRIMEIRO_QUADRO"
+
+# Executado no processo filho: intercepta a atualização da tela para avisar o processo pai do primeiro
+# quadro e fechar a janela em seguida. Os módulos carregados até ali são listados para o relatório
+CHILD_SCRIPT = f"""
+import sys
+import pygame
+
+def _first_frame(original):
+    def update(*args, **kwargs):
+        result = original(*args, **kwargs)
+        if not getattr(update, 'done', False):
+            update.done = True
+            heavy = [name for name in ('pandas', 'scipy.stats', 'matplotlib.pyplot', 'seaborn', 'fpdf')
+                     if name in sys.modules]
+            print('{FIRST_FRAME_MARKER}', ','.join(heavy), flush=True)
+            pygame.event.post(pygame.event.Event(pygame.QUIT))
+        return result
+    return update
+
+pygame.display.flip = _first_frame(pygame.display.flip)
+pygame.display.update = _first_frame(pygame.display.update)
+
+import gui
+gui.run_app()
+"""
+
+
+def measure_startup(python=sys.executable):
+    """
+    Mede uma inicialização a frio da interface: um novo interpretador importa o gui e abre a janela
+    (com o driver de vídeo 'dummy' do SDL, sem exibir nada). O tempo vai do lançamento do processo
+    até o primeiro quadro, e inclui a inicialização do próprio Python.
+
+    Parâmetros:
+    - python: Interpretador a ser usado.
+
+    Retorno:
+    - Tupla (segundos até o primeiro quadro, módulos pesados já carregados nesse momento).
+    """
+    env = dict(os.environ)
+    env.setdefault("SDL_VIDEODRIVER", "dummy")
+    env.setdefault("SDL_AUDIODRIVER", "dummy")
+    env["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+
+    start = time.perf_counter()
+    process = subprocess.Popen([python, "-c", CHILD_SCRIPT], cwd=PROJECT_DIR, env=env,
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    elapsed = None
+    heavy_modules = []
+    try:
+        for line in process.stdout:
+            if line.startswith(FIRST_FRAME_MARKER):
+                elapsed = time.perf_counter() - start
+                heavy_modules = [name for name in line[len(FIRST_FRAME_MARKER):].strip().split(',') if name]
+                break
+    finally:
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+    if elapsed is None:
+        raise RuntimeError(f"A interface terminou sem desenhar nenhum quadro (código {process.returncode}).")
+    return elapsed, heavy_modules
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark da inicialização a frio da interface.")
+    parser.add_argument("--repeticoes", type=int, default=5, help="Número de inicializações medidas.")
+    parser.add_argument("--limite", type=float, default=STARTUP_LIMIT,
+                        help="Tempo máximo aceito até o primeiro quadro, em segundos (padrão: 1.0).")
+    parser.add_argument("--saida", default=None, help="Arquivo JSON opcional para gravar as medidas.")
+    args = parser.parse_args(argv)
+
+    times = []
+    heavy_modules = []
+    for _ in range(args.repeticoes):
+        elapsed, heavy_modules = measure_startup()
+        times.append(elapsed)
+
+    median = statistics.median(times)
+    output = {
+        "Tempos (s)": times,
+        "Melhor (s)": min(times),
+        "Mediana (s)": median,
+        "Limite (s)": args.limite,
+        "Módulos Pesados no Primeiro Quadro": heavy_modules,
+    }
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as output_file:
+            json.dump(output, output_file, ensure_ascii=False, indent=2)
+
+    print(f"Inicialização até o primeiro quadro: melhor {min(times):.3f} s, mediana {median:.3f} s "
+          f"({args.repeticoes} execuções)")
+    print(f"Módulos pesados já carregados: {', '.join(heavy_modules) or 'nenhum'}")
+    if median > args.limite:
+        print(f"Acima do limite de {args.limite:.2f} s")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
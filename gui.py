@@ -1,18 +1,14 @@
 import pygame
-from pygame.locals import QUIT, MOUSEBUTTONDOWN
-from analysis.data_import import import_file
-from analysis.data_analysis import analyze_data
-from visualization.plots import visualize_results, plot_boxplot  # Atualizado para plot_boxplot
-from visualization.reports import download_results
+from pygame.locals import QUIT, MOUSEBUTTONDOWN, MOUSEMOTION
 from analysis.recommendations import explain_results
-from utils.helpers import draw_button, load_logo
+from utils.helpers import Button, FrameMetrics, load_logo
+from utils.jobs import JobManager, DONE, FAILED
 import logging
 import threading
 import tkinter as tk
 from tkinter import simpledialog, messagebox
 import os
-import pandas as pd
-import numpy as np  # Importação do numpy para geração de dados simulados
+import time
 
 # Configuração de logging para console e arquivo
 logging.basicConfig(level=logging.DEBUG,
@@ -22,55 +18,264 @@ logging.basicConfig(level=logging.DEBUG,
                         logging.StreamHandler()
                     ])
 
-# Variáveis globais
+# Variáveis globais: resultados, dados e coluna da última análise concluída
 results = None
 df = None
-processing = False
 column_name = None  # Variável global para rastrear a coluna selecionada
 
+# Gerenciador das tarefas em segundo plano (importações e análises), criado em run_app
+job_manager = None
+
+# Número de tarefas executadas ao mesmo tempo (as demais aguardam na fila) e de tarefas listadas na tela
+MAX_CONCURRENT_JOBS = 2
+MAX_VISIBLE_JOBS = 4
+
+# Limite de quadros por segundo e tempo máximo de espera por eventos do laço da interface
+MAX_FPS = 60
+IDLE_TIMEOUT_MS = 1000
+
+# Métricas de desenho da interface (tempo de quadro e uso de CPU), disponíveis durante a execução
+frame_metrics = None
+
 # Caminho para a fonte Open Sans
 FONT_PATH = os.path.join(
     'C:/Users/GabrielRocca/source/repos/games/decision-maker/assets/fonts/Open_Sans/static',
     'OpenSans-Regular.ttf'
 )
 
-def run_analysis(df, data_column_name, plot_boxplot_flag=False):
+# Diretórios do cache dos resultados das análises (memória + disco), para não refazer a análise de
+# dados inalterados, e do cache dos arquivos importados (colunas numéricas em .npy), para reabrir
+# arquivos grandes sem novo parsing
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.decision_maker', 'cache')
+IMPORT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.decision_maker', 'importacoes')
+
+# Módulos pesados (pandas, scipy, matplotlib, seaborn, fpdf) não são importados na inicialização:
+# são carregados no primeiro uso ou em segundo plano, logo depois que a janela aparece
+PREWARM_MODULES = (
+    "analysis.data_import",
+    "analysis.import_cache",
+    "analysis.cache",
+    "scipy.stats",
+    "visualization.plots",
+    "visualization.reports",
+    "seaborn",
+    "fpdf",
+)
+
+_analysis_cache = None
+_import_cache = None
+_caches_lock = threading.Lock()
+
+
+def get_analysis_cache():
+    """Cache das análises, criado no primeiro uso."""
+    global _analysis_cache
+    with _caches_lock:
+        if _analysis_cache is None:
+            from analysis.cache import AnalysisCache
+            _analysis_cache = AnalysisCache(max_entries=32, cache_dir=CACHE_DIR, max_disk_bytes=512 * 1024 ** 2)
+        return _analysis_cache
+
+
+def get_import_cache():
+    """Cache das importações, criado no primeiro uso."""
+    global _import_cache
+    with _caches_lock:
+        if _import_cache is None:
+            from analysis.import_cache import ImportCache
+            _import_cache = ImportCache(IMPORT_CACHE_DIR, max_bytes=2 * 1024 ** 3)
+        return _import_cache
+
+
+def prewarm_modules(module_names=PREWARM_MODULES):
     """
-    Função para executar a análise de dados em uma thread separada.
+    Importa os módulos pesados em uma thread em segundo plano, para que o primeiro clique em
+    importar, visualizar ou baixar não espere pelas importações. Falhas são apenas registradas:
+    o módulo será importado de novo (e o erro, exibido) quando for de fato usado.
     """
-    global results
-    global processing
-    processing = True
+    def prewarm():
+        import importlib
+
+        start = time.perf_counter()
+        for module_name in module_names:
+            try:
+                importlib.import_module(module_name)
+            except Exception as e:
+                logging.warning(f"Não foi possível pré-carregar o módulo {module_name}: {e}")
+        logging.info(f"Módulos pré-carregados em {time.perf_counter() - start:.2f} s")
 
+    prewarm_thread = threading.Thread(target=prewarm, name="prewarm", daemon=True)
+    prewarm_thread.start()
+    return prewarm_thread
+
+def show_error(message):
+    """Exibe uma mensagem de erro com o tkinter (deve ser chamada na thread principal)."""
+    root = tk.Tk()
+    root.withdraw()
+    messagebox.showerror("Erro", message)
+    root.destroy()
+
+
+def show_info(title, message):
+    """Exibe uma mensagem informativa com o tkinter (deve ser chamada na thread principal)."""
+    root = tk.Tk()
+    root.withdraw()
+    messagebox.showinfo(title, message)
+    root.destroy()
+
+
+def run_analysis(df, data_column_name, plot_boxplot_flag=False):
+    """
+    Agenda a análise de uma coluna no gerenciador de tarefas. A análise roda em segundo plano e
+    pode ser cancelada; ao terminar, o resultado passa a ser o exibido pelos botões e, com
+    plot_boxplot_flag, o box plot é desenhado na thread principal.
+
+    Retorno:
+    - O Job da análise.
+    """
     def analyze():
-        global results
-        global processing
-        try:
-            logging.info("Iniciando análise dos dados...")
-            # Chamada para a função analyze_data, que agora retorna um dicionário de resultados
-            results = analyze_data(df, data_column_name, plot_histogram_flag=plot_boxplot_flag)
-
-            if plot_boxplot_flag and results is not None:
-                # Obter data_column e dates para o box plot
-                data_column = df[data_column_name]
-                data_column = pd.to_numeric(data_column, errors='coerce').dropna()
-                dates = data_column.index
-
-                # Chamar plot_boxplot com os argumentos necessários
-                plot_boxplot(data_column, dates, column_name=data_column_name)
-            if results is not None:
-                logging.info("Análise dos dados concluída com sucesso.")
-            else:
-                logging.warning("A análise de dados não retornou resultados válidos.")
-        except Exception as e:
-            logging.error(f"Erro ao analisar dados: {e}")
-            results = None  # Garantir que results seja None em caso de erro
-        finally:
-            processing = False
-            pygame.event.post(pygame.event.Event(pygame.USEREVENT))  # Postar um evento customizado para atualizar a interface
+        logging.info(f"Iniciando análise da coluna {data_column_name}...")
+        # Chamada para a função analyze_data (via cache), que retorna um dicionário de resultados
+        import pandas as pd
+        from analysis.bootstrap import interactive_resamples
+        from analysis.cache import cached_analyze_data
+
+        # Intervalos de confiança por bootstrap, com o número de reamostragens limitado ao tempo interativo
+        n_values = int(pd.to_numeric(df[data_column_name], errors='coerce').notna().sum())
+        analysis_cache = get_analysis_cache()
+        analysis_results = cached_analyze_data(df, data_column_name, cache=analysis_cache,
+                                               plot_histogram_flag=plot_boxplot_flag,
+                                               bootstrap_resamples=interactive_resamples(n_values))
+        logging.info(f"Estatísticas do cache de análises: {analysis_cache.stats()}")
+        if analysis_results is None:
+            raise ValueError("A análise de dados não retornou resultados válidos.")
+        return analysis_results
+
+    analysed_df = df
+
+    def finished(job):
+        # Executada na thread principal, pelo laço da interface
+        global results, df, column_name
+        if job.status != DONE:
+            if job.status == FAILED:
+                logging.warning(f"A análise da coluna {data_column_name} falhou: {job.error}")
+            return
+
+        results = job.result
+        df = analysed_df
+        column_name = data_column_name
+        logging.info("Análise dos dados concluída com sucesso.")
+
+        if plot_boxplot_flag:
+            import pandas as pd
+            from visualization.plots import plot_boxplot
+
+            # Obter data_column e dates para o box plot
+            data_column = analysed_df[data_column_name]
+            data_column = pd.to_numeric(data_column, errors='coerce').dropna()
+            dates = data_column.index
+
+            # Chamar plot_boxplot com os argumentos necessários (o matplotlib só roda na thread principal)
+            plot_boxplot(data_column, dates, column_name=data_column_name)
+
+    return job_manager.submit(f"Análise de '{data_column_name}'", analyze, on_done=finished)
+
+
+def run_import():
+    """
+    Pede o arquivo ao usuário e agenda a importação no gerenciador de tarefas. Ao terminar, as
+    colunas a analisar são pedidas na thread principal e cada uma vira uma análise na fila.
+
+    Retorno:
+    - O Job da importação, ou None se nenhum arquivo foi escolhido.
+    """
+    from analysis.data_import import ask_file_path
+
+    file_path = ask_file_path()
+    if not file_path:
+        return None
+
+    def load():
+        from analysis.import_cache import cached_load_file
+
+        loaded = cached_load_file(file_path, cache=get_import_cache())
+        if loaded is None:
+            raise ValueError(f"Não foi possível importar o arquivo {file_path}.")
+        return loaded
+
+    def finished(job):
+        if job.status == DONE:
+            select_columns(job.result)
+        elif job.status == FAILED:
+            show_error(f"Erro ao importar arquivo: {job.error}")
+
+    return job_manager.submit(f"Importação de {os.path.basename(file_path)}", load, on_done=finished)
+
+
+def run_download(report_results):
+    """
+    Pede o local do PDF (na thread principal) e agenda a geração do relatório no gerenciador de
+    tarefas, com progresso e cancelamento. Ao terminar, o resultado é exibido ao usuário.
+
+    Retorno:
+    - O Job do relatório, ou None se o usuário cancelou a escolha do arquivo.
+    """
+    from visualization.reports import ask_report_path, render_report
+
+    save_path = ask_report_path()
+    if not save_path:
+        show_info("Operação Cancelada", "A operação de salvar o PDF foi cancelada.")
+        return None
+
+    def finished(job):
+        if job.status == DONE:
+            show_info("PDF Gerado", f"PDF gerado com sucesso e salvo em:\n{save_path}")
+        elif job.status == FAILED:
+            show_error(f"Ocorreu um erro ao baixar os resultados:\n{job.error}")
+
+    return job_manager.submit(f"Relatório {os.path.basename(save_path)}", render_report, report_results, save_path,
+                              on_done=finished)
+
+
+def select_columns(imported_df):
+    """
+    Pede ao usuário uma ou mais colunas numéricas (separadas por vírgula) e agenda uma análise
+    para cada uma.
+    """
+    # Obter colunas numéricas e solicitar ao usuário que selecione as colunas
+    numeric_columns = imported_df.select_dtypes(include='number').columns.tolist()
+    if not numeric_columns:
+        show_error("O DataFrame não contém colunas numéricas para análise.")
+        return
+
+    root = tk.Tk()
+    root.withdraw()
+    answer = simpledialog.askstring(
+        "Seleção de Colunas",
+        f"Digite o nome de uma ou mais colunas numéricas para análise, separadas por vírgula:\n"
+        f"{', '.join(numeric_columns)}"
+    )
+    root.destroy()
+
+    selected = [name.strip() for name in (answer or '').split(',') if name.strip()]
+    invalid = [name for name in selected if name not in numeric_columns]
+    if not selected or invalid:
+        show_error("Coluna inválida ou não numérica selecionada"
+                   + (f": {', '.join(invalid)}." if invalid else "."))
+        return
+
+    # Iniciar uma análise por coluna; elas rodam em segundo plano enquanto a interface continua livre
+    for name in dict.fromkeys(selected):
+        run_analysis(imported_df, name)
+
+
+def _notify_interface(job):
+    # Chamada das threads das tarefas: acorda o laço da interface para redesenhar o painel de tarefas
+    try:
+        pygame.event.post(pygame.event.Event(pygame.USEREVENT))
+    except pygame.error:
+        pass  # A janela já foi fechada
 
-    analysis_thread = threading.Thread(target=analyze)
-    analysis_thread.start()
 
 def run_app():
     """
@@ -78,15 +283,15 @@ def run_app():
     """
     global results
     global df
-    global processing
     global column_name  # Acessar a variável global
+    global job_manager
 
     # Inicialização do pygame
     pygame.init()
 
     # Configurações da tela
     screen_width = 800
-    screen_height = 600
+    screen_height = 720  # Espaço para o painel de tarefas abaixo dos botões
     screen = pygame.display.set_mode((screen_width, screen_height))
     pygame.display.set_caption("Análise de Dados - DecisionMaker")
 
@@ -106,6 +311,12 @@ def run_app():
         logging.error("Fonte Open Sans não encontrada. Certifique-se de que o caminho está correto.")
         font = pygame.font.Font(None, 24)
 
+    # Fonte menor para o painel de tarefas
+    try:
+        small_font = pygame.font.Font(FONT_PATH, 18)
+    except FileNotFoundError:
+        small_font = pygame.font.Font(None, 18)
+
     # Dimensões e posição do botão
     button_width = 350  # Largura do botão
     button_height = 50
@@ -138,111 +349,141 @@ def run_app():
         primeiro_botao_y + 280  # Novo botão para o box plot
     ]
 
-    running = True
+    # Botões com as superfícies de cada estado (normal e hover) renderizadas uma única vez
+    import_button = Button("Importar Arquivo", center_x, button_y_positions[0],
+                           button_width, button_height, green, dark_green, text_color, font)
+    result_buttons = [
+        Button("Visualizar Resultado", center_x, button_y_positions[1],
+               button_width, button_height, green, dark_green, text_color, font),
+        Button("Baixar Resultado", center_x, button_y_positions[2],
+               button_width, button_height, green, dark_green, text_color, font),
+        Button("Como Avaliar os Resultados", center_x, button_y_positions[3],
+               button_width, button_height, green, dark_green, text_color, font),
+        # Botão para visualizar o box plot
+        Button("Visualizar Box Plot", center_x, button_y_positions[4],
+               button_width, button_height, blue, dark_blue, white, font),
+    ]
 
-    while running:
-        screen.fill(black)
+    # Painel de tarefas: as últimas tarefas agendadas, abaixo dos botões (clique em uma ativa para cancelá-la)
+    jobs_panel_top = button_y_positions[4] + button_height + margem
+    jobs_line_height = small_font.get_height() + 4
+    job_rects = []
 
-        # Exibir imagem do logo
-        if logo_image and logo_rect:
-            screen.blit(logo_image, logo_rect)
+    job_manager = JobManager(max_workers=MAX_CONCURRENT_JOBS, on_update=_notify_interface)
 
-        # Renderizar botões
-        draw_button(screen, "Importar Arquivo", center_x, button_y_positions[0],
-                    button_width, button_height, green, dark_green, text_color, font)
+    global frame_metrics
+    frame_metrics = FrameMetrics()
+    clock = pygame.time.Clock()
+    running = True
+    prewarm_thread = None
+    visible_buttons = []
+    full_redraw = True  # A tela inteira precisa ser redesenhada
+    dirty_rects = []  # Áreas alteradas desde o último quadro (hover dos botões)
 
-        if df is not None and column_name is not None and not processing:
-            # Mostrar botões adicionais apenas se não estiver processando e df e column_name estão definidos
-            draw_button(screen, "Visualizar Resultado", center_x, button_y_positions[1],
-                        button_width, button_height, green, dark_green, text_color, font)
-            draw_button(screen, "Baixar Resultado", center_x, button_y_positions[2],
-                        button_width, button_height, green, dark_green, text_color, font)
-            draw_button(screen, "Como Avaliar os Resultados", center_x, button_y_positions[3],
-                        button_width, button_height, green, dark_green, text_color, font)
+    while running:
+        # Mostrar botões adicionais apenas quando há resultados de uma análise concluída
+        buttons = [import_button]
+        if results is not None and df is not None and column_name is not None:
+            buttons += result_buttons
+        if buttons != visible_buttons:
+            visible_buttons = buttons
+            full_redraw = True
+
+        # Só desenha quando algo mudou: a tela inteira após mudanças de estado, ou apenas os botões
+        # cujo hover mudou
+        if full_redraw or dirty_rects:
+            frame_start = time.perf_counter()
+            if full_redraw:
+                mouse_pos = pygame.mouse.get_pos()
+                screen.fill(black)
+
+                # Exibir imagem do logo
+                if logo_image and logo_rect:
+                    screen.blit(logo_image, logo_rect)
+
+                for button in visible_buttons:
+                    button.update_hover(mouse_pos)
+                    button.draw(screen)
+
+                # Painel de tarefas
+                job_rects = []
+                for line, job in enumerate(reversed(job_manager.jobs()[-MAX_VISIBLE_JOBS:])):
+                    label = job.describe() + ("  (clique para cancelar)" if job.active else "")
+                    label_surface = small_font.render(label, True, white if job.active else dark_green)
+                    label_rect = label_surface.get_rect(centerx=screen_width // 2,
+                                                        top=jobs_panel_top + line * jobs_line_height)
+                    screen.blit(label_surface, label_rect)
+                    job_rects.append((label_rect, job))
+                pygame.display.flip()
+            else:
+                pygame.display.update(dirty_rects)
+            frame_metrics.record(time.perf_counter() - frame_start, partial=not full_redraw)
+            full_redraw = False
+            dirty_rects = []
 
-            # Botão para visualizar o box plot
-            draw_button(screen, "Visualizar Box Plot", center_x, button_y_positions[4],
-                        button_width, button_height, blue, dark_blue, white, font)
+            # Limita a taxa de quadros em sequências de eventos (por exemplo, o mouse em movimento)
+            clock.tick(MAX_FPS)
 
-        pygame.display.flip()
+        # Com a janela já visível, carrega os módulos pesados em segundo plano
+        if prewarm_thread is None:
+            prewarm_thread = prewarm_modules()
 
-        for event in pygame.event.get():
+        # Bloqueia até o próximo evento em vez de girar o laço: com a janela parada, não há consumo de CPU
+        events = [pygame.event.wait(IDLE_TIMEOUT_MS)] + pygame.event.get()
+        for event in events:
             if event.type == QUIT:
                 running = False
 
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                # Esc cancela todas as tarefas em andamento
+                job_manager.cancel_all()
+
+            elif event.type == MOUSEMOTION:
+                for button in visible_buttons:
+                    if button.update_hover(event.pos):
+                        dirty_rects.append(button.draw(screen, background=black))
+
+            elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                full_redraw = True
+
             elif event.type == MOUSEBUTTONDOWN:
+                # Diálogos e telas abertas pelos botões cobrem a janela e podem mudar o estado
+                full_redraw = True
                 mouse_x, mouse_y = event.pos
-                if center_x <= mouse_x <= center_x + button_width:
-                    # Botão: Importar Arquivo
+                clicked_job = next((job for rect, job in job_rects if rect.collidepoint(event.pos)), None)
+                if clicked_job is not None:
+                    # Clique em uma tarefa do painel: cancelar
+                    clicked_job.cancel()
+                elif center_x <= mouse_x <= center_x + button_width:
+                    # Botão: Importar Arquivo (disponível mesmo com tarefas em andamento)
                     if button_y_positions[0] <= mouse_y <= button_y_positions[0] + button_height:
-                        if not processing:
-                            df = import_file()
-                            if df is not None:
-                                # Obter colunas numéricas e solicitar ao usuário que selecione uma
-                                numeric_columns = df.select_dtypes(include='number').columns.tolist()
-                                if not numeric_columns:
-                                    root = tk.Tk()
-                                    root.withdraw()
-                                    messagebox.showerror("Erro", "O DataFrame não contém colunas numéricas para análise.")
-                                    root.destroy()
-                                    continue
-
-                                root = tk.Tk()
-                                root.withdraw()
-                                column_name = simpledialog.askstring(
-                                    "Seleção de Coluna",
-                                    f"Digite o nome de uma das colunas numéricas para análise:\n{', '.join(numeric_columns)}"
-                                )
-                                root.destroy()
-
-                                if column_name not in numeric_columns:
-                                    root = tk.Tk()
-                                    root.withdraw()
-                                    messagebox.showerror("Erro", "Coluna inválida ou não numérica selecionada.")
-                                    root.destroy()
-                                    continue
-
-                                # Iniciar a análise
-                                run_analysis(df, column_name)
+                        run_import()
                     # Outros botões
-                    elif df is not None and column_name is not None and not processing:
+                    elif result_buttons[0] in visible_buttons:
                         # Botão: Visualizar Resultado
                         if button_y_positions[1] <= mouse_y <= button_y_positions[1] + button_height:
-                            if results is not None:
-                                visualize_results(results)
-                            else:
-                                root = tk.Tk()
-                                root.withdraw()
-                                messagebox.showerror("Erro", "Os resultados ainda não estão disponíveis.")
-                                root.destroy()
+                            from visualization.plots import visualize_results
+                            visualize_results(results)
                         # Botão: Baixar Resultado
                         elif button_y_positions[2] <= mouse_y <= button_y_positions[2] + button_height:
-                            if results is not None:
-                                download_results(results)
-                            else:
-                                root = tk.Tk()
-                                root.withdraw()
-                                messagebox.showerror("Erro", "Os resultados ainda não estão disponíveis.")
-                                root.destroy()
+                            run_download(results)
                         # Botão: Como Avaliar os Resultados
                         elif button_y_positions[3] <= mouse_y <= button_y_positions[3] + button_height:
-                            if results is not None:
-                                explain_results(screen)
-                            else:
-                                root = tk.Tk()
-                                root.withdraw()
-                                messagebox.showerror("Erro", "Os resultados ainda não estão disponíveis.")
-                                root.destroy()
+                            explain_results(screen)
                         # Botão: Visualizar Box Plot
                         elif button_y_positions[4] <= mouse_y <= button_y_positions[4] + button_height:
-                            # Executar análise e visualizar o box plot
-                            if not processing:
-                                run_analysis(df, column_name, plot_boxplot_flag=True)
+                            # Executar análise (via cache) e visualizar o box plot
+                            run_analysis(df, column_name, plot_boxplot_flag=True)
 
             elif event.type == pygame.USEREVENT:
-                # Evento customizado para garantir que a interface atualize após a conclusão do processamento
-                logging.info("Atualizando interface após processamento.")
+                # Evento customizado das tarefas: progresso, conclusão ou chamadas para a thread principal
+                full_redraw = True
+
+        # Diálogos e gráficos pedidos pelas tarefas concluídas rodam aqui, na thread principal
+        job_manager.run_main_thread_calls()
 
+    logging.info(f"Métricas da interface: {frame_metrics.stats()}")
+    job_manager.shutdown(wait=False)
     pygame.quit()
 
 if __name__ == "__main__":
@@ -1,3 +1,10 @@
+import sys
+
+# Requisito mínimo: o gerenciador de tarefas e os pools de processos usam Executor.shutdown(cancel_futures=True)
+# e o rastreamento usa tracemalloc.reset_peak, ambos do Python 3.9
+if sys.version_info < (3, 9):
+    sys.exit("O DecisionMaker requer Python 3.9 ou superior.")
+
 from gui import run_app
 
 if __name__ == "__main__":
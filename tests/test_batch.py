@@ -0,0 +1,24 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from analysis.batch import run_batch
+
+
+def test_run_batch_writes_final_stage_timings(tmp_path):
+    data_dir = tmp_path / "dados"
+    data_dir.mkdir()
+    values = np.random.default_rng(0).normal(100.0, 5.0, 200).cumsum()
+    pd.DataFrame({"a": values, "b": values * 2}).to_csv(data_dir / "serie.csv", index=False)
+    output_path = tmp_path / "resultados.json"
+
+    output = run_batch([str(data_dir)], output_path=str(output_path), max_workers=1)
+
+    with open(output_path, encoding="utf-8") as output_file:
+        written = json.load(output_file)
+    performance = written["Desempenho"]
+    assert performance["Tempo por Estágio (s)"]["escrita"] > 0
+    assert performance["Tempo Total (s)"] > 0
+    assert performance == json.loads(json.dumps(output["Desempenho"]))
+    assert [record["Coluna Analisada"] for record in written["Resultados"]] == ["a", "b"]
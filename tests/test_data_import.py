@@ -0,0 +1,82 @@
+import pandas as pd
+import pytest
+
+from analysis.data_import import (close_connections, get_connection, load_file, parse_xml, pushdown_statistics,
+                                  read_csv_fast)
+
+
+@pytest.mark.parametrize("numeric", [False, True])
+def test_read_csv_fast_with_utf8_bom(tmp_path, numeric):
+    path = tmp_path / "excel.csv"
+    path.write_bytes("a,b\n1,2\n3,4\n".encode("utf-8-sig"))
+
+    df = read_csv_fast(str(path), numeric=numeric)
+    assert list(df.columns) == ["a", "b"]
+    assert df["a"].tolist() == [1, 3]
+
+    df = read_csv_fast(str(path), columns=["a"], numeric=numeric)
+    assert list(df.columns) == ["a"]
+    assert df["a"].tolist() == [1, 3]
+
+
+@pytest.mark.parametrize("numeric", [False, True])
+def test_read_csv_fast_with_duplicate_headers(tmp_path, numeric):
+    path = tmp_path / "duplicadas.csv"
+    path.write_text("a,a,b,a.1\n1,2,3,4\n5,6,7,8\n", encoding="utf-8")
+
+    df = read_csv_fast(str(path), numeric=numeric)
+    expected = pd.read_csv(path)
+    assert list(df.columns) == list(expected.columns) == ["a", "a.2", "b", "a.1"]
+    for column in expected.columns:
+        assert df[column].tolist() == expected[column].tolist()
+
+    # A segunda coluna 'a' não é descartada
+    df = read_csv_fast(str(path), columns=["a.2"], numeric=numeric)
+    assert df["a.2"].tolist() == [2, 6]
+
+
+@pytest.mark.filterwarnings("ignore::DeprecationWarning")
+@pytest.mark.parametrize("version", [1, 2])
+def test_load_file_reads_feather_v1_and_v2(tmp_path, version):
+    feather = pytest.importorskip("pyarrow.feather")
+    path = tmp_path / "dados.feather"
+    feather.write_feather(pd.DataFrame({"a": [1.0, 2.0], "b": [3.0, 4.0]}), str(path), version=version)
+
+    df = load_file(str(path), columns=["b", "ausente"])
+    assert list(df.columns) == ["b"]
+    assert df["b"].tolist() == [3.0, 4.0]
+
+
+def test_pushdown_statistics_keeps_caller_transaction(tmp_path):
+    params = {"database": str(tmp_path / "dados.db")}
+    conn = get_connection("sqlite", params)
+    try:
+        conn.execute("CREATE TABLE t (d INTEGER, v REAL)")
+        conn.executemany("INSERT INTO t VALUES (?, ?)", [(1, 1.0), (2, 2.0), (3, 4.0)])
+        conn.commit()
+
+        # Transação do chamador em aberto na mesma conexão reaproveitada
+        conn.execute("INSERT INTO t VALUES (4, 100.0)")
+        stats = pushdown_statistics("sqlite", params, "SELECT v FROM t WHERE d <= 3 ORDER BY d; \n", "v")
+        assert stats["count"] == 3
+        assert stats["first"] == 1.0 and stats["last"] == 4.0
+        assert stats["median"] == 2.0
+        assert conn.in_transaction
+
+        conn.rollback()
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 3
+    finally:
+        close_connections()
+
+
+def test_parse_xml_types_columns_once_across_batches(tmp_path):
+    rows = [("1", "00123", "1"), ("2", "5", "x"), ("3", "7", "2.5")]
+    path = tmp_path / "dados.xml"
+    path.write_text("<r>" + "".join(f"<i><a>{a}</a><b>{b}</b><c>{c}</c></i>" for a, b, c in rows) + "</r>",
+                    encoding="utf-8")
+
+    # Um registro por lote: o tipo de cada coluna não pode depender do lote
+    df = parse_xml(str(path), batch_size=1)
+    assert df["a"].tolist() == [1, 2, 3]
+    assert df["b"].tolist() == ["00123", "5", "7"]
+    assert df["c"].tolist() == ["1", "x", "2.5"]
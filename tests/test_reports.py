@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("fpdf")
+
+from analysis.data_analysis import analyze_data
+from visualization.reports import render_report, render_reports
+
+
+def _results_with_non_positive_value():
+    values = np.random.default_rng(0).normal(0.0, 1.0, 500)
+    values[0] = -1.0
+    results = analyze_data(pd.DataFrame({"valor": values}), "valor")
+    assert results["CAGR"] is None
+    return results
+
+
+def test_render_report_prints_missing_metrics(tmp_path):
+    output_path = tmp_path / "relatorio.pdf"
+    render_report(_results_with_non_positive_value(), str(output_path))
+    assert output_path.stat().st_size > 0
+
+
+@pytest.mark.parametrize("consolidated", [False, True])
+def test_render_reports_skips_invalid_series_only(tmp_path, consolidated):
+    valid = _results_with_non_positive_value()
+    invalid = dict(valid, Média="texto")
+
+    summary = render_reports([valid, invalid], str(tmp_path), consolidated=consolidated,
+                             labels=["valida", "invalida"], n_workers=1)
+    assert summary["Séries"] == 1
+    assert [skipped["Série"] for skipped in summary["Séries Ignoradas"]] == ["invalida"]
+    assert len(summary["Arquivos"]) == 1
+    assert summary["Páginas"] >= 1
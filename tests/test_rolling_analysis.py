@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import linregress
+
+from analysis.rolling_analysis import rolling_analysis
+
+
+def _series(n, level=0.0, trend=0.0, step=0.0, seed=0):
+    rng = np.random.default_rng(seed)
+    positions = np.arange(n, dtype=np.float64)
+    return level + trend * positions + np.where(positions < n // 2, 0.0, step) + rng.normal(size=n)
+
+
+@pytest.mark.parametrize("window", [2, 50, 1000])
+@pytest.mark.parametrize("level, trend, step", [(1e6, 0.0, 0.0), (0.0, 1.0, 0.0), (1e6, 1.0, 1e6)])
+def test_rolling_matches_per_window_std_and_linregress(window, level, trend, step):
+    values = _series(300_000, level=level, trend=trend, step=step)
+    result = rolling_analysis(pd.DataFrame({"valor": values}), "valor", window)
+    assert len(result) == len(values) - window + 1
+
+    # Janelas sorteadas ao longo da série, mais as do início e do fim
+    starts = np.concatenate([[0, len(values) - window],
+                             np.random.default_rng(1).integers(0, len(values) - window, 200)])
+    for start in starts:
+        segment = values[start:start + window]
+        row = result.iloc[start]
+        regression = linregress(np.arange(window), segment)
+        assert row["Média"] == pytest.approx(segment.mean(), rel=1e-12)
+        assert row["Desvio Padrão"] == pytest.approx(np.std(segment, ddof=1), rel=1e-9)
+        assert row["Inclinação"] == pytest.approx(regression.slope, abs=1e-9)
+        assert row["Projeção Futura"] == pytest.approx(
+            regression.slope * (window + 1) + regression.intercept, rel=1e-9, abs=1e-6)
@@ -1,6 +1,40 @@
 import pygame
 import logging
 import os
+import time
+from collections import deque
+
+# Superfícies já renderizadas dos botões, por (texto, tamanho, cor, cor do texto, fonte)
+_button_surfaces = {}
+
+
+def render_button(text, w, h, color, text_color, font):
+    """
+    Renderiza o botão (fundo com cantos arredondados, borda e texto) em uma superfície própria,
+    uma única vez para cada combinação de texto, tamanho, cores e fonte. As chamadas seguintes
+    retornam a superfície guardada, sem chamar font.render de novo.
+    """
+    key = (text, w, h, color, text_color, font)
+    surface = _button_surfaces.get(key)
+    if surface is None:
+        # Superfície com transparência, para que os cantos arredondados mostrem o fundo da tela
+        surface = pygame.Surface((w, h), pygame.SRCALPHA)
+
+        # Desenha um retângulo com cantos arredondados
+        border_radius = 15  # Ajuste este valor para cantos mais ou menos arredondados
+        pygame.draw.rect(surface, color, (0, 0, w, h), border_radius=border_radius)
+
+        # Adicionar uma borda ao redor do botão
+        border_color = (248, 248, 242)  # Cor da borda
+        pygame.draw.rect(surface, border_color, (0, 0, w, h), width=2, border_radius=border_radius)
+
+        # Renderiza o texto do botão
+        button_text = font.render(text, True, text_color)
+        text_rect = button_text.get_rect(center=(w // 2, h // 2))
+        surface.blit(button_text, text_rect)
+        _button_surfaces[key] = surface
+    return surface
+
 
 def draw_button(screen, text, x, y, w, h, color, hover_color, text_color, font):
     # Obtém a posição atual do mouse
@@ -12,18 +46,87 @@ def draw_button(screen, text, x, y, w, h, color, hover_color, text_color, font):
     else:
         current_color = color  # Usa a cor normal do botão
 
-    # Desenha um retângulo com cantos arredondados
-    border_radius = 15  # Ajuste este valor para cantos mais ou menos arredondados
-    pygame.draw.rect(screen, current_color, (x, y, w, h), border_radius=border_radius)
+    screen.blit(render_button(text, w, h, current_color, text_color, font), (x, y))
+    return pygame.Rect(x, y, w, h)
+
+
+class Button:
+    """
+    Botão da interface com as superfícies de cada estado (normal e hover) pré-renderizadas.
+    Guarda o estado de hover, para que a tela só seja redesenhada quando ele muda.
+
+    Parâmetros:
+    - text: Texto do botão.
+    - x, y, w, h: Posição e tamanho.
+    - color, hover_color, text_color: Cores do botão normal, com o mouse sobre ele e do texto.
+    - font: Fonte do texto.
+    """
+
+    def __init__(self, text, x, y, w, h, color, hover_color, text_color, font):
+        self.text = text
+        self.rect = pygame.Rect(x, y, w, h)
+        self.surfaces = {
+            False: render_button(text, w, h, color, text_color, font),
+            True: render_button(text, w, h, hover_color, text_color, font),
+        }
+        self.hovered = False
+
+    def contains(self, pos):
+        # Mesmo critério de draw_button (bordas inclusivas)
+        return self.rect.left <= pos[0] <= self.rect.right and self.rect.top <= pos[1] <= self.rect.bottom
+
+    def update_hover(self, pos):
+        """Atualiza o estado de hover para a posição do mouse. Retorna True se o estado mudou."""
+        hovered = self.contains(pos)
+        changed = hovered != self.hovered
+        self.hovered = hovered
+        return changed
+
+    def draw(self, screen, background=None):
+        """Desenha o botão no estado atual; com background, limpa antes a área do botão."""
+        if background is not None:
+            screen.fill(background, self.rect)
+        screen.blit(self.surfaces[self.hovered], self.rect)
+        return self.rect
+
+
+class FrameMetrics:
+    """
+    Métricas do laço de desenho: número de quadros (completos e parciais), tempo de desenho de
+    cada quadro (nos últimos window quadros) e uso de CPU do processo desde o início, que inclui
+    as threads de análise em execução.
+
+    Parâmetros:
+    - window: Número de quadros recentes considerados nos tempos de quadro.
+    """
+
+    def __init__(self, window=300):
+        self.frame_times = deque(maxlen=window)
+        self.frames = 0
+        self.partial_frames = 0
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
 
-    # Adicionar uma borda ao redor do botão
-    border_color = (248, 248, 242)  # Cor da borda
-    pygame.draw.rect(screen, border_color, (x, y, w, h), width=2, border_radius=border_radius)
+    def record(self, duration, partial=False):
+        """Registra um quadro desenhado em duration segundos (partial: só retângulos alterados)."""
+        self.frame_times.append(duration)
+        self.frames += 1
+        if partial:
+            self.partial_frames += 1
 
-    # Renderiza o texto do botão
-    button_text = font.render(text, True, text_color)
-    text_rect = button_text.get_rect(center=(x + w // 2, y + h // 2))
-    screen.blit(button_text, text_rect)
+    def stats(self):
+        """Resumo das métricas, com os mesmos nomes usados nos logs."""
+        wall = time.perf_counter() - self._wall_start
+        cpu = time.process_time() - self._cpu_start
+        frame_times = list(self.frame_times)
+        return {
+            "Quadros": self.frames,
+            "Quadros Parciais": self.partial_frames,
+            "Quadros por Segundo": self.frames / wall if wall > 0 else None,
+            "Tempo Médio de Quadro (ms)": 1000 * sum(frame_times) / len(frame_times) if frame_times else None,
+            "Tempo Máximo de Quadro (ms)": 1000 * max(frame_times) if frame_times else None,
+            "Uso de CPU (%)": 100 * cpu / wall if wall > 0 else None,
+        }
 
 
 def load_logo(screen_width):
@@ -0,0 +1,266 @@
+import contextvars
+import itertools
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Tarefa em execução no contexto atual (cada thread do gerenciador tem a sua)
+_current_job = contextvars.ContextVar('current_job', default=None)
+
+# Estados de uma tarefa
+PENDING = "pendente"
+RUNNING = "em execução"
+DONE = "concluída"
+CANCELLED = "cancelada"
+FAILED = "falhou"
+
+# Intervalo mínimo entre duas notificações de progresso da mesma tarefa (mudanças de etapa são sempre notificadas)
+PROGRESS_NOTIFY_INTERVAL = 0.05
+
+
+class JobCancelled(BaseException):
+    """
+    Levantada nos pontos de verificação (report_progress) de uma tarefa cujo cancelamento foi pedido.
+    Herda de BaseException, como KeyboardInterrupt, para atravessar os blocos except Exception das
+    funções de análise (que registram o erro e retornam None) até o gerenciador de tarefas.
+    """
+
+
+class Job:
+    """
+    Uma tarefa agendada no JobManager: identificador, estado, etapa e progresso atuais, resultado
+    ou erro. O cancelamento é cooperativo: a tarefa para no próximo report_progress.
+    """
+
+    def __init__(self, job_id, name, notify=None):
+        self.id = job_id
+        self.name = name
+        self.status = PENDING
+        self.stage = None
+        self.progress = None
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.future = None
+        self._notify = notify
+        self._last_notify = 0.0
+        self._cancel_event = threading.Event()
+
+    @property
+    def cancel_requested(self):
+        return self._cancel_event.is_set()
+
+    @property
+    def active(self):
+        return self.status in (PENDING, RUNNING)
+
+    def cancel(self):
+        """Pede o cancelamento. Tarefas que ainda não começaram nem chegam a ser executadas."""
+        if not self.active:
+            return False
+        self._cancel_event.set()
+        logging.info(f"Cancelamento solicitado para a tarefa #{self.id} ({self.name})")
+        return True
+
+    def report(self, fraction=None, stage=None):
+        """Atualiza a etapa e o progresso e levanta JobCancelled se o cancelamento foi pedido."""
+        stage_changed = stage is not None and stage != self.stage
+        if stage is not None:
+            self.stage = stage
+        self.progress = fraction
+        now = time.perf_counter()
+        if self._notify is not None and (stage_changed or now - self._last_notify >= PROGRESS_NOTIFY_INTERVAL):
+            self._last_notify = now
+            self._notify(self)
+        if self._cancel_event.is_set():
+            raise JobCancelled(f"Tarefa #{self.id} cancelada")
+
+    def describe(self):
+        """Texto curto do estado da tarefa, para a interface."""
+        text = f"#{self.id} {self.name}: {self.status}"
+        if self.status == RUNNING and self.stage:
+            text += f" - {self.stage}"
+            if self.progress is not None:
+                text += f" {self.progress:.0%}"
+        return text
+
+    def to_dict(self):
+        return {
+            "Id": self.id,
+            "Nome": self.name,
+            "Estado": self.status,
+            "Etapa": self.stage,
+            "Progresso": self.progress,
+            "Duração (s)": (self.finished or time.time()) - self.started if self.started else None,
+            "Erro": str(self.error) if self.error is not None else None,
+        }
+
+
+def current_job():
+    """Tarefa em execução no contexto atual, ou None."""
+    return _current_job.get()
+
+
+def report_progress(fraction=None, stage=None):
+    """
+    Informa o progresso da tarefa atual e serve de ponto de verificação para o cancelamento.
+    Fora de uma tarefa do JobManager não faz nada, então as etapas longas (importação, blocos
+    do Monte Carlo e do bootstrap, relatório) podem chamá-la sempre.
+
+    Parâmetros:
+    - fraction: Fração concluída da etapa (entre 0 e 1), ou None se desconhecida.
+    - stage: Nome da etapa atual (opcional).
+    """
+    job = _current_job.get()
+    if job is not None:
+        job.report(fraction, stage)
+
+
+class JobManager:
+    """
+    Gerenciador de tarefas em segundo plano (importações e análises) sobre um pool de threads.
+    Cada tarefa recebe um identificador e fica guardada, com seu resultado, até ser descartada
+    (são mantidas as max_finished últimas tarefas concluídas). Funções que precisam da thread
+    principal (janelas do tkinter e do matplotlib) são enfileiradas com call_in_main_thread e
+    executadas pelo laço da interface com run_main_thread_calls.
+
+    Threads (e não processos) porque as etapas pesadas rodam no NumPy, no pandas e no pyarrow,
+    que liberam o GIL, e porque os DataFrames não precisam ser copiados entre processos.
+
+    Parâmetros:
+    - max_workers: Número de tarefas executadas ao mesmo tempo; as demais aguardam na fila.
+    - on_update: Função chamada (de qualquer thread) com a tarefa quando ela muda de estado ou de
+      progresso, e com None quando há chamadas pendentes para a thread principal.
+    - max_finished: Número de tarefas concluídas mantidas com seus resultados.
+    """
+
+    def __init__(self, max_workers=2, on_update=None, max_finished=100):
+        self.on_update = on_update
+        self.max_finished = max_finished
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tarefa")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._main_thread_calls = queue.SimpleQueue()
+
+    def _notify(self, job):
+        if self.on_update is not None:
+            try:
+                self.on_update(job)
+            except Exception as e:
+                logging.warning(f"Erro ao notificar a interface sobre a tarefa: {e}")
+
+    def submit(self, name, function, *args, on_done=None, **kwargs):
+        """
+        Agenda function(*args, **kwargs) como uma nova tarefa.
+
+        Parâmetros:
+        - name: Nome da tarefa, exibido na interface.
+        - function: Função a executar; pode chamar report_progress.
+        - on_done: Função opcional chamada na thread principal com a tarefa concluída
+          (com sucesso, erro ou cancelamento).
+
+        Retorno:
+        - O Job criado.
+        """
+        job = Job(next(self._ids), name, notify=self._notify)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._discard_finished()
+        # A tarefa herda o contexto de quem a agendou (por exemplo, um rastreador ativo)
+        context = contextvars.copy_context()
+        job.future = self._executor.submit(context.run, self._run, job, function, args, kwargs, on_done)
+        logging.info(f"Tarefa #{job.id} agendada: {name}")
+        self._notify(job)
+        return job
+
+    def _run(self, job, function, args, kwargs, on_done):
+        if job.cancel_requested:
+            job.status = CANCELLED
+        else:
+            token = _current_job.set(job)
+            job.status = RUNNING
+            job.started = time.time()
+            self._notify(job)
+            try:
+                job.result = function(*args, **kwargs)
+                job.status = DONE
+                logging.info(f"Tarefa #{job.id} concluída: {job.name}")
+            except JobCancelled:
+                job.status = CANCELLED
+                logging.info(f"Tarefa #{job.id} cancelada: {job.name}")
+            except Exception as e:
+                job.error = e
+                job.status = FAILED
+                logging.error(f"Erro na tarefa #{job.id} ({job.name}): {e}", exc_info=True)
+            finally:
+                _current_job.reset(token)
+        job.finished = time.time()
+        self._notify(job)
+        if on_done is not None:
+            self.call_in_main_thread(on_done, job)
+
+    def _discard_finished(self):
+        finished = [job_id for job_id, job in self._jobs.items() if not job.active]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        """Tarefa com o identificador, ou None."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self):
+        """Todas as tarefas guardadas, na ordem em que foram agendadas."""
+        with self._lock:
+            return list(self._jobs.values())
+
+    def active_jobs(self):
+        """Tarefas pendentes ou em execução."""
+        return [job for job in self.jobs() if job.active]
+
+    def results(self):
+        """Resultados das tarefas concluídas com sucesso, por identificador."""
+        return {job.id: job.result for job in self.jobs() if job.status == DONE}
+
+    def cancel(self, job_id):
+        """Pede o cancelamento da tarefa. Retorna True se ela ainda estava ativa."""
+        job = self.get(job_id)
+        return job.cancel() if job is not None else False
+
+    def cancel_all(self):
+        """Pede o cancelamento de todas as tarefas ativas."""
+        for job in self.active_jobs():
+            job.cancel()
+
+    def call_in_main_thread(self, function, *args):
+        """Enfileira function(*args) para ser executada pela thread principal."""
+        self._main_thread_calls.put((function, args))
+        self._notify(None)
+
+    def run_main_thread_calls(self):
+        """Executa as chamadas enfileiradas para a thread principal. Deve ser chamada pelo laço da interface."""
+        while True:
+            try:
+                function, args = self._main_thread_calls.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                function(*args)
+            except Exception as e:
+                logging.error(f"Erro em chamada na thread principal: {e}", exc_info=True)
+                print(f"Erro em chamada na thread principal: {e}")
+
+    def shutdown(self, wait=True):
+        """Cancela as tarefas ativas e encerra o pool de threads."""
+        self.cancel_all()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        # Tarefas que ainda estavam na fila não chegam a ser executadas
+        for job in self.jobs():
+            if job.future is not None and job.future.cancelled():
+                job.status = CANCELLED
@@ -0,0 +1,237 @@
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+
+# Rastreador ativo e etapa aberta no contexto atual (cada thread ou tarefa tem o seu)
+_active_tracer = contextvars.ContextVar('active_tracer', default=None)
+_current_span = contextvars.ContextVar('current_span', default=None)
+
+PROMETHEUS_PREFIX = "decision_maker"
+
+
+class _NoOpSpan:
+    """Etapa usada quando não há rastreamento ativo: não mede nada."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def set(self, **attributes):
+        pass
+
+
+_NOOP_SPAN = _NoOpSpan()
+
+
+class Span:
+    """
+    Uma etapa medida: duração, atributos (por exemplo, número de linhas) e, se o rastreador
+    acompanhar a memória, os bytes alocados (saldo ao fim da etapa) e o pico durante a etapa.
+    """
+
+    def __init__(self, tracer, name, attributes):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.parent = None
+        self.start = None
+        self.duration = None
+        self.allocated_bytes = None
+        self.peak_bytes = None
+        self._memory_start = None
+        self._peak_so_far = 0
+        self._token = None
+
+    @property
+    def path(self):
+        return f"{self.parent.path}/{self.name}" if self.parent is not None else self.name
+
+    def set(self, **attributes):
+        """Acrescenta atributos à etapa (por exemplo, linhas após a limpeza)."""
+        self.attributes.update(attributes)
+
+    def __enter__(self):
+        self.parent = _current_span.get()
+        self._token = _current_span.set(self)
+        if self.tracer.track_memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            # O pico do tracemalloc é global: guardamos o da etapa externa antes de reiniciá-lo
+            if self.parent is not None:
+                self.parent._peak_so_far = max(self.parent._peak_so_far, peak - self.parent._memory_start)
+            tracemalloc.reset_peak()
+            self._memory_start = current
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.duration = time.perf_counter() - self.start
+        if self._memory_start is not None and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            self.allocated_bytes = current - self._memory_start
+            self.peak_bytes = max(self._peak_so_far, peak - self._memory_start)
+            if self.parent is not None and self.parent._memory_start is not None:
+                self.parent._peak_so_far = max(self.parent._peak_so_far,
+                                               peak - self.parent._memory_start)
+        if exc_type is not None:
+            self.attributes["Erro"] = exc_type.__name__
+        _current_span.reset(self._token)
+        self.tracer._record(self)
+        return False
+
+    def to_dict(self):
+        record = {"Etapa": self.path, "Duração (s)": self.duration}
+        if self.allocated_bytes is not None:
+            record["Bytes Alocados"] = self.allocated_bytes
+            record["Pico de Memória (bytes)"] = self.peak_bytes
+        record.update(self.attributes)
+        return record
+
+
+class Tracer:
+    """
+    Rastreador de etapas de uma execução (importação, análise, simulação, gráficos, relatório).
+    As funções instrumentadas chamam span(...) e só medem algo quando há um rastreador ativo
+    no contexto; sem ele, o custo é uma consulta a uma ContextVar.
+
+    Parâmetros:
+    - name: Nome da execução (usado nos rótulos da exportação).
+    - track_memory: Se True, mede também a memória alocada por etapa com tracemalloc
+      (que deixa o código mais lento enquanto ativo). Como o tracemalloc é global, as medidas de
+      memória só são precisas quando uma única execução é rastreada por vez.
+    """
+
+    def __init__(self, name="análise", track_memory=False):
+        self.name = name
+        self.track_memory = track_memory
+        self.spans = []
+        self._lock = threading.Lock()
+        self._started_tracemalloc = False
+
+    def span(self, name, **attributes):
+        return Span(self, name, attributes)
+
+    def _record(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    def activate(self):
+        """Context manager que torna este rastreador o ativo no contexto atual."""
+        return _Activation(self)
+
+    def to_dict(self):
+        """Etapas concluídas, na ordem em que terminaram, em formato serializável."""
+        with self._lock:
+            spans = list(self.spans)
+        roots = [span for span in spans if span.parent is None]
+        return {
+            "Nome": self.name,
+            "Duração Total (s)": sum(span.duration for span in roots),
+            "Etapas": [span.to_dict() for span in spans],
+        }
+
+    def to_json(self, path=None):
+        """Exporta o rastreamento em JSON; com path, grava no arquivo."""
+        text = json.dumps(self.to_dict(), ensure_ascii=False, indent=2, default=str)
+        if path:
+            _write_atomic(path, text)
+        return text
+
+    def to_prometheus(self, path=None):
+        """
+        Exporta o rastreamento no formato texto do Prometheus (por exemplo, para o textfile
+        collector do node_exporter). Etapas repetidas são somadas por caminho.
+        """
+        totals = {}
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            total = totals.setdefault(span.path, {"duration": 0.0, "count": 0, "rows": None, "bytes": None,
+                                                  "peak": None})
+            total["duration"] += span.duration
+            total["count"] += 1
+            rows = span.attributes.get("Linhas")
+            if rows is not None:
+                total["rows"] = (total["rows"] or 0) + rows
+            if span.allocated_bytes is not None:
+                total["bytes"] = (total["bytes"] or 0) + span.allocated_bytes
+                total["peak"] = max(total["peak"] or 0, span.peak_bytes)
+
+        metrics = (
+            ("stage_duration_seconds", "Duração total de cada etapa, em segundos.", "duration"),
+            ("stage_calls", "Número de execuções de cada etapa.", "count"),
+            ("stage_rows", "Linhas processadas em cada etapa.", "rows"),
+            ("stage_allocated_bytes", "Saldo de bytes alocados em cada etapa.", "bytes"),
+            ("stage_peak_bytes", "Maior pico de memória de cada etapa, em bytes.", "peak"),
+        )
+        lines = []
+        for metric, description, field in metrics:
+            samples = [(stage, total[field]) for stage, total in totals.items() if total[field] is not None]
+            if not samples:
+                continue
+            lines.append(f"# HELP {PROMETHEUS_PREFIX}_{metric} {description}")
+            lines.append(f"# TYPE {PROMETHEUS_PREFIX}_{metric} gauge")
+            for stage, value in samples:
+                labels = f'trace="{_escape_label(self.name)}",stage="{_escape_label(stage)}"'
+                lines.append(f"{PROMETHEUS_PREFIX}_{metric}{{{labels}}} {value}")
+        text = "\n".join(lines) + "\n"
+        if path:
+            _write_atomic(path, text)
+        return text
+
+
+class _Activation:
+    def __init__(self, tracer):
+        self.tracer = tracer
+        self._token = None
+
+    def __enter__(self):
+        if self.tracer.track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.tracer._started_tracemalloc = True
+        self._token = _active_tracer.set(self.tracer)
+        return self.tracer
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _active_tracer.reset(self._token)
+        if self.tracer._started_tracemalloc:
+            tracemalloc.stop()
+            self.tracer._started_tracemalloc = False
+        return False
+
+
+def current_tracer():
+    """Rastreador ativo no contexto atual, ou None."""
+    return _active_tracer.get()
+
+
+def span(name, **attributes):
+    """
+    Abre uma etapa no rastreador ativo. Sem rastreador ativo, retorna uma etapa que não mede nada.
+
+    Uso:
+        with span("regressão", Linhas=len(values)) as stage:
+            ...
+            stage.set(Simulações=1000)
+    """
+    tracer = _active_tracer.get()
+    if tracer is None:
+        return _NOOP_SPAN
+    return Span(tracer, name, attributes)
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _write_atomic(path, text):
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as output_file:
+        output_file.write(text)
+    os.replace(temp_path, path)
+    logging.info(f"Rastreamento gravado em {path}")
@@ -3,22 +3,9 @@ import tkinter as tk
 from tkinter import messagebox
 import logging
 import numpy as np
-import seaborn as sns  # Adicionando seaborn para o box plot
-import os
-
-# Caminho para a fonte Open Sans
-FONT_PATH = os.path.join(
-    'C:/Users/GabrielRocca/source/repos/games/decision-maker/assets/fonts/Open_Sans/static',
-    'OpenSans-Regular.ttf'
-)
-
-# Definir uma fonte padrão usando Open Sans
-if os.path.exists(FONT_PATH):
-    plt.rcParams['font.family'] = 'Open Sans'
-    plt.rcParams['pdf.fonttype'] = 42  # Para garantir compatibilidade ao salvar em PDF
-else:
-    logging.warning("Fonte Open Sans não encontrada. Usando fonte padrão DejaVu Sans.")
-    plt.rcParams['font.family'] = 'DejaVu Sans'
+from analysis.monte_carlo import as_simulation_summary
+from utils.tracing import span
+from visualization.style import apply_style
 
 
 def visualize_results(results):
@@ -28,8 +15,8 @@ def visualize_results(results):
     """
     try:
         # Filtrar resultados para plotagem (excluindo chaves específicas)
-        plot_results = {k: v for k, v in results.items() if k not in ["Recomendações", "Simulação de Monte Carlo", "Coluna Analisada"]}
-        simulated_projections = results.get("Simulação de Monte Carlo", [])
+        plot_results = {k: v for k, v in results.items() if k not in ["Recomendações", "Simulação de Monte Carlo", "Coluna Analisada", "Intervalos de Confiança", "Rastreamento"]}
+        simulated_projections = as_simulation_summary(results.get("Simulação de Monte Carlo"))
 
         # Verificar se os valores são numéricos
         for key, value in plot_results.items():
@@ -42,48 +29,46 @@ def visualize_results(results):
         messagebox.showinfo("Visualização", "Os resultados serão exibidos em um gráfico.")
         root.destroy()
 
-        plt.figure(figsize=(10, 12))
-
-        # Primeiro subplot: Gráfico de Barras
-        plt.subplot(2, 1, 1)
-        metrics = list(plot_results.keys())
-        values = list(plot_results.values())
+        with span("gráficos"):
+            apply_style()
+            plt.figure(figsize=(10, 12))
 
-        # Gerar uma lista de cores dinamicamente
-        colors = plt.cm.viridis(np.linspace(0, 1, len(metrics)))
-
-        bars = plt.bar(metrics, values, color=colors)
-        plt.xlabel('Métricas')
-        plt.ylabel('Valores')
-        plt.title('Resultados da Análise de Dados')
-        plt.grid(axis='y', linestyle='--', alpha=0.7)
+            # Primeiro subplot: Gráfico de Barras
+            plt.subplot(2, 1, 1)
+            metrics = list(plot_results.keys())
+            values = list(plot_results.values())
 
-        if len(metrics) > 5:
-            plt.xticks(rotation=45, ha='right')
+            # Gerar uma lista de cores dinamicamente
+            colors = plt.cm.viridis(np.linspace(0, 1, len(metrics)))
 
-        for bar in bars:
-            yval = bar.get_height()
-            plt.text(bar.get_x() + bar.get_width() / 2, yval + 0.05,
-                     f"{yval:.2f}", ha='center', va='bottom')
+            bars = plt.bar(metrics, values, color=colors)
+            plt.xlabel('Métricas')
+            plt.ylabel('Valores')
+            plt.title('Resultados da Análise de Dados')
+            plt.grid(axis='y', linestyle='--', alpha=0.7)
 
-        # Segundo subplot: Box Plot da Simulação de Monte Carlo
-        plt.subplot(2, 1, 2)
-        if isinstance(simulated_projections, np.ndarray) and simulated_projections.size > 0:
-            # Achatar o array se for multidimensional
-            if simulated_projections.ndim > 1:
-                simulated_projections_flat = simulated_projections.flatten()
+            if len(metrics) > 5:
+                plt.xticks(rotation=45, ha='right')
+
+            for bar in bars:
+                yval = bar.get_height()
+                plt.text(bar.get_x() + bar.get_width() / 2, yval + 0.05,
+                         f"{yval:.2f}", ha='center', va='bottom')
+
+            # Segundo subplot: Box Plot da Simulação de Monte Carlo
+            plt.subplot(2, 1, 2)
+            if simulated_projections is not None:
+                # O box plot usa a amostra de tamanho fixo guardada no resumo, sem copiar todas as projeções
+                import seaborn as sns  # Carregado só quando o primeiro gráfico é gerado
+                sns.boxplot(y=simulated_projections.sample.values, color='lightblue')
+                plt.xlabel('Simulações')
+                plt.ylabel('Valores Projetados')
+                plt.title('Simulação de Monte Carlo - Box Plot das Projeções Futuras')
+                plt.grid(axis='y', linestyle='--', alpha=0.7)
             else:
-                simulated_projections_flat = simulated_projections
-
-            sns.boxplot(y=simulated_projections_flat, color='lightblue')
-            plt.xlabel('Simulações')
-            plt.ylabel('Valores Projetados')
-            plt.title('Simulação de Monte Carlo - Box Plot das Projeções Futuras')
-            plt.grid(axis='y', linestyle='--', alpha=0.7)
-        else:
-            logging.warning("Simulação de Monte Carlo não encontrada nos resultados.")
+                logging.warning("Simulação de Monte Carlo não encontrada nos resultados.")
 
-        plt.tight_layout()
+            plt.tight_layout()
         plt.show()
 
     except Exception as e:
@@ -118,7 +103,10 @@ def plot_boxplot(data, dates, column_name, screen=None):
             screen.after(0, lambda: plot_boxplot(data, dates, column_name, screen))
             return
 
+        import seaborn as sns  # Carregado só quando o primeiro gráfico é gerado
+
         # Preparar os dados para o Box Plot
+        apply_style()
         plt.figure(figsize=(10, 6))
         sns.boxplot(y=data, color='lightblue')
         plt.xlabel('Simulações')
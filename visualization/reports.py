@@ -1,158 +1,440 @@
-import matplotlib.pyplot as plt
-import tempfile
+import contextvars
+import io
+import itertools
 import os
-from fpdf import FPDF
+import re
+import tempfile
+import threading
+import time
 import tkinter as tk
 from tkinter import messagebox, filedialog
 import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-import seaborn as sns  # Adicionando seaborn para o box plot
+from analysis.monte_carlo import as_simulation_summary
+from utils.jobs import report_progress
+from utils.tracing import span
+from visualization.style import apply_style
 
-# Definir caminho para a fonte Open Sans
-FONT_PATH = os.path.join('C:/Users/GabrielRocca/source/repos/games/decision-maker/assets/fonts/Open_Sans/static', 'OpenSans-Regular.ttf')
+# Tamanho e resolução do gráfico do relatório
+REPORT_CHART_SIZE = (10, 12)
+REPORT_CHART_DPI = 100
 
-# Definir uma fonte padrão
-if os.path.exists(FONT_PATH):
-    plt.rcParams['font.family'] = 'Open Sans'
-    plt.rcParams['pdf.fonttype'] = 42  # Para garantir que a fonte seja incorporada corretamente
-else:
-    logging.warning("Fonte Open Sans não encontrada. Usando fonte padrão DejaVu Sans.")
-    plt.rcParams['font.family'] = 'DejaVu Sans'
+# Modelo de figura do relatório, um por thread: as figuras do matplotlib não são thread-safe,
+# mas cada thread reaproveita a sua entre relatórios em vez de criar uma nova a cada vez
+_figure_templates = threading.local()
 
-def download_results(results):
+# Threads que desenham os gráficos enquanto o texto do PDF é montado (criadas no primeiro relatório)
+_chart_executor = None
+_chart_executor_lock = threading.Lock()
+
+
+def _report_figure():
+    """Figura (com os dois eixos do relatório) da thread atual, limpa para um novo desenho."""
+    figure = getattr(_figure_templates, 'figure', None)
+    if figure is None:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        apply_style()
+        # API orientada a objetos com o backend Agg: nada passa pelo estado global do pyplot
+        figure = Figure(figsize=REPORT_CHART_SIZE, dpi=REPORT_CHART_DPI, facecolor='white')
+        FigureCanvasAgg(figure)
+        figure.subplots(2, 1)
+        _figure_templates.figure = figure
+    else:
+        for axes in figure.axes:
+            axes.clear()
+    return figure
+
+
+def render_chart(plot_results, simulated_projections):
+    """
+    Desenha o gráfico do relatório (barras das métricas e box plot da simulação de Monte Carlo)
+    em memória. Pode ser chamada de várias threads ao mesmo tempo.
+
+    Parâmetros:
+    - plot_results: Dicionário com as métricas numéricas.
+    - simulated_projections: SimulationSummary da simulação, ou None.
+
+    Retorno:
+    - Imagem PNG (RGB, sem transparência), em bytes.
+    """
+    import seaborn as sns  # Carregado só quando o primeiro relatório é gerado
+
+    figure = _report_figure()
+    bar_axes, box_axes = figure.axes
+
+    # Primeiro subplot: Gráfico de Barras
+    # Métricas não calculadas (None) ficam fora do gráfico
+    metrics = [key for key, value in plot_results.items() if value is not None]
+    values = [plot_results[key] for key in metrics]
+
+    # Gerar uma lista de cores dinamicamente para o número de métricas
+    from matplotlib import colormaps
+    colors = colormaps['viridis'](np.linspace(0, 1, len(metrics)))
+
+    bars = bar_axes.bar(metrics, values, color=colors)
+    bar_axes.set_xlabel('Métricas')
+    bar_axes.set_ylabel('Valores')
+    bar_axes.set_title('Resultados da Análise de Dados')
+    bar_axes.grid(axis='y', linestyle='--', alpha=0.7)
+
+    # Rotacionar labels do eixo X se houver muitas métricas
+    if len(metrics) > 5:
+        bar_axes.tick_params(axis='x', labelrotation=45)
+        for label in bar_axes.get_xticklabels():
+            label.set_horizontalalignment('right')
+
+    # Adicionar rótulos de dados em cada barra
+    for bar in bars:
+        yval = bar.get_height()
+        bar_axes.text(bar.get_x() + bar.get_width() / 2, yval + 0.05,
+                      f"{yval:.2f}", ha='center', va='bottom')
+
+    # Segundo subplot: Box Plot da Simulação de Monte Carlo
+    if simulated_projections is not None:
+        # O box plot usa a amostra de tamanho fixo guardada no resumo, sem copiar todas as projeções
+        sns.boxplot(y=simulated_projections.sample.values, color='lightblue', ax=box_axes)
+        box_axes.set_xlabel('Simulações')
+        box_axes.set_ylabel('Valores Projetados')
+        box_axes.set_title('Simulação de Monte Carlo - Box Plot das Projeções Futuras')
+        box_axes.grid(axis='y', linestyle='--', alpha=0.7)
+
+        # Adicionar rótulos de dados
+        quartiles = simulated_projections.overall_quantile([0.25, 0.5, 0.75])
+        mediana = quartiles[1]
+        q1, q3 = quartiles[0], quartiles[2]
+
+        box_axes.text(0, mediana, f'Mediana: {mediana:.2f}', horizontalalignment='center', color='black', weight='semibold')
+        box_axes.text(0, q1, f'Q1: {q1:.2f}', horizontalalignment='center', color='blue')
+        box_axes.text(0, q3, f'Q3: {q3:.2f}', horizontalalignment='center', color='blue')
+    else:
+        logging.warning("Simulação de Monte Carlo não encontrada ou está vazia.")
+
+    # Gravar o gráfico em memória, sem arquivo temporário. O PNG é RGB, sem canal alfa (o fundo da
+    # figura é opaco): com alfa, o fpdf 1.x separa o canal pixel a pixel em Python, o que custa
+    # mais que desenhar o gráfico; sem ele, os dados comprimidos do PNG vão direto para o PDF
+    figure.tight_layout()
+    figure.canvas.draw()
+    from PIL import Image
+
+    rgb = np.asarray(figure.canvas.buffer_rgba())[..., :3]
+    buffer = io.BytesIO()
+    Image.fromarray(rgb).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def _get_chart_executor():
+    global _chart_executor
+    with _chart_executor_lock:
+        if _chart_executor is None:
+            _chart_executor = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix="grafico")
+        return _chart_executor
+
+
+def _render_chart_stage(plot_results, simulated_projections):
+    with span("gráfico do relatório"):
+        return render_chart(plot_results, simulated_projections)
+
+
+def _embed_image(pdf, png_bytes, x, w):
+    """Insere a imagem PNG no PDF direto da memória (fpdf2) ou, no fpdf 1.x, por um arquivo temporário."""
+    from fpdf import FPDF_VERSION
+
+    if int(FPDF_VERSION.split('.')[0]) >= 2:
+        pdf.image(io.BytesIO(png_bytes), x=x, w=w)
+        return
+
+    # O fpdf 1.x só lê imagens de arquivos: nome único, para permitir relatórios simultâneos
+    file_descriptor, chart_path = tempfile.mkstemp(prefix='chart_', suffix='.png')
     try:
-        # Remover as chaves que não são valores numéricos simples
-        plot_results = {k: v for k, v in results.items() if k not in ["Recomendações", "Simulação de Monte Carlo", "Coluna Analisada"]}
-        simulated_projections = results.get("Simulação de Monte Carlo", [])
-
-        # Verificar se plot_results contém apenas valores numéricos
-        for key, value in plot_results.items():
-            if not isinstance(value, (int, float, np.integer, np.floating)):
-                raise ValueError(f"O valor de '{key}' não é numérico.")
-
-        plt.figure(figsize=(10, 12))
-
-        # Primeiro subplot: Gráfico de Barras
-        plt.subplot(2, 1, 1)
-        metrics = list(plot_results.keys())
-        values = list(plot_results.values())
-
-        # Gerar uma lista de cores dinamicamente para o número de métricas
-        colors = plt.cm.viridis(np.linspace(0, 1, len(metrics)))
-
-        bars = plt.bar(metrics, values, color=colors)
-        plt.xlabel('Métricas')
-        plt.ylabel('Valores')
-        plt.title('Resultados da Análise de Dados')
-        plt.grid(axis='y', linestyle='--', alpha=0.7)
-
-        # Rotacionar labels do eixo X se houver muitas métricas
-        if len(metrics) > 5:
-            plt.xticks(rotation=45, ha='right')
-
-        # Adicionar rótulos de dados em cada barra
-        for bar in bars:
-            yval = bar.get_height()
-            plt.text(bar.get_x() + bar.get_width() / 2, yval + 0.05,
-                     f"{yval:.2f}", ha='center', va='bottom')
-
-        # Segundo subplot: Box Plot da Simulação de Monte Carlo
-        plt.subplot(2, 1, 2)
-        if isinstance(simulated_projections, np.ndarray) and simulated_projections.size > 0:
-            # Achatar o array se for multidimensional
-            if simulated_projections.ndim > 1:
-                simulated_projections_flat = simulated_projections.flatten()
-            else:
-                simulated_projections_flat = simulated_projections
-
-            box_plot = sns.boxplot(y=simulated_projections_flat, color='lightblue')
-            plt.xlabel('Simulações')
-            plt.ylabel('Valores Projetados')
-            plt.title('Simulação de Monte Carlo - Box Plot das Projeções Futuras')
-            plt.grid(axis='y', linestyle='--', alpha=0.7)
-
-            # Adicionar rótulos de dados
-            quartiles = np.percentile(simulated_projections_flat, [25, 50, 75])
-            mediana = quartiles[1]
-            q1, q3 = quartiles[0], quartiles[2]
-
-            plt.text(0, mediana, f'Mediana: {mediana:.2f}', horizontalalignment='center', color='black', weight='semibold')
-            plt.text(0, q1, f'Q1: {q1:.2f}', horizontalalignment='center', color='blue')
-            plt.text(0, q3, f'Q3: {q3:.2f}', horizontalalignment='center', color='blue')
-        else:
-            logging.warning("Simulação de Monte Carlo não encontrada ou está vazia.")
-
-        # Salvar o gráfico como imagem temporária
-        plt.tight_layout()
-        temp_dir = tempfile.gettempdir()
-        chart_path = os.path.join(temp_dir, 'chart.png')
-        plt.savefig(chart_path, format='png')
-        plt.close()
-
-        # Criar o PDF e adicionar o gráfico
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_font("Arial", 'B', size=16)
-        pdf.cell(0, 10, txt="Resultados da Análise de Dados", ln=True, align='C')
-        pdf.ln(10)
+        with os.fdopen(file_descriptor, 'wb') as chart_file:
+            chart_file.write(png_bytes)
+        pdf.image(chart_path, x=x, w=w)
+    finally:
+        os.remove(chart_path)
 
-        pdf.set_font("Arial", size=12)
-        pdf.cell(0, 10, txt=f"Coluna Analisada: {results['Coluna Analisada']}", ln=True)
-        pdf.ln(5)
 
-        # Adicionar as métricas no relatório
-        for key, value in plot_results.items():
-            pdf.cell(0, 10, txt=f"{key}: {value:.2f}", ln=True)
-        pdf.ln(10)
+def _report_data(results):
+    # Métricas numéricas do gráfico e resumo da simulação, com a validação dos valores
+    # Remover as chaves que não são valores numéricos simples
+    plot_results = {k: v for k, v in results.items() if k not in ["Recomendações", "Simulação de Monte Carlo", "Coluna Analisada", "Intervalos de Confiança", "Rastreamento"]}
+    simulated_projections = as_simulation_summary(results.get("Simulação de Monte Carlo"))
 
-        # Adicionar resumo da Simulação de Monte Carlo
-        if isinstance(simulated_projections, np.ndarray) and simulated_projections.size > 0:
-            pdf.set_font("Arial", 'B', size=14)
-            pdf.cell(0, 10, txt="Resumo da Simulação de Monte Carlo:", ln=True)
-            pdf.set_font("Arial", size=12)
-            monte_carlo_mean = np.mean(simulated_projections_flat)
-            monte_carlo_std = np.std(simulated_projections_flat)
-            pdf.cell(0, 10, txt=f"Média da Simulação: {monte_carlo_mean:.2f}", ln=True)
-            pdf.cell(0, 10, txt=f"Desvio Padrão da Simulação: {monte_carlo_std:.2f}", ln=True)
-            pdf.ln(10)
-        else:
-            pdf.cell(0, 10, txt="Simulação de Monte Carlo não disponível.", ln=True)
+    # Verificar se plot_results contém apenas valores numéricos (None indica métrica não calculada,
+    # como o CAGR de séries com valores negativos ou zero)
+    for key, value in plot_results.items():
+        if value is not None and not isinstance(value, (int, float, np.integer, np.floating)):
+            raise ValueError(f"O valor de '{key}' não é numérico.")
+    return plot_results, simulated_projections
+
+
+def _format_metric(value):
+    # Métricas não calculadas (None ou NaN) aparecem como "n/d"
+    if value is None or np.isnan(value):
+        return "n/d"
+    return f"{value:.2f}"
+
+
+def _write_report_text(pdf, results, plot_results, simulated_projections, label=None):
+    # Nova página com o texto do relatório de uma série (o gráfico é inserido depois, ao final)
+    pdf.add_page()
+    pdf.set_font("Arial", 'B', size=16)
+    pdf.cell(0, 10, txt="Resultados da Análise de Dados", ln=True, align='C')
+    pdf.ln(10)
+
+    pdf.set_font("Arial", size=12)
+    if label:
+        pdf.cell(0, 10, txt=f"Série: {label}", ln=True)
+    pdf.cell(0, 10, txt=f"Coluna Analisada: {results['Coluna Analisada']}", ln=True)
+    pdf.ln(5)
+
+    # Adicionar as métricas no relatório
+    for key, value in plot_results.items():
+        pdf.cell(0, 10, txt=f"{key}: {_format_metric(value)}", ln=True)
+    pdf.ln(10)
 
-        # Adicionar recomendações
-        pdf.set_font("Arial", 'B', size=16)
-        pdf.cell(0, 10, txt="Recomendações:", ln=True)
+    # Adicionar resumo da Simulação de Monte Carlo
+    if simulated_projections is not None:
+        pdf.set_font("Arial", 'B', size=14)
+        pdf.cell(0, 10, txt="Resumo da Simulação de Monte Carlo:", ln=True)
         pdf.set_font("Arial", size=12)
-        for rec in results.get("Recomendações", []):
-            pdf.multi_cell(0, 10, txt=f"- {rec}")
+        monte_carlo_mean = simulated_projections.overall_mean
+        monte_carlo_std = simulated_projections.overall_std
+        pdf.cell(0, 10, txt=f"Média da Simulação: {monte_carlo_mean:.2f}", ln=True)
+        pdf.cell(0, 10, txt=f"Desvio Padrão da Simulação: {monte_carlo_std:.2f}", ln=True)
         pdf.ln(10)
+    else:
+        pdf.cell(0, 10, txt="Simulação de Monte Carlo não disponível.", ln=True)
 
-        # Inserir o gráfico no PDF
-        pdf.image(chart_path, x=15, w=180)
+    # Adicionar intervalos de confiança (bootstrap), se calculados
+    confidence_intervals = results.get("Intervalos de Confiança")
+    if confidence_intervals:
+        pdf.set_font("Arial", 'B', size=14)
+        pdf.cell(0, 10, txt=f"Intervalos de Confiança ({confidence_intervals['Nível de Confiança']:.0%}):", ln=True)
+        pdf.set_font("Arial", size=12)
+        for key, interval in confidence_intervals.items():
+            if isinstance(interval, tuple):
+                pdf.cell(0, 10, txt=f"{key}: {interval[0]:.2f} a {interval[1]:.2f}", ln=True)
+        if confidence_intervals.get("Observações"):
+            pdf.multi_cell(0, 10, txt=confidence_intervals["Observações"])
+            pdf.set_x(pdf.l_margin)
+        pdf.ln(10)
+
+    # Adicionar recomendações
+    pdf.set_font("Arial", 'B', size=16)
+    pdf.cell(0, 10, txt="Recomendações:", ln=True)
+    pdf.set_font("Arial", size=12)
+    for rec in results.get("Recomendações", []):
+        pdf.multi_cell(0, 10, txt=f"- {rec}")
+        pdf.set_x(pdf.l_margin)  # No fpdf2, multi_cell termina à direita do texto
+    pdf.ln(10)
+
+
+def render_report(results, output_path):
+    """
+    Gera o relatório PDF (métricas, resumo da simulação, recomendações e gráficos) e grava em
+    output_path, sem abrir nenhuma janela. O gráfico é desenhado em memória, em outra thread,
+    enquanto o texto do PDF é montado; pode ser chamada de várias threads ao mesmo tempo.
+    Usado pelo download_results e pelos benchmarks.
+
+    Parâmetros:
+    - results: Dicionário de resultados de analyze_data.
+    - output_path: Caminho do arquivo PDF a ser gravado.
+
+    Retorno:
+    - O caminho do PDF gravado.
+    """
+    plot_results, simulated_projections = _report_data(results)
+
+    from fpdf import FPDF  # Carregado só quando o primeiro relatório é gerado
+
+    report_progress(0.0, "relatório")
+    # O gráfico é desenhado em paralelo com a montagem do texto (no contexto atual, para o rastreamento)
+    chart_future = _get_chart_executor().submit(contextvars.copy_context().run, _render_chart_stage,
+                                                plot_results, simulated_projections)
+    try:
+        with span("PDF do relatório"):
+            pdf = FPDF()
+            _write_report_text(pdf, results, plot_results, simulated_projections)
+
+            report_progress(0.5, "relatório")
+            # Inserir o gráfico no PDF, direto da memória
+            _embed_image(pdf, chart_future.result(), x=15, w=180)
+
+            pdf.output(output_path)
+    finally:
+        # Em caso de erro no texto, o gráfico é descartado se ainda não tiver começado
+        chart_future.cancel()
+    report_progress(1.0, "relatório")
+
+    return output_path
+
+
+def _render_chart_task(task):
+    # Executada nos processos do pool: cada processo reaproveita a sua figura entre os gráficos
+    plot_results, simulated_projections = task
+    return render_chart(plot_results, simulated_projections)
+
+
+def _iter_charts(tasks, n_workers):
+    """
+    Desenha os gráficos em um pool de processos e os entrega na ordem das tarefas. No máximo
+    dois gráficos por processo ficam adiantados, para que a memória não cresça com o número de séries.
+    """
+    n_workers = n_workers or os.cpu_count() or 1
+    if n_workers == 1:
+        for task in tasks:
+            yield _render_chart_task(task)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    pending = deque()
+    remaining = iter(tasks)
+    executor = ProcessPoolExecutor(max_workers=n_workers)
+    try:
+        for task in itertools.islice(remaining, 2 * n_workers):
+            pending.append(executor.submit(_render_chart_task, task))
+        while pending:
+            png_bytes = pending.popleft().result()
+            for task in itertools.islice(remaining, 1):
+                pending.append(executor.submit(_render_chart_task, task))
+            yield png_bytes
+    finally:
+        # Em um cancelamento ou erro, os gráficos que ainda não começaram são descartados
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _safe_file_name(text):
+    # Nome de arquivo com letras, números, '-', '_' e '.', sem separadores de diretório
+    return re.sub(r'[^\w.-]+', '_', str(text)).strip('._') or 'serie'
+
+
+def render_reports(results_list, output_dir, consolidated=False, labels=None, n_workers=None,
+                   file_name="relatorio_consolidado.pdf"):
+    """
+    Gera os relatórios PDF de muitas séries de uma vez, sem nenhuma janela: um PDF por série ou
+    um único PDF consolidado, com as séries na ordem recebida. Os gráficos são desenhados em um
+    pool de processos (API orientada a objetos do Agg, sem o pyplot) enquanto o processo atual
+    monta as páginas. No modo de um PDF por série, cada arquivo é gravado assim que seu gráfico
+    fica pronto; no consolidado, o fpdf grava o documento inteiro ao final.
+
+    Parâmetros:
+    - results_list: Lista de dicionários de resultados de analyze_data.
+    - output_dir: Diretório onde os PDFs serão gravados (criado se não existir).
+    - consolidated: Se True, gera um único PDF com todas as séries.
+    - labels: Lista opcional de nomes das séries (por exemplo, arquivo e coluna), usados nas páginas
+      e nos nomes dos arquivos.
+    - n_workers: Número de processos (padrão: número de CPUs). Com 1, desenha no processo atual.
+    - file_name: Nome do PDF consolidado.
+
+    Retorno:
+    - Dicionário com os arquivos gravados, o número de séries e de páginas, as séries ignoradas
+      (resultados inválidos, com o erro), o tempo e a vazão em páginas por segundo.
+    """
+    if labels is not None and len(labels) != len(results_list):
+        raise ValueError("O número de nomes deve ser igual ao número de séries.")
+
+    from fpdf import FPDF
+
+    start = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+    # Validação antes de começar: séries com resultados inválidos são registradas e ficam de fora,
+    # sem interromper os relatórios das demais
+    valid = []
+    skipped = []
+    for index, results in enumerate(results_list):
+        label = labels[index] if labels is not None else results.get('Coluna Analisada')
+        try:
+            valid.append((index, results, _report_data(results)))
+        except (ValueError, TypeError) as e:
+            logging.error(f"Relatório da série {label} ignorado: {e}")
+            skipped.append({"Série": label, "Erro": str(e)})
+    prepared = [report_data for _, _, report_data in valid]
+    charts = _iter_charts(prepared, n_workers)
+
+    files = []
+    pages = 0
+    pdf = FPDF() if consolidated else None
+    try:
+        for done, ((index, results, (plot_results, simulated_projections)), png_bytes) in enumerate(
+                zip(valid, charts)):
+            report_progress(done / len(valid), "relatórios")
+            label = labels[index] if labels is not None else None
+            if not consolidated:
+                pdf = FPDF()
+            _write_report_text(pdf, results, plot_results, simulated_projections, label=label)
+            _embed_image(pdf, png_bytes, x=15, w=180)
+
+            if not consolidated:
+                name = label if label is not None else results.get('Coluna Analisada')
+                output_path = os.path.join(output_dir, f"{index + 1:04d}_{_safe_file_name(name)}.pdf")
+                pdf.output(output_path)
+                pages += pdf.page_no()
+                files.append(output_path)
+    finally:
+        charts.close()
+
+    if consolidated and valid:
+        output_path = os.path.join(output_dir, file_name)
+        pdf.output(output_path)
+        pages = pdf.page_no()
+        files.append(output_path)
+    report_progress(1.0, "relatórios")
+
+    elapsed = time.perf_counter() - start
+    summary = {
+        "Arquivos": files,
+        "Séries": len(valid),
+        "Séries Ignoradas": skipped,
+        "Páginas": pages,
+        "Tempo (s)": elapsed,
+        "Páginas por Segundo": pages / elapsed if elapsed > 0 else None,
+    }
+    logging.info(f"{len(valid)} relatório(s) gerado(s) em {elapsed:.2f}s "
+                 f"({summary['Páginas por Segundo'] or 0:.2f} páginas/s)")
+    return summary
 
-        # Solicitar ao usuário um local para salvar o PDF
-        root = tk.Tk()
-        root.withdraw()  # Oculta a janela principal do Tkinter
 
-        save_path = filedialog.asksaveasfilename(
-            defaultextension='.pdf',
-            filetypes=[('PDF Files', '*.pdf')],
-            title="Salvar Relatório",
-            initialfile='resultado_analise.pdf'
-        )
+def ask_report_path():
+    """
+    Abre a janela para escolher onde salvar o relatório (deve ser chamada na thread principal).
 
-        root.destroy()  # Destruir a janela raiz do Tkinter
+    Retorno:
+    - Caminho do PDF escolhido, ou None se o usuário cancelou.
+    """
+    root = tk.Tk()
+    root.withdraw()  # Oculta a janela principal do Tkinter
+    save_path = filedialog.asksaveasfilename(
+        defaultextension='.pdf',
+        filetypes=[('PDF Files', '*.pdf')],
+        title="Salvar Relatório",
+        initialfile='resultado_analise.pdf'
+    )
+    root.destroy()  # Destruir a janela raiz do Tkinter
+    return save_path or None
+
+
+def download_results(results):
+    """
+    Pede o local do PDF e gera o relatório na thread atual, exibindo o resultado ao usuário.
+    A interface usa ask_report_path e agenda o render_report como tarefa (ver gui.run_download).
+    """
+    try:
+        # Solicitar ao usuário um local para salvar o PDF
+        save_path = ask_report_path()
 
         if save_path:
-            # Salvar o PDF no local especificado
-            pdf.output(save_path)
-            # Remover a imagem temporária
-            os.remove(chart_path)
+            # Gerar e salvar o PDF no local especificado
+            render_report(results, save_path)
 
             # Exibir mensagem de sucesso
             messagebox.showinfo("PDF Gerado", f"PDF gerado com sucesso e salvo em:\n{save_path}")
         else:
             # Usuário cancelou a operação de salvar
-            os.remove(chart_path)
             messagebox.showinfo("Operação Cancelada", "A operação de salvar o PDF foi cancelada.")
 
     except Exception as e:
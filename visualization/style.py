@@ -0,0 +1,33 @@
+import logging
+import os
+import threading
+
+# Caminho para a fonte Open Sans
+FONT_PATH = os.path.join(
+    'C:/Users/GabrielRocca/source/repos/games/decision-maker/assets/fonts/Open_Sans/static',
+    'OpenSans-Regular.ttf'
+)
+
+_style_applied = False
+_style_lock = threading.Lock()
+
+
+def apply_style():
+    """
+    Configura as fontes do matplotlib (Open Sans, se disponível, ou DejaVu Sans). É chamada pelas
+    funções de gráficos e relatórios antes de desenhar, em vez de na importação dos módulos, para
+    que importar a interface não exija carregar o matplotlib. Só tem efeito na primeira chamada.
+    """
+    global _style_applied
+    with _style_lock:
+        if _style_applied:
+            return
+        import matplotlib
+
+        if os.path.exists(FONT_PATH):
+            matplotlib.rcParams['font.family'] = 'Open Sans'
+            matplotlib.rcParams['pdf.fonttype'] = 42  # Para garantir que a fonte seja incorporada corretamente
+        else:
+            logging.warning("Fonte Open Sans não encontrada. Usando fonte padrão DejaVu Sans.")
+            matplotlib.rcParams['font.family'] = 'DejaVu Sans'
+        _style_applied = True